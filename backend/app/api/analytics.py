@@ -1,21 +1,49 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import case, func, extract, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import IS_SQLITE, get_read_db
+from app.middleware.read_your_writes import wrote_recently
 from app.models.report import Report
 from app.models.incident import Incident
-from app.models.resource import Resource
+from app.models.resource import Resource, ResourceStatus
+from app.schemas.incident import IncidentRead
+from app.schemas.report import ReportRead
+from app.core.serialization import schema_columns
+from app.services.archive import reports_since
+from app.services.dashboard import dashboard_cache_stats, dashboard_stats
+from app.services.export import PYARROW_AVAILABLE, export_response
+from app.services.heatmap import GridTooLargeError, report_heatmap
+from app.services.resource_summary import resource_summary_cache_stats
+from app.services.search import parse_bbox
+from app.services.surge import surge_detector
+from app.services.rollups import (
+    first_full_hour, incident_rollup_days, report_rollup_cells, timestamp_before, use_rollups
+)
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 router = APIRouter()
 
 
+def _day(column):
+    """Calendar day (UTC) of a timestamp column, computed in the database"""
+    if IS_SQLITE:
+        # Stored as naive UTC text; date() returns 'YYYY-MM-DD'
+        return func.date(column)
+    return func.date(func.timezone("UTC", column))
+
+
+def _day_key(value) -> str:
+    if value is None:
+        return "unknown"
+    return value if isinstance(value, str) else value.isoformat()
+
+
 @router.get("/reports/historical/")
 async def get_historical_reports(
     days: int = 7,
     hazard_type: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get historical report data for analysis
@@ -26,69 +54,93 @@ async def get_historical_reports(
     """
     cutoff_date = datetime.utcnow() - timedelta(days=days)
     
-    query = db.query(Report).filter(Report.timestamp >= cutoff_date)
+    # Only reaches into the archive when the window is older than its newest row
+    source = await reports_since(db, cutoff_date)
+    day = _day(source.c.timestamp).label("day")
+    # One row per (day, severity, hazard) cell; the per-dimension totals are
+    # summed from these few rows instead of from every report
+    query = select(
+        day,
+        source.c.severity,
+        source.c.hazard_type,
+        func.count().label("reports"),
+        func.sum(func.coalesce(source.c.confidence_score, 0)).label("confidence")
+    ).filter(source.c.timestamp >= cutoff_date).group_by(day, source.c.severity, source.c.hazard_type).order_by(day)
     
     if hazard_type:
-        query = query.filter(Report.hazard_type == hazard_type)
+        query = query.filter(source.c.hazard_type == hazard_type)
     
-    reports = query.all()
+    if use_rollups(cutoff_date):
+        # Raw reports only for the partial first hour, rollups for the rest
+        full_hours = first_full_hour(cutoff_date)
+        query = query.filter(timestamp_before(source.c.timestamp, full_hours))
+        cells = (await db.execute(query)).all() + await report_rollup_cells(db, full_hours, hazard_type)
+    else:
+        cells = (await db.execute(query)).all()
     
-    # Group by date
     by_date = {}
     by_severity = {"Low": 0, "Medium": 0, "High": 0}
     by_hazard = {}
+    total_reports = 0
+    total_confidence = 0.0
     
-    for report in reports:
-        # By date
-        date_key = report.timestamp.date().isoformat() if report.timestamp else "unknown"
-        by_date[date_key] = by_date.get(date_key, 0) + 1
+    for cell in cells:
+        date_key = _day_key(cell.day)
+        by_date[date_key] = by_date.get(date_key, 0) + cell.reports
         
-        # By severity
-        if report.severity:
-            by_severity[report.severity] = by_severity.get(report.severity, 0) + 1
+        if cell.severity:
+            by_severity[cell.severity] = by_severity.get(cell.severity, 0) + cell.reports
         
-        # By hazard type
-        hazard = report.hazard_type or "Unknown"
-        by_hazard[hazard] = by_hazard.get(hazard, 0) + 1
+        hazard = cell.hazard_type or "Unknown"
+        by_hazard[hazard] = by_hazard.get(hazard, 0) + cell.reports
+        
+        total_reports += cell.reports
+        total_confidence += cell.confidence or 0
     
     return {
         "period_days": days,
-        "total_reports": len(reports),
+        "total_reports": total_reports,
         "by_date": by_date,
         "by_severity": by_severity,
         "by_hazard_type": by_hazard,
-        "average_confidence": sum(r.confidence_score or 0 for r in reports) / len(reports) if reports else 0
+        "average_confidence": total_confidence / total_reports if total_reports else 0
     }
 
 
 @router.get("/incidents/trends/")
 async def get_incident_trends(
     days: int = 30,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get incident trends over time"""
     cutoff_date = datetime.utcnow() - timedelta(days=days)
     
-    incidents = db.query(Incident).filter(
-        Incident.created_at >= cutoff_date
-    ).all()
+    day = _day(Incident.created_at).label("day")
+    active = Incident.is_active == True
+    query = select(
+        day,
+        func.count().label("incidents"),
+        func.sum(case((active, 1), else_=0)).label("active"),
+        func.sum(case((active, Incident.witness_count), else_=0)).label("witnesses")
+    ).filter(Incident.created_at >= cutoff_date).group_by(day).order_by(day)
     
-    # Group by date
-    by_date = {}
-    active_count = 0
-    total_witnesses = 0
+    if use_rollups(cutoff_date):
+        full_hours = first_full_hour(cutoff_date)
+        query = query.filter(timestamp_before(Incident.created_at, full_hours))
+        rows = (await db.execute(query)).all() + await incident_rollup_days(db, full_hours)
+    else:
+        rows = (await db.execute(query)).all()
     
-    for incident in incidents:
-        date_key = incident.created_at.date().isoformat() if incident.created_at else "unknown"
-        by_date[date_key] = by_date.get(date_key, 0) + 1
-        
-        if incident.is_active:
-            active_count += 1
-            total_witnesses += incident.witness_count
+    by_date = {}
+    for row in rows:
+        by_date[_day_key(row.day)] = by_date.get(_day_key(row.day), 0) + row.incidents
+    total_incidents = sum(row.incidents for row in rows)
+    active_count = sum(row.active for row in rows)
+    total_witnesses = sum(row.witnesses for row in rows)
     
     return {
         "period_days": days,
-        "total_incidents": len(incidents),
+        "total_incidents": total_incidents,
         "active_incidents": active_count,
         "total_witnesses": total_witnesses,
         "by_date": by_date,
@@ -99,24 +151,28 @@ async def get_incident_trends(
 @router.get("/resources/trends/")
 async def get_resource_trends(
     days: int = 7,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get resource trends"""
     cutoff_date = datetime.utcnow() - timedelta(days=days)
     
-    resources = db.query(Resource).filter(
-        Resource.created_at >= cutoff_date
-    ).all()
+    rows = (await db.execute(
+        select(Resource.resource_type, Resource.status, func.sum(Resource.quantity))
+        .filter(
+            Resource.created_at >= cutoff_date,
+            Resource.status.in_([ResourceStatus.NEEDED, ResourceStatus.AVAILABLE])
+        )
+        .group_by(Resource.resource_type, Resource.status)
+    )).all()
     
     needed_by_type = {}
     available_by_type = {}
     
-    for resource in resources:
-        rtype = resource.resource_type.value
-        if resource.status.value == "needed":
-            needed_by_type[rtype] = needed_by_type.get(rtype, 0) + resource.quantity
-        elif resource.status.value == "available":
-            available_by_type[rtype] = available_by_type.get(rtype, 0) + resource.quantity
+    for resource_type, status, quantity in rows:
+        if status == ResourceStatus.NEEDED:
+            needed_by_type[resource_type.value] = quantity
+        else:
+            available_by_type[resource_type.value] = quantity
     
     return {
         "period_days": days,
@@ -129,27 +185,133 @@ async def get_resource_trends(
     }
 
 
-@router.get("/dashboard/stats/")
-async def get_dashboard_stats(db: Session = Depends(get_db)):
-    """Get overall dashboard statistics"""
-    total_reports = db.query(Report).count()
-    active_incidents = db.query(Incident).filter(Incident.is_active == True).count()
-    total_resources_needed = db.query(Resource).filter(Resource.status == "needed").count()
-    total_resources_available = db.query(Resource).filter(Resource.status == "available").count()
-    
-    # Recent activity (last 24 hours)
-    last_24h = datetime.utcnow() - timedelta(hours=24)
-    recent_reports = db.query(Report).filter(Report.timestamp >= last_24h).count()
-    recent_incidents = db.query(Incident).filter(Incident.created_at >= last_24h).count()
+@router.get("/heatmap/")
+async def get_report_heatmap(
+    bbox: str,
+    cell_degrees: float = Query(0.01, gt=0, le=10),
+    hours: int = Query(24, ge=1, le=24 * 365),
+    until: Optional[datetime] = None,
+    hazard_type: Optional[str] = None,
+    encoding: str = Query("dense", pattern="^(dense|rle)$"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Report density grid for a heat layer
+    
+    Args:
+        bbox: Bounding box "min_lon,min_lat,max_lon,max_lat"
+        cell_degrees: Grid cell size in degrees
+        hours: Window length in hours, ending at until
+        until: End of the window (default now)
+        hazard_type: Filter by hazard type (optional)
+        encoding: "dense" array of rows * cols counts, or "rle" value/run pairs
+    """
+    try:
+        box = parse_bbox(bbox)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be min_lon,min_lat,max_lon,max_lat")
+    try:
+        return await report_heatmap(db, box, cell_degrees, hours, until, hazard_type, encoding)
+    except GridTooLargeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# Exports use the public read schemas' columns
+REPORT_EXPORT_COLUMNS = schema_columns(Report, ReportRead)
+INCIDENT_EXPORT_COLUMNS = schema_columns(Incident, IncidentRead, exclude=("reports",))
+
+
+def _export_format(export_format: str) -> str:
+    if export_format == "parquet" and not PYARROW_AVAILABLE:
+        raise HTTPException(status_code=400, detail="Parquet export needs pyarrow installed on the server")
+    return export_format
+
+
+@router.get("/export/reports/")
+async def export_reports(
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$"),
+    days: Optional[int] = Query(None, ge=1),
+    hazard_type: str = None
+):
+    """
+    Stream every matching report (including archived ones) as a download
     
+    Args:
+        format: "csv", "ndjson" or "parquet"
+        days: Only reports from the last N days (default: all)
+        hazard_type: Filter by hazard type (optional)
+    """
+    export_format = _export_format(format)
+    
+    async def build(db: AsyncSession):
+        cutoff_date = datetime.utcnow() - timedelta(days=days) if days else None
+        source = await reports_since(db, cutoff_date)
+        query = select(*[source.c[column.key] for column in REPORT_EXPORT_COLUMNS])
+        if cutoff_date:
+            query = query.filter(source.c.timestamp >= cutoff_date)
+        if hazard_type:
+            query = query.filter(source.c.hazard_type == hazard_type)
+        return query.order_by(source.c.id)
+    
+    return export_response("reports", build, REPORT_EXPORT_COLUMNS, export_format)
+
+
+@router.get("/export/incidents/")
+async def export_incidents(
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$"),
+    days: Optional[int] = Query(None, ge=1),
+    hazard_type: str = None
+):
+    """
+    Stream every matching incident (with its report counters) as a download
+    
+    Args:
+        format: "csv", "ndjson" or "parquet"
+        days: Only incidents created in the last N days (default: all)
+        hazard_type: Filter by hazard type (optional)
+    """
+    export_format = _export_format(format)
+    
+    async def build(db: AsyncSession):
+        query = select(*INCIDENT_EXPORT_COLUMNS)
+        if days:
+            query = query.filter(Incident.created_at >= datetime.utcnow() - timedelta(days=days))
+        if hazard_type:
+            query = query.filter(Incident.hazard_type == hazard_type)
+        return query.order_by(Incident.id)
+    
+    return export_response("incidents", build, INCIDENT_EXPORT_COLUMNS, export_format)
+
+
+@router.get("/dashboard/stats/")
+async def get_dashboard_stats(request: Request, db: AsyncSession = Depends(get_read_db)):
+    """Get overall dashboard statistics (cached, see app.services.dashboard)"""
+    # Clients that just wrote read the primary; don't answer them from a
+    # cache entry another client filled from a lagging replica
+    return await dashboard_stats(db, use_cache=not wrote_recently(request))
+
+
+@router.get("/surges/")
+async def get_surges(limit: int = Query(20, ge=1, le=200)):
+    """
+    Streaming surge detector state: recent surge events (also pushed over
+    the WebSocket as "surge" messages) and the cells with the highest
+    recent-to-baseline report rate right now
+    """
     return {
-        "total_reports": total_reports,
-        "active_incidents": active_incidents,
-        "resources_needed": total_resources_needed,
-        "resources_available": total_resources_available,
-        "recent_activity_24h": {
-            "reports": recent_reports,
-            "incidents": recent_incidents
-        }
+        "events": list(reversed(surge_detector.recent_events)),
+        "hottest": surge_detector.hottest(limit),
+        "detector": surge_detector.stats()
     }
 
+
+@router.get("/dashboard/stats/cache/")
+async def get_dashboard_stats_cache():
+    """Hit/miss metrics for the dashboard statistics cache"""
+    return dashboard_cache_stats()
+
+
+@router.get("/resources/summary/cache/")
+async def get_resource_summary_cache():
+    """Hit/miss metrics for the resource summary cache"""
+    return resource_summary_cache_stats()
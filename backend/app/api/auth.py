@@ -1,7 +1,8 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserRead, Token
@@ -17,17 +18,17 @@ router = APIRouter()
 
 
 @router.post("/register", response_model=UserRead, status_code=201)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user"""
     # Check if user exists
-    db_user = db.query(User).filter(User.email == user_data.email).first()
+    db_user = await db.scalar(select(User).filter(User.email == user_data.email))
     if db_user:
         raise HTTPException(
             status_code=400,
             detail="Email already registered"
         )
     
-    db_user = db.query(User).filter(User.username == user_data.username).first()
+    db_user = await db.scalar(select(User).filter(User.username == user_data.username))
     if db_user:
         raise HTTPException(
             status_code=400,
@@ -46,8 +47,8 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user
 
@@ -55,10 +56,10 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Login and get access token"""
-    user = db.query(User).filter(User.username == form_data.username).first()
+    user = await db.scalar(select(User).filter(User.username == form_data.username))
     if not user or not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
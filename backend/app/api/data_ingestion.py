@@ -1,14 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.report import Report
-from app.schemas.report import ReportCreate, ReportRead
-from app.services.ai_processor import process_report, process_report_with_llm
-from app.services.clustering import find_nearby_incident, update_incident_with_report
 from app.services.twitter_integration import search_disaster_tweets, monitor_twitter_stream
-from app.services.sms_integration import receive_sms_webhook
-from app.api.websocket import broadcast_new_report
-from typing import List
+from app.services.sms_integration import receive_sms_webhook, build_twiml_response
+from app.services.journal import ingest_journal
+from app.services.dashboard import invalidate_dashboard_stats
+from app.services.admission import admission_controller, LoadShedError
+from app.services.pipeline import IngestItem, ingestion_pipeline, sms_pipeline
 
 router = APIRouter()
 
@@ -18,7 +17,7 @@ async def ingest_twitter_reports(
     query: str = "disaster OR fire OR flood",
     max_results: int = 10,
     provider: str = "dummy",
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Ingest disaster reports from Twitter
@@ -34,170 +33,66 @@ async def ingest_twitter_reports(
     if not tweets:
         return {"message": "No tweets found or Twitter not configured", "processed": 0}
     
-    processed_count = 0
-    reports = []
+    items = [
+        IngestItem(raw_text=tweet["text"], source="twitter", provider=provider)
+        for tweet in tweets
+    ]
+    await ingestion_pipeline.run(items, db)
+    processed_count = sum(1 for item in items if item.error is None)
+    shed_count = sum(1 for item in items if isinstance(item.error, LoadShedError))
     
-    for tweet in tweets:
-        try:
-            # Process tweet text
-            if provider in ["openai", "gemini"]:
-                try:
-                    from app.services.ai_processor import process_report_with_llm
-                    processed_data = await process_report_with_llm(tweet["text"], provider=provider)
-                except:
-                    processed_data = process_report(tweet["text"])
-            else:
-                processed_data = process_report(tweet["text"])
-            
-            # Check for nearby incident
-            nearby_incident = find_nearby_incident(
-                latitude=processed_data.get("latitude"),
-                longitude=processed_data.get("longitude"),
-                hazard_type=processed_data.get("hazard_type"),
-                db=db,
-                radius_meters=500.0
-            )
-            
-            if nearby_incident:
-                update_incident_with_report(nearby_incident, processed_data)
-                incident_id = nearby_incident.id
-            else:
-                from app.models.incident import Incident
-                new_incident = Incident(
-                    location=processed_data.get("location"),
-                    latitude=processed_data.get("latitude"),
-                    longitude=processed_data.get("longitude"),
-                    hazard_type=processed_data.get("hazard_type"),
-                    severity=processed_data.get("severity"),
-                    confidence_score=processed_data.get("confidence_score"),
-                    witness_count=1,
-                    is_active=True
-                )
-                db.add(new_incident)
-                db.flush()
-                incident_id = new_incident.id
-            
-            # Create report
-            db_report = Report(
-                raw_text=f"[Twitter] {tweet['text']}",
-                location=processed_data.get("location"),
-                latitude=processed_data.get("latitude"),
-                longitude=processed_data.get("longitude"),
-                hazard_type=processed_data.get("hazard_type"),
-                severity=processed_data.get("severity"),
-                confidence_score=processed_data.get("confidence_score"),
-                is_verified=False,
-                incident_id=incident_id
-            )
-            
-            db.add(db_report)
-            reports.append(db_report)
-            processed_count += 1
-            
-        except Exception as e:
-            print(f"Error processing tweet: {e}")
-            continue
-    
-    db.commit()
-    
-    # Broadcast new reports
-    for report in reports:
-        db.refresh(report)
-        await broadcast_new_report({
-            "id": report.id,
-            "raw_text": report.raw_text,
-            "location": report.location,
-            "latitude": report.latitude,
-            "longitude": report.longitude,
-            "hazard_type": report.hazard_type,
-            "severity": report.severity,
-            "confidence_score": report.confidence_score,
-            "timestamp": report.timestamp.isoformat() if report.timestamp else None,
-            "is_verified": report.is_verified
-        })
-    
-    return {"message": f"Processed {processed_count} tweets", "processed": processed_count}
+    return {
+        "message": f"Processed {processed_count} tweets",
+        "processed": processed_count,
+        "shed": shed_count
+    }
 
 
 @router.post("/sms/webhook/")
 async def sms_webhook(
     request_data: dict,
+    background_tasks: BackgroundTasks,
     provider: str = "dummy",
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Webhook endpoint for receiving SMS reports via Twilio
+    
+    Only validates, journals and persists the raw message before answering,
+    so Twilio gets its TwiML response immediately. Extraction, geocoding and
+    clustering run afterwards through the SMS ingestion pipeline in a
+    background task.
     """
     sms_data = receive_sms_webhook(request_data)
+    if not sms_data["raw_text"].strip():
+        raise HTTPException(status_code=400, detail="SMS body is empty")
     
-    # Process SMS text
-    if provider in ["openai", "gemini"]:
-        try:
-            from app.services.ai_processor import process_report_with_llm
-            processed_data = await process_report_with_llm(sms_data["raw_text"], provider=provider)
-        except:
-            processed_data = process_report(sms_data["raw_text"])
-    else:
-        processed_data = process_report(sms_data["raw_text"])
-    
-    # Check for nearby incident
-    nearby_incident = find_nearby_incident(
-        latitude=processed_data.get("latitude"),
-        longitude=processed_data.get("longitude"),
-        hazard_type=processed_data.get("hazard_type"),
-        db=db,
-        radius_meters=500.0
+    # Persist the raw message; processed fields are filled in later
+    item = IngestItem(
+        raw_text=sms_data["raw_text"],
+        source="sms",
+        provider=provider,
+        phone_number=sms_data["phone_number"] or None
     )
-    
-    if nearby_incident:
-        update_incident_with_report(nearby_incident, processed_data)
-        incident_id = nearby_incident.id
-    else:
-        from app.models.incident import Incident
-        new_incident = Incident(
-            location=processed_data.get("location"),
-            latitude=processed_data.get("latitude"),
-            longitude=processed_data.get("longitude"),
-            hazard_type=processed_data.get("hazard_type"),
-            severity=processed_data.get("severity"),
-            confidence_score=processed_data.get("confidence_score"),
-            witness_count=1,
-            is_active=True
-        )
-        db.add(new_incident)
-        db.flush()
-        incident_id = new_incident.id
-    
-    # Create report
-    db_report = Report(
-        raw_text=f"[SMS] {sms_data['raw_text']}",
-        location=processed_data.get("location"),
-        latitude=processed_data.get("latitude"),
-        longitude=processed_data.get("longitude"),
-        hazard_type=processed_data.get("hazard_type"),
-        severity=processed_data.get("severity"),
-        confidence_score=processed_data.get("confidence_score"),
-        is_verified=False,
-        incident_id=incident_id
-    )
-    
+    # Journal first: if we crash before the commit, replay inserts the report.
+    # The placeholder carries the seq so replay finds it instead of adding another.
+    item.journal_seq = await ingest_journal.append("sms", item.journal_payload())
+    db_report = Report(raw_text=item.stored_text, is_verified=False, ingest_seq=item.journal_seq)
     db.add(db_report)
-    db.commit()
-    db.refresh(db_report)
+    await db.commit()
+    invalidate_dashboard_stats()
+    item.report_id = db_report.id
     
-    # Broadcast
-    await broadcast_new_report({
-        "id": db_report.id,
-        "raw_text": db_report.raw_text,
-        "location": db_report.location,
-        "latitude": db_report.latitude,
-        "longitude": db_report.longitude,
-        "hazard_type": db_report.hazard_type,
-        "severity": db_report.severity,
-        "confidence_score": db_report.confidence_score,
-        "timestamp": db_report.timestamp.isoformat() if db_report.timestamp else None,
-        "is_verified": db_report.is_verified
-    })
+    background_tasks.add_task(sms_pipeline.run_in_new_session, [item])
     
-    return {"message": "SMS report processed", "report_id": db_report.id}
+    return Response(content=build_twiml_response(), media_type="application/xml")
+
 
+@router.get("/pipeline/stats/")
+async def get_pipeline_stats():
+    """Per-stage timings for the ingestion pipelines, plus admission and load-shedding metrics"""
+    return {
+        "default": ingestion_pipeline.stats(),
+        "sms": sms_pipeline.stats(),
+        "admission": admission_controller.stats()
+    }
@@ -1,20 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
 from typing import List
 
-from app.database import get_db
-from app.models.report import Report
+from app.database import get_db, get_read_db
+from app.models.report import Report, ArchivedReport
 from app.models.incident import Incident
 from app.models.resource import Resource
 from app.schemas.report import ReportCreate, ReportRead
 from app.schemas.incident import IncidentRead
-from app.schemas.resource import ResourceCreate, ResourceRead, ResourceUpdate
-from app.services.ai_processor import process_report, process_report_with_llm
-from app.services.clustering import find_nearby_incident, update_incident_with_report
-from app.api.websocket import broadcast_new_report, broadcast_new_incident
-from app.core.security import get_current_user, get_current_active_user
+from app.schemas.resource import ResourceBulkUpdate, ResourceCreate, ResourceRead, ResourceUpdate
+from app.schemas.alert import SMSAlertRequest
+from app.services.alert_fanout import SMSAlertFanout, alert_jobs, get_alert_fanout
+from app.services.admission import LoadShedError
+from app.services.pipeline import IngestItem, ingestion_pipeline
+from app.services.archive import reports_source
+from app.services.dashboard import invalidate_dashboard_stats
+from app.services.resource_summary import invalidate_resource_summary, resource_summary
+from app.services.matching import MATCH_DEFAULT_K, MATCH_MAX_DISTANCE_KM, match_resources
+from app.services.resource_updates import bulk_update_resources
+from app.middleware.read_your_writes import wrote_recently
+from app.services import search
+from app.services.search import parse_bbox
+from app.core.security import get_current_user, get_current_active_user, get_current_responder
+from app.core.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, cached_total, keyset_page, set_page_headers, split_page
+)
+from app.core.serialization import JSONBytesResponse, rows_to_dicts, schema_columns
 from app.models.user import User
 from typing import Optional
+from datetime import datetime
 
 router = APIRouter()
 
@@ -22,183 +38,282 @@ router = APIRouter()
 @router.post("/reports/", response_model=ReportRead, status_code=201)
 async def create_report(
     report: ReportCreate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     provider: str = "dummy"
 ):
     """
     Create a new disaster report.
     Accepts raw text and optional image, processes it with AI, and saves to database.
+    Runs through the shared ingestion pipeline (journal, extract, cluster,
+    persist, broadcast).
     
     Args:
         report: Report creation schema with raw_text and optional image_base64
         db: Database session
         provider: AI provider ("openai", "gemini", or "dummy" for fallback)
     """
-    # Process with vision model if image provided
-    if report.image_base64:
-        if provider in ["openai", "gemini"]:
-            try:
-                from app.services.ai_processor import process_image_with_vision
-                processed_data = await process_image_with_vision(
-                    report.image_base64, 
-                    report.raw_text, 
-                    provider=provider
-                )
-            except Exception as e:
-                print(f"Vision processing failed, using text fallback: {e}")
-                # Fall back to text processing
-                if provider in ["openai", "gemini"]:
-                    try:
-                        processed_data = await process_report_with_llm(report.raw_text, provider=provider)
-                    except:
-                        processed_data = process_report(report.raw_text)
-                else:
-                    processed_data = process_report(report.raw_text)
-        else:
-            # Dummy doesn't support images, use text
-            processed_data = process_report(report.raw_text)
-    else:
-        # Process the raw text using AI service
-        if provider in ["openai", "gemini"]:
-            try:
-                processed_data = await process_report_with_llm(report.raw_text, provider=provider)
-            except Exception as e:
-                # Fall back to dummy if LLM fails
-                print(f"LLM processing failed, using fallback: {e}")
-                processed_data = process_report(report.raw_text)
-        else:
-            # Use dummy implementation
-            processed_data = process_report(report.raw_text)
-    
-    # Check for nearby incident (clustering)
-    nearby_incident = find_nearby_incident(
-        latitude=processed_data.get("latitude"),
-        longitude=processed_data.get("longitude"),
-        hazard_type=processed_data.get("hazard_type"),
-        db=db,
-        radius_meters=500.0
-    )
-    
-    if nearby_incident:
-        # Attach to existing incident
-        update_incident_with_report(nearby_incident, processed_data)
-        incident_id = nearby_incident.id
-    else:
-        # Create new incident
-        new_incident = Incident(
-            location=processed_data.get("location"),
-            latitude=processed_data.get("latitude"),
-            longitude=processed_data.get("longitude"),
-            hazard_type=processed_data.get("hazard_type"),
-            severity=processed_data.get("severity"),
-            confidence_score=processed_data.get("confidence_score"),
-            witness_count=1,
-            is_active=True
-        )
-        db.add(new_incident)
-        db.flush()  # Get the ID without committing
-        incident_id = new_incident.id
-    
-    # Create database record
-    db_report = Report(
+    item = IngestItem(
         raw_text=report.raw_text,
-        location=processed_data.get("location"),
-        latitude=processed_data.get("latitude"),
-        longitude=processed_data.get("longitude"),
-        hazard_type=processed_data.get("hazard_type"),
-        severity=processed_data.get("severity"),
-        confidence_score=processed_data.get("confidence_score"),
-        is_verified=False,  # Reports start as unverified
-        incident_id=incident_id
+        source="app",
+        provider=provider,
+        image_base64=report.image_base64
     )
+    await ingestion_pipeline.run([item], db)
+    if isinstance(item.error, LoadShedError):
+        raise HTTPException(
+            status_code=503,
+            detail="Report intake is overloaded, please retry shortly",
+            headers={"Retry-After": "30"}
+        )
+    if item.error is not None:
+        raise item.error
     
-    db.add(db_report)
-    db.commit()
-    db.refresh(db_report)
-    
-    # Broadcast via WebSocket
-    await broadcast_new_report({
-        "id": db_report.id,
-        "raw_text": db_report.raw_text,
-        "location": db_report.location,
-        "latitude": db_report.latitude,
-        "longitude": db_report.longitude,
-        "hazard_type": db_report.hazard_type,
-        "severity": db_report.severity,
-        "confidence_score": db_report.confidence_score,
-        "timestamp": db_report.timestamp.isoformat() if db_report.timestamp else None,
-        "is_verified": db_report.is_verified
-    })
-    
-    return db_report
+    return item.report
+
+
+# Columns selected by the list fast path (see app.core.serialization)
+REPORT_COLUMNS = schema_columns(Report, ReportRead)
+INCIDENT_COLUMNS = schema_columns(Incident, IncidentRead, exclude=("reports",))
+RESOURCE_COLUMNS = schema_columns(Resource, ResourceRead)
 
 
 @router.get("/reports/", response_model=List[ReportRead])
 async def get_reports(
-    skip: int = 0, 
-    limit: int = 100, 
+    request: Request,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0, deprecated=True),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     language: str = "en",
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
-    Get all processed reports from the database.
+    Get processed reports, newest first.
     
     Args:
-        skip: Number of records to skip
+        cursor: Opaque cursor from the previous page's X-Next-Cursor header
+        skip: Offset paging, only used without a cursor (slow on deep pages)
         limit: Maximum number of records to return
         language: Language code for translations (en, es, fr)
     """
-    reports = db.query(Report).offset(skip).limit(limit).all()
+    stmt = keyset_page(select(*REPORT_COLUMNS), Report.timestamp, Report.id, cursor, limit)
+    if skip and not cursor:
+        stmt = stmt.offset(skip)
+    rows, next_cursor = split_page((await db.execute(stmt)).all(), limit)
+    reports = rows_to_dicts(rows, REPORT_COLUMNS)
+    total = await cached_total(db, "reports", select(Report.id))
     
     # Optionally translate if language is specified
     if language != "en":
         from app.services.i18n import translate_hazard_type, translate_severity
         for report in reports:
-            if hasattr(report, 'hazard_type') and report.hazard_type:
-                # Note: This modifies the report object, might want to create a new response model
+            if report.get('hazard_type'):
+                # Note: translations are not applied to the response yet
                 pass
     
-    return reports
+    response = JSONBytesResponse(reports)
+    set_page_headers(response, request, next_cursor, total)
+    return response
+
+
+@router.get("/reports/search/", response_model=List[ReportRead])
+async def search_reports(
+    q: str = Query(..., min_length=1, max_length=200),
+    hazard_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    bbox: Optional[str] = None,
+    sort: str = Query("relevance", pattern="^(relevance|recent)$"),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Full-text search over report text and location, best match first
+    (or newest first with sort=recent, which stays fast for common words).
+
+    Args:
+        q: Words to match (all required), "quoted phrases" and prefix* terms
+        hazard_type: Filter by hazard type
+        since: Only reports at or after this time
+        until: Only reports before this time
+        bbox: Bounding box "min_lon,min_lat,max_lon,max_lat"
+        sort: "relevance" or "recent"
+        limit: Maximum number of records to return
+    """
+    box = None
+    if bbox:
+        try:
+            box = parse_bbox(bbox)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="bbox must be min_lon,min_lat,max_lon,max_lat")
+    rows = await search.search_reports(
+        db, q, REPORT_COLUMNS,
+        hazard_type=hazard_type, since=since, until=until, bbox=box, sort=sort, limit=limit
+    )
+    return JSONBytesResponse(rows_to_dicts(rows, REPORT_COLUMNS))
 
 
 @router.get("/reports/{report_id}", response_model=ReportRead)
-async def get_report(report_id: int, db: Session = Depends(get_db)):
+async def get_report(report_id: int, db: AsyncSession = Depends(get_read_db)):
     """
     Get a specific report by ID.
     """
-    report = db.query(Report).filter(Report.id == report_id).first()
+    report = await db.get(Report, report_id) or await db.get(ArchivedReport, report_id)
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
     return report
 
 
+# Nested reports returned per incident (newest first)
+NESTED_REPORTS_DEFAULT = 20
+NESTED_REPORTS_MAX = 200
+
+
+async def _attach_reports(
+    db: AsyncSession,
+    incidents: List[dict],
+    reports_limit: int,
+    before_id: Optional[int] = None
+) -> None:
+    """
+    Fill each incident dict's "reports" with at most reports_limit newest
+    reports, using one query regardless of how many incidents there are
+    (report_count is a column on the incident). The report archive is only
+    read when one of the incidents has archived reports.
+
+    Args:
+        db: Database session
+        incidents: Projected incident rows (dicts) to fill in
+        reports_limit: Max reports per incident (0 = summary, no reports)
+        before_id: Only include reports with a lower id (nested cursor)
+    """
+    ids = [incident["id"] for incident in incidents]
+    nested = {incident_id: [] for incident_id in ids}
+    source = reports_source(any(incident.get("archived_at") for incident in incidents))
+    if ids and reports_limit > 0:
+        filters = [source.c.incident_id.in_(ids)]
+        if before_id is not None:
+            filters.append(source.c.id < before_id)
+        ranked = (
+            select(
+                source.c.id.label("id"),
+                func.row_number().over(
+                    partition_by=source.c.incident_id,
+                    order_by=source.c.id.desc()
+                ).label("rank")
+            )
+            .filter(*filters)
+            .subquery()
+        )
+        result = await db.execute(
+            select(source.c.incident_id, *[source.c[column.key] for column in REPORT_COLUMNS])
+            .join(ranked, source.c.id == ranked.c.id)
+            .filter(ranked.c.rank <= reports_limit)
+            .order_by(source.c.id.desc())
+        )
+        for row in result.all():
+            nested[row[0]].append(dict(zip((c.key for c in REPORT_COLUMNS), row[1:])))
+
+    for incident in incidents:
+        incident["reports"] = nested[incident["id"]]
+
+
 @router.get("/incidents/", response_model=List[IncidentRead])
-async def get_incidents(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_incidents(
+    request: Request,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0, deprecated=True),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    summary: bool = False,
+    reports_limit: int = Query(NESTED_REPORTS_DEFAULT, ge=0, le=NESTED_REPORTS_MAX),
+    db: AsyncSession = Depends(get_read_db)
+):
     """
-    Get all active incidents (clustered reports).
+    Get active incidents (clustered reports), newest first, paged by cursor.
+
+    Each incident embeds at most reports_limit of its newest reports, and
+    report_count gives the full number. summary=true skips nested reports.
     """
-    incidents = db.query(Incident).filter(
-        Incident.is_active == True
-    ).offset(skip).limit(limit).all()
-    return incidents
+    active = Incident.is_active == True
+    stmt = keyset_page(select(*INCIDENT_COLUMNS).filter(active), Incident.created_at, Incident.id, cursor, limit)
+    if skip and not cursor:
+        stmt = stmt.offset(skip)
+    rows, next_cursor = split_page((await db.execute(stmt)).all(), limit)
+    incidents = rows_to_dicts(rows, INCIDENT_COLUMNS)
+    total = await cached_total(db, "incidents:active", select(Incident.id).filter(active))
+    await _attach_reports(db, incidents, 0 if summary else reports_limit)
+
+    response = JSONBytesResponse(incidents)
+    set_page_headers(response, request, next_cursor, total)
+    return response
 
 
 @router.get("/incidents/{incident_id}", response_model=IncidentRead)
-async def get_incident(incident_id: int, db: Session = Depends(get_db)):
+async def get_incident(
+    incident_id: int,
+    summary: bool = False,
+    reports_limit: int = Query(NESTED_REPORTS_DEFAULT, ge=0, le=NESTED_REPORTS_MAX),
+    reports_before_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get a specific incident by ID with its newest reports.
+
+    Page through older reports by passing the lowest report id received
+    as reports_before_id.
+    """
+    rows = (await db.execute(select(*INCIDENT_COLUMNS).filter(Incident.id == incident_id))).all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="Incident not found")
+    incidents = rows_to_dicts(rows, INCIDENT_COLUMNS)
+    await _attach_reports(db, incidents, 0 if summary else reports_limit, reports_before_id)
+    return JSONBytesResponse(incidents[0])
+
+
+@router.post("/incidents/{incident_id}/alerts/sms/", status_code=202)
+async def send_incident_sms_alert(
+    incident_id: int,
+    alert: SMSAlertRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_responder)
+):
     """
-    Get a specific incident by ID with all associated reports.
+    Fan out an SMS alert about an incident to many recipients (responders
+    and admins only). Sends are pooled, concurrent and rate limited per
+    sender number, and run in the background: the response is a job to
+    poll at GET /incidents/{incident_id}/alerts/sms/{job_id}.
     """
-    incident = db.query(Incident).filter(Incident.id == incident_id).first()
+    incident = await db.get(Incident, incident_id)
     if not incident:
         raise HTTPException(status_code=404, detail="Incident not found")
-    return incident
+    
+    message = alert.message or (
+        f"CrisisFlow ALERT: {incident.severity or 'Unknown'} severity "
+        f"{incident.hazard_type or 'hazard'} near {incident.location or 'your area'}. "
+        "Avoid this area and follow official instructions."
+    )
+    
+    fanout = SMSAlertFanout(dry_run=True) if alert.dry_run else get_alert_fanout()
+    return alert_jobs.start(incident_id, fanout, alert.recipients, message, requested_by=current_user.id)
+
+
+@router.get("/incidents/{incident_id}/alerts/sms/{job_id}")
+async def get_incident_sms_alert(
+    incident_id: int,
+    job_id: str,
+    current_user: User = Depends(get_current_responder)
+):
+    """Status of an SMS alert job, with the send summary once it has finished"""
+    job = alert_jobs.get(job_id)
+    if not job or job["incident_id"] != incident_id:
+        raise HTTPException(status_code=404, detail="Alert job not found")
+    return job
 
 
 # Resource Tracking Endpoints
 @router.post("/resources/", response_model=ResourceRead, status_code=201)
 async def create_resource(
     resource: ResourceCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user)
 ):
     """Create a new resource (needed or available)"""
@@ -217,21 +332,26 @@ async def create_resource(
     )
     
     db.add(db_resource)
-    db.commit()
-    db.refresh(db_resource)
+    await db.commit()
+    invalidate_dashboard_stats()
+    invalidate_resource_summary()
+    await db.refresh(db_resource)
     
     return db_resource
 
 
 @router.get("/resources/", response_model=List[ResourceRead])
 async def get_resources(
+    request: Request,
     status: Optional[str] = None,
     resource_type: Optional[str] = None,
     incident_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get all resources, optionally filtered by status, type, or incident"""
-    query = db.query(Resource)
+    """Get resources newest first, optionally filtered by status, type, or incident"""
+    query = select(*RESOURCE_COLUMNS)
     
     if status:
         query = query.filter(Resource.status == status)
@@ -240,14 +360,54 @@ async def get_resources(
     if incident_id:
         query = query.filter(Resource.incident_id == incident_id)
     
-    resources = query.order_by(Resource.created_at.desc()).all()
-    return resources
+    stmt = keyset_page(query, Resource.created_at, Resource.id, cursor, limit)
+    rows, next_cursor = split_page((await db.execute(stmt)).all(), limit)
+    total = await cached_total(
+        db,
+        ("resources", status, resource_type, incident_id),
+        query.with_only_columns(Resource.id)
+    )
+    response = JSONBytesResponse(rows_to_dicts(rows, RESOURCE_COLUMNS))
+    set_page_headers(response, request, next_cursor, total)
+    return response
+
+
+@router.get("/resources/matches/")
+async def get_resource_matches(
+    bbox: Optional[str] = None,
+    resource_type: Optional[str] = None,
+    incident_id: Optional[int] = None,
+    k: int = Query(MATCH_DEFAULT_K, ge=1, le=50),
+    max_distance_km: float = Query(MATCH_MAX_DISTANCE_KM, gt=0, le=1000),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Suggest available resources for needed ones, nearest first
+    
+    Each need is matched to one available resource of the same type and
+    unit with enough quantity left; nothing is changed in the database.
+    
+    Args:
+        bbox: "min_lon,min_lat,max_lon,max_lat" region of needs (optional)
+        resource_type: Filter by resource type (optional)
+        incident_id: Only needs for this incident (optional)
+        k: Nearest candidates considered per need
+        max_distance_km: Longest allowed need-to-resource distance
+    """
+    try:
+        bounds = parse_bbox(bbox) if bbox else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await match_resources(
+        db, bbox=bounds, resource_type=resource_type, incident_id=incident_id,
+        k=k, max_distance_km=max_distance_km
+    )
 
 
 @router.get("/resources/{resource_id}", response_model=ResourceRead)
-async def get_resource(resource_id: int, db: Session = Depends(get_db)):
+async def get_resource(resource_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get a specific resource by ID"""
-    resource = db.query(Resource).filter(Resource.id == resource_id).first()
+    resource = await db.get(Resource, resource_id)
     if not resource:
         raise HTTPException(status_code=404, detail="Resource not found")
     return resource
@@ -257,68 +417,105 @@ async def get_resource(resource_id: int, db: Session = Depends(get_db)):
 async def update_resource(
     resource_id: int,
     resource_update: ResourceUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user)
 ):
     """Update a resource"""
-    db_resource = db.query(Resource).filter(Resource.id == resource_id).first()
+    db_resource = await db.get(Resource, resource_id)
     if not db_resource:
         raise HTTPException(status_code=404, detail="Resource not found")
     
     # Update fields
     update_data = resource_update.dict(exclude_unset=True)
+    expected_version = update_data.pop("version", None)
+    if expected_version is not None and expected_version != db_resource.version:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "message": "Resource was modified since it was read, reload and retry",
+                "expected_version": expected_version,
+                "current_version": db_resource.version
+            }
+        )
     for field, value in update_data.items():
         setattr(db_resource, field, value)
     
-    db.commit()
-    db.refresh(db_resource)
+    try:
+        await db.commit()
+    except StaleDataError:
+        # The version column moved since db.get: someone else updated it first
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Resource was modified concurrently, reload and retry")
+    invalidate_dashboard_stats()
+    invalidate_resource_summary()
+    await db.refresh(db_resource)
     
     return db_resource
 
 
+@router.patch("/resources/")
+async def update_resources(
+    bulk_update: ResourceBulkUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[User] = Depends(get_current_user)
+):
+    """
+    Update many resources in one transaction (e.g. a field team marking
+    a batch of deliveries DELIVERED).
+
+    Each item carries the resource id, the version it was read at and the
+    fields to change. Items whose version has moved on are returned as
+    conflicts instead of overwriting the newer change; the rest are applied.
+    With atomic set, any conflict rejects the whole batch with a 409.
+
+    Returns:
+        {"updated": [{"id", "version"}], "conflicts": [...], "applied": bool}
+    """
+    try:
+        result = await bulk_update_resources(db, bulk_update.updates, atomic=bulk_update.atomic)
+    except StaleDataError:
+        raise HTTPException(status_code=409, detail="Resources were modified concurrently, reload and retry")
+    if not result["applied"]:
+        raise HTTPException(status_code=409, detail={"message": "Batch has conflicts", "conflicts": result["conflicts"]})
+    if result["updated"]:
+        invalidate_dashboard_stats()
+        invalidate_resource_summary()
+    return result
+
+
 @router.delete("/resources/{resource_id}", status_code=204)
 async def delete_resource(
     resource_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete a resource (admin only)"""
-    db_resource = db.query(Resource).filter(Resource.id == resource_id).first()
+    db_resource = await db.get(Resource, resource_id)
     if not db_resource:
         raise HTTPException(status_code=404, detail="Resource not found")
     
-    db.delete(db_resource)
-    db.commit()
+    await db.delete(db_resource)
+    await db.commit()
+    invalidate_dashboard_stats()
+    invalidate_resource_summary()
     return None
 
 
 @router.get("/resources/summary/")
-async def get_resource_summary(db: Session = Depends(get_db)):
-    """Get summary of needed vs available resources"""
-    needed = db.query(Resource).filter(Resource.status == "needed").all()
-    available = db.query(Resource).filter(Resource.status == "available").all()
-    
-    needed_by_type = {}
-    available_by_type = {}
-    
-    for resource in needed:
-        rtype = resource.resource_type.value
-        needed_by_type[rtype] = needed_by_type.get(rtype, 0) + resource.quantity
-    
-    for resource in available:
-        rtype = resource.resource_type.value
-        available_by_type[rtype] = available_by_type.get(rtype, 0) + resource.quantity
+async def get_resource_summary(
+    request: Request,
+    incident_id: Optional[int] = None,
+    by_incident: bool = False,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get summary of needed vs available resources
     
-    return {
-        "needed": needed_by_type,
-        "available": available_by_type,
-        "summary": {
-            rtype: {
-                "needed": needed_by_type.get(rtype, 0),
-                "available": available_by_type.get(rtype, 0),
-                "deficit": needed_by_type.get(rtype, 0) - available_by_type.get(rtype, 0)
-            }
-            for rtype in set(list(needed_by_type.keys()) + list(available_by_type.keys()))
-        }
-    }
+    Args:
+        incident_id: Only count resources for this incident (optional)
+        by_incident: Also return a per-incident breakdown
+    """
+    return await resource_summary(
+        db, incident_id=incident_id, by_incident=by_incident, use_cache=not wrote_recently(request)
+    )
 
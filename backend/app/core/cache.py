@@ -0,0 +1,66 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Small in-process cache whose entries expire after ttl_seconds.
+    Least recently used entries are evicted beyond max_entries, or once
+    the summed weight of the entries (e.g. their size) exceeds max_weight.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024, max_weight: Optional[float] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_weight = max_weight
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.weight = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._pop(key)
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def _pop(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.weight -= entry[2]
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None, weight: float = 1):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._pop(key)
+        if self.max_weight is not None and weight > self.max_weight:
+            return  # Would evict everything else and still not fit
+        self._entries[key] = (time.monotonic() + ttl, value, weight)
+        self.weight += weight
+        while len(self._entries) > self.max_entries or (
+            self.max_weight is not None and self.weight > self.max_weight
+        ):
+            _, (_, _, evicted_weight) = self._entries.popitem(last=False)
+            self.weight -= evicted_weight
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drop one entry, or everything when key is None"""
+        if key is None:
+            self._entries.clear()
+            self.weight = 0.0
+        else:
+            self._pop(key)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0
+        }
@@ -0,0 +1,97 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Pages are ordered newest first by (sort column, id) and the cursor encodes
+the last row's pair, so each page is an index range scan instead of an
+OFFSET that re-reads every earlier row. List bodies stay plain JSON arrays;
+the next cursor is returned in the X-Next-Cursor and Link headers.
+"""
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Any, Hashable, List, Optional, Tuple
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import String, func, or_, select, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from app.core.cache import TTLCache
+from app.database import IS_SQLITE
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+# X-Total-Count is recounted at most once per filter set in this window
+TOTAL_COUNT_TTL_SECONDS = float(os.getenv("TOTAL_COUNT_TTL_SECONDS", "30"))
+
+_total_counts = TTLCache(ttl_seconds=TOTAL_COUNT_TTL_SECONDS, max_entries=256)
+
+
+def _sort_key(column):
+    # SQLite stores datetimes as text in more than one format (server
+    # default vs. SQLAlchemy binds) and orders them as text, so the cursor
+    # compares the raw stored value to stay consistent with ORDER BY
+    return type_coerce(column, String) if IS_SQLITE else column
+
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    """Decode a cursor from encode_cursor; raises a 400 if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+        if not IS_SQLITE:
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def keyset_page(stmt: Select, sort_column, id_column, cursor: Optional[str], limit: int) -> Select:
+    """
+    Restrict stmt to the page after cursor, newest first.
+
+    Adds cursor_key/cursor_id columns to each row and fetches limit + 1 rows
+    so split_page can tell whether another page exists.
+    """
+    key = _sort_key(sort_column)
+    stmt = stmt.add_columns(key.label("cursor_key"), id_column.label("cursor_id"))
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        # Equivalent to (key, id) < (sort_value, last_id); the leading
+        # key <= bound lets SQLite seek the index instead of scanning it
+        stmt = stmt.filter(key <= sort_value, or_(key < sort_value, id_column < last_id))
+    return stmt.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1)
+
+
+def split_page(rows: List[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Trim the extra row fetched by keyset_page and build the next cursor"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].cursor_key, rows[-1].cursor_id)
+
+
+async def cached_total(db: AsyncSession, key: Hashable, stmt: Select) -> int:
+    """
+    Row count for a filtered list, cached for TOTAL_COUNT_TTL_SECONDS so
+    paging through results does not run COUNT(*) on every page.
+    """
+    total = _total_counts.get(key)
+    if total is None:
+        total = await db.scalar(select(func.count()).select_from(stmt.order_by(None).subquery()))
+        _total_counts.set(key, total)
+    return total
+
+
+def set_page_headers(response: Response, request: Request, next_cursor: Optional[str], total: int):
+    response.headers["X-Total-Count"] = str(total)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+        next_url = request.url.include_query_params(cursor=next_cursor)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
@@ -4,9 +4,10 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
-from app.models.user import User
+from app.models.user import User, UserRole
 import os
 
 # Secret key for JWT (MUST be in environment variable)
@@ -46,9 +47,9 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-def get_current_user(
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     """Get the current authenticated user from JWT token"""
     credentials_exception = HTTPException(
@@ -64,7 +65,7 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).filter(User.id == user_id))
     if user is None:
         raise credentials_exception
     if not user.is_active:
@@ -78,3 +79,23 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
+
+def require_roles(*roles: UserRole):
+    """
+    Dependency factory allowing only active users with one of `roles`.
+
+    Args:
+        roles: Roles that may use the endpoint
+
+    Returns:
+        Dependency returning the current user, or raising 403 for other roles
+    """
+    def check_role(current_user: User = Depends(get_current_active_user)) -> User:
+        if current_user.role not in roles:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not permitted for this role")
+        return current_user
+    return check_role
+
+
+# Responder tooling (e.g. SMS alert fan-out) is closed to citizen accounts
+get_current_responder = require_roles(UserRole.RESPONDER, UserRole.ADMIN)
@@ -1,32 +1,179 @@
-from sqlalchemy import create_engine
+import itertools
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
+from app.middleware.read_your_writes import wrote_recently
 
 load_dotenv()
 
 # Database URL - defaults to SQLite
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./crisisflow.db")
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
 
-# Create engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+# SQLite profile - WAL lets readers run alongside the single writer
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    # Negative values are KiB, so -65536 is a 64 MB page cache per connection
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+}
 
-# Session local
+# Server database profile (Postgres etc.)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# Optional read replicas (comma-separated URLs) used by read-only routes
+READ_DATABASE_URLS = [url.strip() for url in os.getenv("READ_DATABASE_URLS", "").split(",") if url.strip()]
+
+
+def _async_database_url(url: str) -> str:
+    """Map a sync database URL to its async driver (aiosqlite / asyncpg)"""
+    if url.startswith("sqlite:///"):
+        return url.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+asyncpg://", 1)
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_database_url(DATABASE_URL))
+
+
+def engine_options(url: str = DATABASE_URL) -> dict:
+    """Engine keyword arguments for the configured database profile"""
+    if url.startswith("sqlite"):
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply the SQLite profile to every new connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+# Sync engine - used for schema creation and offline scripts
+engine = create_engine(DATABASE_URL, **engine_options())
+
+# Session local (sync)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine - used by all API routes so queries never block the event loop
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options())
+
+# Read replicas; without any, reads use the primary
+read_engines = [
+    create_async_engine(_async_database_url(url), **engine_options(url))
+    for url in READ_DATABASE_URLS
+]
+
+if IS_SQLITE:
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+for url, read_engine in zip(READ_DATABASE_URLS, read_engines):
+    if url.startswith("sqlite"):
+        event.listen(read_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
+
+def _async_sessionmaker(bind):
+    # Objects stay usable after commit; async sessions cannot lazy-load expired attributes
+    return async_sessionmaker(bind, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+AsyncSessionLocal = _async_sessionmaker(async_engine)
+ReadSessionLocals = [_async_sessionmaker(read_engine) for read_engine in read_engines]
+_read_sessions = itertools.cycle(ReadSessionLocals or [AsyncSessionLocal])
+
+
+def ReadSessionLocal() -> AsyncSession:
+    """Session on the next read replica (round robin), or the primary"""
+    return next(_read_sessions)()
+
 # Base class for models
 Base = declarative_base()
 
 
-def get_db():
-    """Dependency to get database session"""
-    db = SessionLocal()
-    try:
+async def get_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
+
+async def get_read_db(request: Request):
+    """
+    Dependency for read-only routes: a read replica session, except for
+    clients that wrote within READ_YOUR_WRITES_SECONDS, which stay on the
+    primary so they see their own writes.
+    """
+    session_factory = AsyncSessionLocal if wrote_recently(request) else ReadSessionLocal
+    async with session_factory() as db:
+        yield db
+
+
+async def check_database_settings() -> dict:
+    """
+    Read back the effective engine settings from a live connection.
+
+    Returns:
+        Dictionary of settings; "mismatches" lists SQLite pragmas the
+        database did not accept (e.g. WAL on an in-memory database)
+    """
+    settings = {
+        "dialect": async_engine.dialect.name,
+        "driver": async_engine.dialect.driver,
+        "read_replicas": len(read_engines)
+    }
+    async with async_engine.connect() as conn:
+        if IS_SQLITE:
+            mismatches = []
+            for name, expected in SQLITE_PRAGMAS.items():
+                actual = (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+                settings[name] = actual
+                if not _pragma_matches(name, expected, actual):
+                    mismatches.append(name)
+            settings["mismatches"] = mismatches
+        else:
+            settings["server_version"] = (await conn.execute(text("SELECT version()"))).scalar()
+            settings.update({
+                "pool_size": DB_POOL_SIZE,
+                "max_overflow": DB_MAX_OVERFLOW,
+                "pool_timeout": DB_POOL_TIMEOUT,
+                "pool_recycle": DB_POOL_RECYCLE,
+                "pool_pre_ping": DB_POOL_PRE_PING,
+            })
+    return settings
+
+
+_SYNCHRONOUS_LEVELS = {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3}
+_TEMP_STORE_LEVELS = {"DEFAULT": 0, "FILE": 1, "MEMORY": 2}
+
+
+def _pragma_matches(name: str, expected, actual) -> bool:
+    """Compare a configured pragma with what SQLite reports back"""
+    expected = str(expected).upper()
+    if name == "synchronous":
+        expected = str(_SYNCHRONOUS_LEVELS.get(expected, expected))
+    elif name == "temp_store":
+        expected = str(_TEMP_STORE_LEVELS.get(expected, expected))
+    return str(actual).upper() == expected
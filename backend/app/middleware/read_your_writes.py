@@ -0,0 +1,36 @@
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+import hashlib
+import os
+from app.core.cache import TTLCache
+
+# How long a client's reads stay on the primary after it writes
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+_recent_writers = TTLCache(ttl_seconds=READ_YOUR_WRITES_SECONDS, max_entries=10000)
+
+
+def client_key(request: Request) -> str:
+    """Identify a client by its bearer token, falling back to its IP"""
+    identity = request.headers.get("authorization") or (request.client.host if request.client else "unknown")
+    return hashlib.sha1(identity.encode()).hexdigest()
+
+
+def wrote_recently(request: Request) -> bool:
+    """True if this client made a successful write within the stickiness window"""
+    return _recent_writers.get(client_key(request)) is not None
+
+
+class ReadYourWritesMiddleware(BaseHTTPMiddleware):
+    """
+    Remember clients that just wrote, so their following reads go to the
+    primary instead of a read replica that may not have caught up yet.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            _recent_writers.set(client_key(request), True)
+        return response
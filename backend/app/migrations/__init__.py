@@ -0,0 +1,104 @@
+"""
+Versioned schema migrations.
+
+`Base.metadata.create_all` only creates missing tables, so changes to
+existing tables (new indexes, columns) are shipped as numbered migrations.
+Each migration module defines VERSION, NAME and `upgrade(conn)`, and is
+listed in MIGRATIONS. Applied versions are recorded in schema_migrations;
+`run_migrations` applies the pending ones in order, each in its own
+transaction. Migrations must be idempotent (IF NOT EXISTS etc.) because
+on a fresh database create_all already builds the current schema.
+"""
+from datetime import datetime
+from typing import Dict, List
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from app.migrations import (
+    m0001_hot_path_indexes, m0002_report_archive, m0003_incident_counters, m0004_report_search,
+    m0005_hourly_rollups, m0006_resource_version, m0007_report_ingest_seq,
+    m0008_cursor_page_indexes, m0009_archive_search
+)
+
+MIGRATIONS = [
+    m0001_hot_path_indexes,
+    m0002_report_archive,
+    m0003_incident_counters,
+    m0004_report_search,
+    m0005_hourly_rollups,
+    m0006_resource_version,
+    m0007_report_ingest_seq,
+    m0008_cursor_page_indexes,
+    m0009_archive_search,
+]
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def applied_versions(conn: Connection) -> Dict[int, datetime]:
+    """Versions already recorded in schema_migrations"""
+    rows = conn.execute(select(schema_migrations.c.version, schema_migrations.c.applied_at))
+    return {version: applied_at for version, applied_at in rows}
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """
+    Create missing tables, then apply pending migrations in version order.
+
+    Args:
+        engine: Sync engine to migrate
+
+    Returns:
+        Versions applied by this call
+    """
+    from app.database import Base
+    import app.models  # noqa: F401 - register every table on Base.metadata
+
+    Base.metadata.create_all(bind=engine)
+    _metadata.create_all(bind=engine)
+
+    with engine.connect() as conn:
+        done = applied_versions(conn)
+
+    applied = []
+    for migration in sorted(MIGRATIONS, key=lambda m: m.VERSION):
+        if migration.VERSION in done:
+            continue
+        try:
+            with engine.begin() as conn:
+                migration.upgrade(conn)
+                conn.execute(schema_migrations.insert().values(
+                    version=migration.VERSION,
+                    name=migration.NAME,
+                    applied_at=datetime.utcnow()
+                ))
+        except IntegrityError:
+            # Another worker recorded it first; upgrades are idempotent
+            continue
+        print(f"Applied migration {migration.VERSION:04d} {migration.NAME}")
+        applied.append(migration.VERSION)
+    return applied
+
+
+def migration_status(engine: Engine) -> List[dict]:
+    """Applied/pending state of every known migration"""
+    done = {}
+    if inspect(engine).has_table("schema_migrations"):
+        with engine.connect() as conn:
+            done = applied_versions(conn)
+    return [
+        {
+            "version": m.VERSION,
+            "name": m.NAME,
+            "applied_at": done.get(m.VERSION)
+        }
+        for m in sorted(MIGRATIONS, key=lambda m: m.VERSION)
+    ]
+
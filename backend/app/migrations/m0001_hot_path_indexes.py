@@ -0,0 +1,26 @@
+"""Indexes for the filters and sort keys used by list, analytics and clustering queries"""
+from sqlalchemy.engine import Connection
+from app.migrations.ops import create_index
+
+VERSION = 1
+NAME = "hot_path_indexes"
+
+INDEXES = [
+    # Historical analytics, dashboard 24h counts, WebSocket snapshot ordering
+    ("ix_reports_timestamp", "reports", ["timestamp"]),
+    ("ix_reports_incident_id", "reports", ["incident_id"]),
+    ("ix_reports_hazard_type", "reports", ["hazard_type"]),
+    # Active incident listing and find_nearby_incident
+    ("ix_incidents_is_active_hazard_type", "incidents", ["is_active", "hazard_type"]),
+    ("ix_incidents_created_at", "incidents", ["created_at"]),
+    # Resource filters and newest-first listing
+    ("ix_resources_status", "resources", ["status"]),
+    ("ix_resources_resource_type", "resources", ["resource_type"]),
+    ("ix_resources_incident_id", "resources", ["incident_id"]),
+    ("ix_resources_created_at", "resources", ["created_at"]),
+]
+
+
+def upgrade(conn: Connection):
+    for name, table, columns in INDEXES:
+        create_index(conn, name, table, columns)
@@ -0,0 +1,34 @@
+"""Cold-storage table for archived reports and an archival marker on incidents"""
+from sqlalchemy import Boolean, Column, DateTime, Float, Integer, MetaData, String, Table
+from sqlalchemy.engine import Connection
+from app.migrations.ops import add_column, create_index
+
+VERSION = 2
+NAME = "report_archive"
+
+# Frozen copy of the table as of this migration
+_metadata = MetaData()
+reports_archive = Table(
+    "reports_archive",
+    _metadata,
+    Column("id", Integer, primary_key=True, autoincrement=False),
+    Column("raw_text", String, nullable=False),
+    Column("location", String, nullable=True),
+    Column("latitude", Float, nullable=True),
+    Column("longitude", Float, nullable=True),
+    Column("hazard_type", String, nullable=True),
+    Column("severity", String, nullable=True),
+    Column("confidence_score", Float, nullable=True),
+    Column("timestamp", DateTime(timezone=True), nullable=False),
+    Column("is_verified", Boolean, nullable=False),
+    Column("incident_id", Integer, nullable=True),
+    Column("user_id", Integer, nullable=True),
+    Column("archived_at", DateTime(timezone=True), nullable=False),
+)
+
+
+def upgrade(conn: Connection):
+    reports_archive.create(conn, checkfirst=True)
+    create_index(conn, "ix_reports_archive_timestamp", "reports_archive", ["timestamp"])
+    create_index(conn, "ix_reports_archive_incident_id", "reports_archive", ["incident_id"])
+    add_column(conn, "incidents", Column("archived_at", DateTime(timezone=True), nullable=True))
@@ -0,0 +1,36 @@
+"""Denormalized report counters and last-activity columns on incidents"""
+from sqlalchemy import Column, DateTime, Integer, String, text
+from sqlalchemy.engine import Connection
+from app.migrations.ops import add_column
+
+VERSION = 3
+NAME = "incident_counters"
+
+# Hot and archived reports together, so archived incidents keep their totals
+_ALL_REPORTS = (
+    "(SELECT id, incident_id, severity, timestamp FROM reports "
+    "UNION ALL SELECT id, incident_id, severity, timestamp FROM reports_archive)"
+)
+
+
+def upgrade(conn: Connection):
+    add_column(conn, "incidents", Column("report_count", Integer, server_default="0", nullable=False))
+    add_column(conn, "incidents", Column("last_report_at", DateTime(timezone=True), nullable=True))
+    add_column(conn, "incidents", Column("latest_severity", String, nullable=True))
+    for severity in ("low", "medium", "high"):
+        add_column(conn, "incidents", Column(f"severity_{severity}_count", Integer, server_default="0", nullable=False))
+
+    # Backfill from existing reports
+    conn.execute(text(f"""
+        UPDATE incidents SET
+            report_count = (SELECT COUNT(*) FROM {_ALL_REPORTS} r WHERE r.incident_id = incidents.id),
+            severity_low_count = (SELECT COUNT(*) FROM {_ALL_REPORTS} r
+                                  WHERE r.incident_id = incidents.id AND r.severity = 'Low'),
+            severity_medium_count = (SELECT COUNT(*) FROM {_ALL_REPORTS} r
+                                     WHERE r.incident_id = incidents.id AND r.severity = 'Medium'),
+            severity_high_count = (SELECT COUNT(*) FROM {_ALL_REPORTS} r
+                                   WHERE r.incident_id = incidents.id AND r.severity = 'High'),
+            last_report_at = (SELECT MAX(r.timestamp) FROM {_ALL_REPORTS} r WHERE r.incident_id = incidents.id),
+            latest_severity = (SELECT r.severity FROM {_ALL_REPORTS} r
+                               WHERE r.incident_id = incidents.id ORDER BY r.id DESC LIMIT 1)
+    """))
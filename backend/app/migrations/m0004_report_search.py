@@ -0,0 +1,55 @@
+"""
+Full-text index over report raw_text and location.
+
+SQLite: an external-content FTS5 table (reports_fts) kept in step with
+`reports` by triggers. Postgres: a GIN index on the tsvector expression
+used by app.services.search.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+VERSION = 4
+NAME = "report_search"
+
+SQLITE_STATEMENTS = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5(
+        raw_text, location,
+        content='reports', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS reports_fts_insert AFTER INSERT ON reports BEGIN
+        INSERT INTO reports_fts(rowid, raw_text, location) VALUES (new.id, new.raw_text, new.location);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS reports_fts_delete AFTER DELETE ON reports BEGIN
+        INSERT INTO reports_fts(reports_fts, rowid, raw_text, location)
+        VALUES ('delete', old.id, old.raw_text, old.location);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS reports_fts_update AFTER UPDATE OF raw_text, location ON reports BEGIN
+        INSERT INTO reports_fts(reports_fts, rowid, raw_text, location)
+        VALUES ('delete', old.id, old.raw_text, old.location);
+        INSERT INTO reports_fts(rowid, raw_text, location) VALUES (new.id, new.raw_text, new.location);
+    END""",
+    # Index the reports that already exist
+    "INSERT INTO reports_fts(reports_fts) VALUES ('rebuild')",
+]
+
+# Must match SEARCH_DOCUMENT in app.services.search for the planner to use it
+POSTGRES_STATEMENTS = [
+    """CREATE INDEX IF NOT EXISTS ix_reports_search ON reports USING GIN (
+        to_tsvector('english', coalesce(raw_text, '') || ' ' || coalesce(location, ''))
+    )""",
+]
+
+
+def upgrade(conn: Connection):
+    if conn.dialect.name == "sqlite":
+        fts5 = conn.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar()
+        if not fts5:
+            # Search falls back to LIKE scans on SQLite builds without FTS5
+            print("SQLite lacks FTS5; report search will not use a full-text index")
+            return
+        for statement in SQLITE_STATEMENTS:
+            conn.execute(text(statement))
+    elif conn.dialect.name == "postgresql":
+        for statement in POSTGRES_STATEMENTS:
+            conn.execute(text(statement))
@@ -0,0 +1,45 @@
+"""Hourly rollup tables for analytics, backfilled from existing rows"""
+from sqlalchemy import Column, DateTime, Float, Integer, MetaData, String, Table
+from sqlalchemy.engine import Connection
+
+VERSION = 5
+NAME = "hourly_rollups"
+
+# Frozen copies of the tables as of this migration
+_metadata = MetaData()
+report_rollups_hourly = Table(
+    "report_rollups_hourly",
+    _metadata,
+    Column("bucket", DateTime, primary_key=True),
+    Column("hazard_type", String, primary_key=True),
+    Column("severity", String, primary_key=True),
+    Column("report_count", Integer, nullable=False),
+    Column("confidence_sum", Float, nullable=False),
+)
+report_cell_rollups_hourly = Table(
+    "report_cell_rollups_hourly",
+    _metadata,
+    Column("bucket", DateTime, primary_key=True),
+    Column("hazard_type", String, primary_key=True),
+    Column("cell", String, primary_key=True),
+    Column("report_count", Integer, nullable=False),
+    Column("confidence_sum", Float, nullable=False),
+)
+incident_rollups_hourly = Table(
+    "incident_rollups_hourly",
+    _metadata,
+    Column("bucket", DateTime, primary_key=True),
+    Column("hazard_type", String, primary_key=True),
+    Column("incident_count", Integer, nullable=False),
+    Column("active_count", Integer, nullable=False),
+    Column("active_witness_sum", Integer, nullable=False),
+)
+
+
+def upgrade(conn: Connection):
+    from app.services.rollups import rebuild_rollups
+
+    report_rollups_hourly.create(conn, checkfirst=True)
+    report_cell_rollups_hourly.create(conn, checkfirst=True)
+    incident_rollups_hourly.create(conn, checkfirst=True)
+    rebuild_rollups(conn)
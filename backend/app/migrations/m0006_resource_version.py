@@ -0,0 +1,12 @@
+"""Version counter on resources for optimistic concurrency on updates"""
+from sqlalchemy import Column, Integer
+from sqlalchemy.engine import Connection
+from app.migrations.ops import add_column
+
+VERSION = 6
+NAME = "resource_version"
+
+
+def upgrade(conn: Connection):
+    # Existing rows start at version 1, the same as newly created ones
+    add_column(conn, "resources", Column("version", Integer, server_default="1", nullable=False))
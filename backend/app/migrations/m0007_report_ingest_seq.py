@@ -0,0 +1,15 @@
+"""Journal seq on reports, so replaying the ingestion journal is idempotent"""
+from sqlalchemy import Column, Integer
+from sqlalchemy.engine import Connection
+from app.migrations.ops import add_column, create_index
+
+VERSION = 7
+NAME = "report_ingest_seq"
+
+
+def upgrade(conn: Connection):
+    add_column(conn, "reports", Column("ingest_seq", Integer, nullable=True))
+    add_column(conn, "reports_archive", Column("ingest_seq", Integer, nullable=True))
+    # NULLs (reports from before the journal, or with it disabled) never clash
+    create_index(conn, "ix_reports_ingest_seq", "reports", ["ingest_seq"], unique=True)
+    create_index(conn, "ix_reports_archive_ingest_seq", "reports_archive", ["ingest_seq"])
@@ -0,0 +1,18 @@
+"""Composite indexes so filtered cursor pages are read in index order instead of sorted"""
+from sqlalchemy.engine import Connection
+from app.migrations.ops import create_index
+
+VERSION = 8
+NAME = "cursor_page_indexes"
+
+INDEXES = [
+    # GET /incidents/: is_active = 1 ORDER BY created_at DESC, id DESC
+    ("ix_incidents_is_active_created_at", "incidents", ["is_active", "created_at", "id"]),
+    # GET /resources/?status=: status = ? ORDER BY created_at DESC, id DESC
+    ("ix_resources_status_created_at", "resources", ["status", "created_at", "id"]),
+]
+
+
+def upgrade(conn: Connection):
+    for name, table, columns in INDEXES:
+        create_index(conn, name, table, columns)
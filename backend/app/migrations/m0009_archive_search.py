@@ -0,0 +1,55 @@
+"""
+Full-text index over archived report raw_text and location.
+
+Mirrors migration 0004 for `reports_archive`, so search still finds
+reports after the archiver moves them: an external-content FTS5 table
+(reports_archive_fts) kept in step by triggers on SQLite, a GIN index on
+the same tsvector expression on Postgres.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+VERSION = 9
+NAME = "archive_search"
+
+SQLITE_STATEMENTS = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS reports_archive_fts USING fts5(
+        raw_text, location,
+        content='reports_archive', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS reports_archive_fts_insert AFTER INSERT ON reports_archive BEGIN
+        INSERT INTO reports_archive_fts(rowid, raw_text, location) VALUES (new.id, new.raw_text, new.location);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS reports_archive_fts_delete AFTER DELETE ON reports_archive BEGIN
+        INSERT INTO reports_archive_fts(reports_archive_fts, rowid, raw_text, location)
+        VALUES ('delete', old.id, old.raw_text, old.location);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS reports_archive_fts_update AFTER UPDATE OF raw_text, location ON reports_archive BEGIN
+        INSERT INTO reports_archive_fts(reports_archive_fts, rowid, raw_text, location)
+        VALUES ('delete', old.id, old.raw_text, old.location);
+        INSERT INTO reports_archive_fts(rowid, raw_text, location) VALUES (new.id, new.raw_text, new.location);
+    END""",
+    # Index the reports archived before this migration
+    "INSERT INTO reports_archive_fts(reports_archive_fts) VALUES ('rebuild')",
+]
+
+# Must match search_document("reports_archive") in app.services.search
+POSTGRES_STATEMENTS = [
+    """CREATE INDEX IF NOT EXISTS ix_reports_archive_search ON reports_archive USING GIN (
+        to_tsvector('english', coalesce(raw_text, '') || ' ' || coalesce(location, ''))
+    )""",
+]
+
+
+def upgrade(conn: Connection):
+    if conn.dialect.name == "sqlite":
+        fts5 = conn.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar()
+        if not fts5:
+            print("SQLite lacks FTS5; archived report search will not use a full-text index")
+            return
+        for statement in SQLITE_STATEMENTS:
+            conn.execute(text(statement))
+    elif conn.dialect.name == "postgresql":
+        for statement in POSTGRES_STATEMENTS:
+            conn.execute(text(statement))
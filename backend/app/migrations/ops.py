@@ -0,0 +1,23 @@
+from typing import List
+from sqlalchemy import Column, inspect, text
+from sqlalchemy.engine import Connection
+
+
+def create_index(conn: Connection, name: str, table: str, columns: List[str], unique: bool = False):
+    """CREATE [UNIQUE] INDEX IF NOT EXISTS (supported by SQLite and Postgres)"""
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    conn.execute(text(f"CREATE {kind} IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+
+
+def add_column(conn: Connection, table: str, column: Column):
+    """
+    ALTER TABLE ... ADD COLUMN unless the column already exists. NOT NULL
+    columns need a server_default so existing rows get a value.
+    """
+    existing = {c["name"] for c in inspect(conn).get_columns(table)}
+    if column.name in existing:
+        return
+    column_type = column.type.compile(dialect=conn.dialect)
+    nullable = "" if column.nullable else " NOT NULL"
+    default = f" DEFAULT {column.server_default.arg}" if column.server_default is not None else ""
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column.name} {column_type}{default}{nullable}"))
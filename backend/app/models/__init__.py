@@ -1,7 +1,8 @@
-from app.models.report import Report
+from app.models.report import Report, ArchivedReport
 from app.models.incident import Incident
 from app.models.user import User
 from app.models.resource import Resource
+from app.models.rollup import ReportRollup, ReportCellRollup, IncidentRollup
 
-__all__ = ["Report", "Incident", "User", "Resource"]
+__all__ = ["Report", "ArchivedReport", "Incident", "User", "Resource", "ReportRollup", "ReportCellRollup", "IncidentRollup"]
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -6,6 +6,12 @@ from app.database import Base
 
 class Incident(Base):
     __tablename__ = "incidents"
+    __table_args__ = (
+        # Active-incident listing and the clustering lookup (is_active + hazard_type)
+        Index("ix_incidents_is_active_hazard_type", "is_active", "hazard_type"),
+        # Active-incident cursor pages, newest first without a sort step
+        Index("ix_incidents_is_active_created_at", "is_active", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     location = Column(String, nullable=True)
@@ -16,8 +22,18 @@ class Incident(Base):
     confidence_score = Column(Float, nullable=True)
     witness_count = Column(Integer, default=1, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    # Set when the archiver moved (some of) this incident's reports to reports_archive
+    archived_at = Column(DateTime(timezone=True), nullable=True)
+    # Denormalized report counters, maintained with SQL-side increments by
+    # app.services.clustering so concurrent writers never lose an update
+    report_count = Column(Integer, default=0, server_default="0", nullable=False)
+    last_report_at = Column(DateTime(timezone=True), nullable=True)
+    latest_severity = Column(String, nullable=True)
+    severity_low_count = Column(Integer, default=0, server_default="0", nullable=False)
+    severity_medium_count = Column(Integer, default=0, server_default="0", nullable=False)
+    severity_high_count = Column(Integer, default=0, server_default="0", nullable=False)
     
     # Relationship to reports
     reports = relationship("Report", back_populates="incident", cascade="all, delete-orphan")
@@ -12,17 +12,44 @@ class Report(Base):
     location = Column(String, nullable=True)
     latitude = Column(Float, nullable=True)
     longitude = Column(Float, nullable=True)
-    hazard_type = Column(String, nullable=True)
+    hazard_type = Column(String, nullable=True, index=True)
     severity = Column(String, nullable=True)
     confidence_score = Column(Float, nullable=True)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     is_verified = Column(Boolean, default=False, nullable=False)
     
     # Foreign key to incident
-    incident_id = Column(Integer, ForeignKey("incidents.id"), nullable=True)
+    incident_id = Column(Integer, ForeignKey("incidents.id"), nullable=True, index=True)
     incident = relationship("Incident", back_populates="reports")
     
     # Foreign key to user (who submitted the report)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     user = relationship("User")
 
+    # Ingestion journal seq this report came from, so a journal replay can
+    # tell the entry was already persisted (see app.services.journal)
+    ingest_seq = Column(Integer, nullable=True, unique=True, index=True)
+
+
+
+class ArchivedReport(Base):
+    """
+    Cold storage for reports moved out of `reports` by the archiver
+    (see app.services.archive). Keeps the original ids and columns.
+    """
+    __tablename__ = "reports_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    raw_text = Column(String, nullable=False)
+    location = Column(String, nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    hazard_type = Column(String, nullable=True)
+    severity = Column(String, nullable=True)
+    confidence_score = Column(Float, nullable=True)
+    timestamp = Column(DateTime(timezone=True), nullable=False, index=True)
+    is_verified = Column(Boolean, default=False, nullable=False)
+    incident_id = Column(Integer, nullable=True, index=True)
+    user_id = Column(Integer, nullable=True)
+    ingest_seq = Column(Integer, nullable=True, index=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
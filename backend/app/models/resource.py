@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -25,12 +25,16 @@ class ResourceStatus(str, enum.Enum):
 
 class Resource(Base):
     __tablename__ = "resources"
+    __table_args__ = (
+        # Status-filtered cursor pages, newest first without a sort step
+        Index("ix_resources_status_created_at", "status", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     description = Column(String, nullable=True)
-    resource_type = Column(Enum(ResourceType), nullable=False)
-    status = Column(Enum(ResourceStatus), default=ResourceStatus.NEEDED, nullable=False)
+    resource_type = Column(Enum(ResourceType), nullable=False, index=True)
+    status = Column(Enum(ResourceStatus), default=ResourceStatus.NEEDED, nullable=False, index=True)
     quantity = Column(Float, nullable=False)  # Can be decimal for partial units
     unit = Column(String, nullable=False)  # e.g., "liters", "people", "units"
     location = Column(String, nullable=True)
@@ -38,13 +42,18 @@ class Resource(Base):
     longitude = Column(Float, nullable=True)
     
     # Link to incident if resource is for specific incident
-    incident_id = Column(Integer, ForeignKey("incidents.id"), nullable=True)
+    incident_id = Column(Integer, ForeignKey("incidents.id"), nullable=True, index=True)
     incident = relationship("Incident", backref="resources")
     
     # Link to user who created/updated resource
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     user = relationship("User")
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
+    # Bumped on every update; a write based on a stale version is rejected
+    version = Column(Integer, server_default="1", nullable=False)
+
+    __mapper_args__ = {"version_id_col": version}
+
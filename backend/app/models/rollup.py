@@ -0,0 +1,40 @@
+from sqlalchemy import Column, DateTime, Float, Integer, String
+from app.database import Base
+
+
+class ReportRollup(Base):
+    """
+    Hourly report counts and confidence sums per hazard type and severity,
+    maintained by app.services.rollups. Missing hazard/severity is stored
+    as "" so every key column can be part of the primary key.
+    """
+    __tablename__ = "report_rollups_hourly"
+
+    bucket = Column(DateTime, primary_key=True)  # Start of the hour, naive UTC
+    hazard_type = Column(String, primary_key=True)
+    severity = Column(String, primary_key=True)
+    report_count = Column(Integer, default=0, nullable=False)
+    confidence_sum = Column(Float, default=0.0, nullable=False)
+
+
+class ReportCellRollup(Base):
+    """Hourly report counts per hazard type and region cell"""
+    __tablename__ = "report_cell_rollups_hourly"
+
+    bucket = Column(DateTime, primary_key=True)
+    hazard_type = Column(String, primary_key=True)
+    cell = Column(String, primary_key=True)  # "lat_index:lon_index" on the rollup grid, "" without coordinates
+    report_count = Column(Integer, default=0, nullable=False)
+    confidence_sum = Column(Float, default=0.0, nullable=False)
+
+
+class IncidentRollup(Base):
+    """Hourly incident counts per hazard type, by creation time"""
+    __tablename__ = "incident_rollups_hourly"
+
+    bucket = Column(DateTime, primary_key=True)
+    hazard_type = Column(String, primary_key=True)
+    incident_count = Column(Integer, default=0, nullable=False)
+    active_count = Column(Integer, default=0, nullable=False)
+    # Witnesses of the incidents counted in active_count
+    active_witness_sum = Column(Integer, default=0, nullable=False)
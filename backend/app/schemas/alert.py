@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class SMSAlertRequest(BaseModel):
+    """Schema for fanning out an SMS alert about an incident"""
+    recipients: List[str] = Field(
+        ..., min_length=1, max_length=1000, description="Recipient phone numbers in E.164 format (at most 1000)"
+    )
+    message: Optional[str] = Field(None, description="Alert text (defaults to an incident summary)")
+    dry_run: bool = Field(False, description="Go through the send path without calling Twilio")
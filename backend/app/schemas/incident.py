@@ -17,6 +17,13 @@ class IncidentRead(BaseModel):
     is_active: bool
     created_at: datetime
     updated_at: datetime
+    archived_at: Optional[datetime] = None
+    report_count: int = 0
+    last_report_at: Optional[datetime] = None
+    latest_severity: Optional[str] = None
+    severity_low_count: int = 0
+    severity_medium_count: int = 0
+    severity_high_count: int = 0
     reports: List[ReportRead] = []
 
     class Config:
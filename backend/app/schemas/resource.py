@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from app.models.resource import ResourceType, ResourceStatus
 
 
@@ -28,6 +28,7 @@ class ResourceUpdate(BaseModel):
     latitude: Optional[float] = None
     longitude: Optional[float] = None
     incident_id: Optional[int] = None
+    version: Optional[int] = Field(None, description="Version the change is based on; 409 if it has moved on")
 
 
 class ResourceRead(BaseModel):
@@ -43,9 +44,20 @@ class ResourceRead(BaseModel):
     longitude: Optional[float] = None
     incident_id: Optional[int] = None
     user_id: Optional[int] = None
+    version: int
     created_at: datetime
     updated_at: datetime
 
     class Config:
         from_attributes = True
 
+
+
+class ResourceBulkUpdateItem(ResourceUpdate):
+    id: int
+    version: int = Field(..., description="Version the change is based on, as last read")
+
+
+class ResourceBulkUpdate(BaseModel):
+    updates: List[ResourceBulkUpdateItem] = Field(..., min_length=1, max_length=1000)
+    atomic: bool = Field(False, description="Apply nothing if any item conflicts")
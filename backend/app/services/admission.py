@@ -0,0 +1,214 @@
+import asyncio
+import hashlib
+import heapq
+import itertools
+import os
+import re
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, List, Tuple
+from dotenv import load_dotenv
+from app.services.ai_processor import classify_hazard
+
+load_dotenv()
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+# Reports processed (LLM + geocoder) at once across all requests
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "8"))
+# Queue latency above which low-priority work is shed
+ADMISSION_TARGET_WAIT_MS = float(os.getenv("ADMISSION_TARGET_WAIT_MS", "5000"))
+# Priorities at or above this value may be shed (see score_report)
+ADMISSION_SHED_PRIORITY = int(os.getenv("ADMISSION_SHED_PRIORITY", "2"))
+
+# Priority levels, lower is more urgent
+PRIORITY_CRITICAL = 0
+PRIORITY_HAZARD = 1
+PRIORITY_UNKNOWN = 2
+PRIORITY_DUPLICATE = 3
+PRIORITY_NAMES = {
+    PRIORITY_CRITICAL: "critical",
+    PRIORITY_HAZARD: "hazard",
+    PRIORITY_UNKNOWN: "unknown",
+    PRIORITY_DUPLICATE: "duplicate"
+}
+
+# Words that suggest people are in immediate danger
+LIFE_THREAT_KEYWORDS = [
+    "trapped", "injured", "hurt", "bleeding", "unconscious", "dead", "dying",
+    "collapsed", "help", "rescue", "sos", "emergency", "stuck", "can't breathe"
+]
+# Whole words only, so "helpful" or "deadline" do not count
+_LIFE_THREAT_PATTERN = re.compile(
+    r"\b(?:" + "|".join(re.escape(keyword) for keyword in LIFE_THREAT_KEYWORDS) + r")\b"
+)
+
+_DUPLICATE_WINDOW = 10000
+
+
+class LoadShedError(Exception):
+    """Report was shed because the processing queue is over its latency target"""
+
+
+class AdmissionController:
+    """
+    Priority admission in front of report extraction.
+
+    Reports are scored with the keyword classifier and wait in a priority
+    queue for one of max_in_flight processing slots, so life-threatening
+    reports overtake chatter. When the oldest waiter has been queued longer
+    than target_wait_ms, queued and newly arriving reports at or below the
+    shed priority are rejected with LoadShedError instead of waiting.
+    Critical (life-threat) reports are never shed.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = ADMISSION_MAX_IN_FLIGHT,
+        target_wait_ms: float = ADMISSION_TARGET_WAIT_MS,
+        shed_priority: int = ADMISSION_SHED_PRIORITY,
+        enabled: bool = ADMISSION_ENABLED
+    ):
+        self.max_in_flight = max(1, max_in_flight)
+        self.target_wait_seconds = target_wait_ms / 1000.0
+        self.shed_priority = shed_priority
+        self.enabled = enabled
+        self.in_flight = 0
+        self._queue: List[Tuple[int, int, float, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._recent_texts: "OrderedDict[str, None]" = OrderedDict()
+
+        # Metrics
+        self.admitted: Dict[str, int] = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.shed: Dict[str, int] = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.recent_waits: Deque[float] = deque(maxlen=1000)
+
+    def score_report(self, text: str) -> int:
+        """
+        Score a report's urgency from its text (lower is more urgent).
+        Life-threat wording is always critical, even when repeated or
+        without a hazard keyword. Otherwise repeats of recently seen text
+        (retweets, resent SMS) score lowest.
+        """
+        normalized = " ".join(text.lower().split())
+        if _LIFE_THREAT_PATTERN.search(normalized):
+            return PRIORITY_CRITICAL
+
+        digest = hashlib.sha1(normalized.encode()).hexdigest()
+        if digest in self._recent_texts:
+            self._recent_texts.move_to_end(digest)
+            return PRIORITY_DUPLICATE
+        self._recent_texts[digest] = None
+        if len(self._recent_texts) > _DUPLICATE_WINDOW:
+            self._recent_texts.popitem(last=False)
+
+        if classify_hazard(text) == "Unknown":
+            return PRIORITY_UNKNOWN
+        return PRIORITY_HAZARD
+
+    def _sheddable(self, priority: int) -> bool:
+        # Critical reports are never shed, whatever ADMISSION_SHED_PRIORITY says
+        return priority != PRIORITY_CRITICAL and priority >= self.shed_priority
+
+    def queue_wait_seconds(self) -> float:
+        """How long the oldest queued report has been waiting"""
+        live = [enqueued for _, _, enqueued, future in self._queue if not future.done()]
+        return time.monotonic() - min(live) if live else 0.0
+
+    def _over_target(self) -> bool:
+        return self.queue_wait_seconds() > self.target_wait_seconds
+
+    def _shed_queued(self):
+        """Reject every queued report that is allowed to be shed"""
+        kept = []
+        for entry in self._queue:
+            priority, _, _, future = entry
+            if future.done():
+                continue
+            if self._sheddable(priority):
+                self.shed[PRIORITY_NAMES[priority]] += 1
+                future.set_exception(LoadShedError("Report shed: ingestion queue over latency target"))
+            else:
+                kept.append(entry)
+        heapq.heapify(kept)
+        self._queue = kept
+
+    def _dispatch(self):
+        """Hand free slots to the most urgent waiters"""
+        if self._over_target():
+            self._shed_queued()
+        while self.in_flight < self.max_in_flight and self._queue:
+            priority, _, enqueued, future = heapq.heappop(self._queue)
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(time.monotonic() - enqueued)
+
+    def _record_admit(self, priority: int, waited: float):
+        self.admitted[PRIORITY_NAMES[priority]] += 1
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self.recent_waits.append(waited)
+
+    async def acquire(self, priority: int):
+        """Wait for a processing slot; raises LoadShedError if shed"""
+        if self.in_flight < self.max_in_flight and not self._queue:
+            self.in_flight += 1
+            self._record_admit(priority, 0.0)
+            return
+
+        if self._sheddable(priority) and self._over_target():
+            self.shed[PRIORITY_NAMES[priority]] += 1
+            raise LoadShedError("Report shed: ingestion queue over latency target")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._counter), time.monotonic(), future))
+        try:
+            waited = await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # Granted a slot just as the caller went away
+                self.release()
+            raise
+        self._record_admit(priority, waited)
+
+    def release(self):
+        """Return a processing slot"""
+        self.in_flight -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def admit(self, priority: int):
+        """Hold a processing slot for the duration of the block"""
+        if not self.enabled:
+            yield
+            return
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        waits = sorted(self.recent_waits)
+        admitted_total = sum(self.admitted.values())
+        return {
+            "enabled": self.enabled,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_depth": sum(1 for *_, future in self._queue if not future.done()),
+            "current_queue_wait_ms": round(self.queue_wait_seconds() * 1000, 1),
+            "target_wait_ms": self.target_wait_seconds * 1000,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "queue_wait_ms": {
+                "avg": round(self.total_wait_seconds / admitted_total * 1000, 1) if admitted_total else 0,
+                "p95": round(waits[int(len(waits) * 0.95)] * 1000, 1) if waits else 0,
+                "max": round(self.max_wait_seconds * 1000, 1)
+            }
+        }
+
+
+admission_controller = AdmissionController()
@@ -3,6 +3,7 @@ import json
 import os
 from typing import Dict, Optional
 from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
 from app.services.geocoder import get_coordinates
 
 load_dotenv()
@@ -21,6 +22,31 @@ except ImportError:
     GEMINI_AVAILABLE = False
 
 
+def classify_hazard(text: str) -> str:
+    """
+    Fast keyword classifier for the hazard type of a report.
+    
+    Args:
+        text: Raw text report
+        
+    Returns:
+        Fire, Flood, Earthquake, Storm, Tornado, or Unknown
+    """
+    text_lower = text.lower()
+    
+    if "fire" in text_lower:
+        return "Fire"
+    elif "flood" in text_lower:
+        return "Flood"
+    elif "earthquake" in text_lower or "quake" in text_lower:
+        return "Earthquake"
+    elif "hurricane" in text_lower or "storm" in text_lower:
+        return "Storm"
+    elif "tornado" in text_lower:
+        return "Tornado"
+    return "Unknown"
+
+
 def process_report(text: str) -> Dict[str, any]:
     """
     Process a raw text report and extract structured information.
@@ -34,22 +60,8 @@ def process_report(text: str) -> Dict[str, any]:
     Returns:
         Dictionary with location, hazard_type, severity, and confidence_score
     """
-    text_lower = text.lower()
-    
     # Dummy logic: detect hazard type from keywords
-    hazard_type = None
-    if "fire" in text_lower:
-        hazard_type = "Fire"
-    elif "flood" in text_lower:
-        hazard_type = "Flood"
-    elif "earthquake" in text_lower or "quake" in text_lower:
-        hazard_type = "Earthquake"
-    elif "hurricane" in text_lower or "storm" in text_lower:
-        hazard_type = "Storm"
-    elif "tornado" in text_lower:
-        hazard_type = "Tornado"
-    else:
-        hazard_type = "Unknown"
+    hazard_type = classify_hazard(text)
     
     # Extract location (simple dummy: look for common location keywords)
     location = None
@@ -152,7 +164,7 @@ Return ONLY valid JSON in this exact format:
             
             # Geocode location
             location_str = result.get("location", "Location not specified")
-            latitude, longitude = get_coordinates(location_str)
+            latitude, longitude = await run_in_threadpool(get_coordinates, location_str)
             result["latitude"] = latitude
             result["longitude"] = longitude
             
@@ -194,7 +206,7 @@ Return ONLY valid JSON in this exact format:
             
             # Geocode location
             location_str = result.get("location", "Location not specified")
-            latitude, longitude = get_coordinates(location_str)
+            latitude, longitude = await run_in_threadpool(get_coordinates, location_str)
             result["latitude"] = latitude
             result["longitude"] = longitude
             
@@ -267,7 +279,7 @@ Return ONLY valid JSON in this exact format:
             
             # Geocode the extracted location
             location_str = result.get("location", "Location not specified")
-            latitude, longitude = get_coordinates(location_str)
+            latitude, longitude = await run_in_threadpool(get_coordinates, location_str)
             result["latitude"] = latitude
             result["longitude"] = longitude
             
@@ -298,7 +310,7 @@ Return ONLY valid JSON in this exact format:
             
             # Geocode the extracted location
             location_str = result.get("location", "Location not specified")
-            latitude, longitude = get_coordinates(location_str)
+            latitude, longitude = await run_in_threadpool(get_coordinates, location_str)
             result["latitude"] = latitude
             result["longitude"] = longitude
             
@@ -319,3 +331,37 @@ Return ONLY valid JSON in this exact format:
         # Fall back to dummy implementation
         return process_report(text)
 
+
+
+async def extract_report_data(
+    text: str,
+    provider: str = "dummy",
+    image_base64: Optional[str] = None
+) -> Dict[str, any]:
+    """
+    Extract structured data from a report with the requested provider.
+    
+    Images go to the vision model first, then the text LLM; any failure
+    falls back to the keyword implementation, which is run in a worker
+    thread because geocoding blocks.
+    
+    Args:
+        text: Raw text report
+        provider: AI provider ("openai", "gemini", or "dummy")
+        image_base64: Optional base64 encoded image
+        
+    Returns:
+        Dictionary with location, coordinates, hazard_type, severity and confidence_score
+    """
+    if provider in ["openai", "gemini"]:
+        if image_base64:
+            try:
+                return await process_image_with_vision(image_base64, text, provider=provider)
+            except Exception as e:
+                print(f"Vision processing failed, using text fallback: {e}")
+        try:
+            return await process_report_with_llm(text, provider=provider)
+        except Exception as e:
+            print(f"LLM processing failed, using fallback: {e}")
+    
+    return await run_in_threadpool(process_report, text)
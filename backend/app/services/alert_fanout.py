@@ -0,0 +1,330 @@
+import asyncio
+import itertools
+import math
+import os
+import random
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+import httpx
+
+load_dotenv()
+
+# Twilio REST API; point at a local stub (see scripts/twilio_stub.py) for load tests
+TWILIO_API_BASE_URL = os.getenv("TWILIO_API_BASE_URL", "https://api.twilio.com")
+TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
+TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
+
+# Sender pool: comma-separated numbers, falls back to the single TWILIO_PHONE_NUMBER
+TWILIO_PHONE_NUMBERS = [
+    number.strip()
+    for number in os.getenv("TWILIO_PHONE_NUMBERS", os.getenv("TWILIO_PHONE_NUMBER", "")).split(",")
+    if number.strip()
+]
+
+ALERT_MAX_CONCURRENCY = int(os.getenv("ALERT_MAX_CONCURRENCY", "20"))
+ALERT_RATE_PER_NUMBER = float(os.getenv("ALERT_RATE_PER_NUMBER", "1.0"))  # messages/second per sender
+ALERT_MAX_RETRIES = int(os.getenv("ALERT_MAX_RETRIES", "3"))
+ALERT_BACKOFF_SECONDS = float(os.getenv("ALERT_BACKOFF_SECONDS", "0.5"))
+ALERT_DRY_RUN = os.getenv("ALERT_DRY_RUN", "false").lower() == "true"
+# Longest wait honoured from a Retry-After header
+ALERT_MAX_RETRY_AFTER_SECONDS = float(os.getenv("ALERT_MAX_RETRY_AFTER_SECONDS", "60"))
+# Finished fan-out jobs kept for status lookups (per worker)
+ALERT_JOB_HISTORY = int(os.getenv("ALERT_JOB_HISTORY", "200"))
+
+
+def parse_retry_after(value: Optional[str], max_seconds: float = ALERT_MAX_RETRY_AFTER_SECONDS) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header.
+
+    Args:
+        value: Header value, either delta-seconds ("2", "1.5") or an HTTP-date
+        max_seconds: Upper bound on the returned wait
+
+    Returns:
+        Wait clamped to [0, max_seconds], or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = (when - datetime.now(timezone.utc)).total_seconds()
+    if math.isnan(seconds):
+        return None
+    return min(max(seconds, 0.0), max_seconds)
+
+
+class TokenBucket:
+    """Async token bucket limiting the send rate of a single sender number"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until one token is available and take it"""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RetryableSendError(Exception):
+    """Send failed with a transient error (429, 5xx or network)"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class SMSAlertFanout:
+    """
+    Sends one alert to many recipients through the Twilio Messages API.
+
+    Uses a single pooled HTTP client, a bounded number of in-flight sends,
+    a token bucket per sender number and exponential backoff with jitter
+    on transient failures. In dry-run mode no HTTP request is made, but
+    concurrency and rate limiting still apply so runs can be benchmarked.
+    """
+
+    def __init__(
+        self,
+        account_sid: Optional[str] = TWILIO_ACCOUNT_SID,
+        auth_token: Optional[str] = TWILIO_AUTH_TOKEN,
+        sender_numbers: Optional[List[str]] = None,
+        base_url: str = TWILIO_API_BASE_URL,
+        max_concurrency: int = ALERT_MAX_CONCURRENCY,
+        rate_per_number: float = ALERT_RATE_PER_NUMBER,
+        max_retries: int = ALERT_MAX_RETRIES,
+        backoff_seconds: float = ALERT_BACKOFF_SECONDS,
+        dry_run: bool = ALERT_DRY_RUN,
+        dry_run_latency: float = 0.0
+    ):
+        self.account_sid = account_sid
+        self.auth_token = auth_token
+        self.sender_numbers = sender_numbers if sender_numbers is not None else TWILIO_PHONE_NUMBERS
+        if dry_run and not self.sender_numbers:
+            self.sender_numbers = ["+15005550006"]  # Twilio test sender, never dialled
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_per_number = rate_per_number
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.dry_run = dry_run
+        self.dry_run_latency = dry_run_latency
+        self.buckets: Dict[str, TokenBucket] = {
+            number: TokenBucket(rate_per_number) for number in self.sender_numbers
+        }
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def configured(self) -> bool:
+        if not self.sender_numbers:
+            return False
+        return self.dry_run or bool(self.account_sid and self.auth_token)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Lazily create the shared, connection-pooled HTTP client"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                auth=(self.account_sid or "", self.auth_token or ""),
+                timeout=httpx.Timeout(10.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency
+                )
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close the pooled HTTP client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _post_message(self, to: str, body: str, sender: str) -> str:
+        """Make a single Messages API call, returning the message SID"""
+        if self.dry_run:
+            if self.dry_run_latency:
+                await asyncio.sleep(self.dry_run_latency)
+            return "dry-run"
+
+        try:
+            response = await self._get_client().post(
+                f"/2010-04-01/Accounts/{self.account_sid}/Messages.json",
+                data={"To": to, "From": sender, "Body": body}
+            )
+        except httpx.TransportError as e:
+            raise RetryableSendError(f"transport error: {e}")
+
+        if response.status_code == 429 or response.status_code >= 500:
+            raise RetryableSendError(
+                f"HTTP {response.status_code}",
+                retry_after=parse_retry_after(response.headers.get("Retry-After"))
+            )
+        response.raise_for_status()
+        return response.json().get("sid", "")
+
+    async def send_one(self, to: str, body: str, sender: str) -> Dict:
+        """Send to one recipient, retrying transient failures with backoff"""
+        attempts = 0
+        while True:
+            await self.buckets[sender].acquire()
+            attempts += 1
+            try:
+                sid = await self._post_message(to, body, sender)
+                return {"to": to, "ok": True, "sid": sid, "attempts": attempts}
+            except RetryableSendError as e:
+                if attempts > self.max_retries:
+                    return {"to": to, "ok": False, "error": str(e), "attempts": attempts}
+                delay = e.retry_after
+                if delay is None:
+                    delay = self.backoff_seconds * (2 ** (attempts - 1))
+                    delay += random.uniform(0, self.backoff_seconds)
+                await asyncio.sleep(delay)
+            except Exception as e:
+                return {"to": to, "ok": False, "error": str(e), "attempts": attempts}
+
+    async def fan_out(self, recipients: List[str], message: str) -> Dict:
+        """
+        Send the same message to every recipient.
+
+        Args:
+            recipients: Phone numbers in E.164 format; duplicates are sent once
+            message: Message text
+
+        Returns:
+            Summary with sent/failed counts, retries, duration and failures
+        """
+        if not self.configured:
+            print("Twilio not configured")
+            return {"sent": 0, "failed": len(recipients), "retries": 0, "duration_seconds": 0.0,
+                    "dry_run": self.dry_run, "failures": [{"to": None, "error": "Twilio not configured"}]}
+
+        unique_recipients = list(dict.fromkeys(recipients))
+        senders = itertools.cycle(self.sender_numbers)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def bounded_send(to: str, sender: str) -> Dict:
+            async with semaphore:
+                return await self.send_one(to, message, sender)
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*[
+            bounded_send(to, next(senders)) for to in unique_recipients
+        ])
+        duration = time.perf_counter() - started
+
+        failures = [r for r in results if not r["ok"]]
+        return {
+            "sent": len(results) - len(failures),
+            "failed": len(failures),
+            "retries": sum(r["attempts"] - 1 for r in results),
+            "duration_seconds": round(duration, 3),
+            "messages_per_second": round(len(results) / duration, 2) if duration > 0 else None,
+            "dry_run": self.dry_run,
+            "failures": [{"to": r["to"], "error": r["error"]} for r in failures]
+        }
+
+
+_fanout: Optional[SMSAlertFanout] = None
+
+
+def get_alert_fanout() -> SMSAlertFanout:
+    """Get the process-wide fan-out service (shares one pooled client)"""
+    global _fanout
+    if _fanout is None:
+        _fanout = SMSAlertFanout()
+    return _fanout
+
+
+class AlertJobs:
+    """
+    Fan-outs running in the background, so a large alert does not hold the
+    HTTP request open for as long as the rate limit needs. Status is kept in
+    process (per worker, lost on restart) for the last ALERT_JOB_HISTORY jobs.
+    """
+
+    def __init__(self, history: int = ALERT_JOB_HISTORY):
+        self.history = history
+        self._jobs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._tasks = set()
+
+    def start(
+        self,
+        incident_id: int,
+        fanout: SMSAlertFanout,
+        recipients: List[str],
+        message: str,
+        requested_by: Optional[int] = None
+    ) -> Dict:
+        """
+        Start a fan-out as a background task.
+
+        Args:
+            requested_by: Id of the user who asked for the alert, kept on the job
+
+        Returns:
+            Job status record: job_id, status ("running", "completed" or
+            "failed"), recipients, and the fan_out() summary as result once finished
+        """
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "incident_id": incident_id,
+            "requested_by": requested_by,
+            "status": "running",
+            "recipients": len(set(recipients)),
+            "dry_run": fanout.dry_run,
+            "created_at": datetime.utcnow().isoformat(),
+            "finished_at": None,
+            "result": None
+        }
+        self._jobs[job["job_id"]] = job
+        while len(self._jobs) > self.history:
+            self._jobs.popitem(last=False)
+        # Referenced until done so the task is not garbage collected mid-run
+        task = asyncio.create_task(self._run(job, fanout, recipients, message))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self._jobs.get(job_id)
+
+    async def _run(self, job: Dict, fanout: SMSAlertFanout, recipients: List[str], message: str):
+        try:
+            job["result"] = await fanout.fan_out(recipients, message)
+            job["status"] = "completed"
+        except Exception as e:
+            print(f"SMS alert job {job['job_id']} failed: {e}")
+            job["status"] = "failed"
+            job["error"] = str(e)
+        finally:
+            job["finished_at"] = datetime.utcnow().isoformat()
+            if fanout is not _fanout:
+                await fanout.aclose()
+
+
+alert_jobs = AlertJobs()
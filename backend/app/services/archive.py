@@ -0,0 +1,176 @@
+import asyncio
+import gzip
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+from dotenv import load_dotenv
+from sqlalchemy import and_, delete, func, insert, or_, select, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import TTLCache
+from app.core.serialization import dumps
+from app.database import AsyncSessionLocal
+from app.models.incident import Incident
+from app.models.report import ArchivedReport, Report
+
+load_dotenv()
+
+ARCHIVE_ENABLED = os.getenv("ARCHIVE_ENABLED", "false").lower() == "true"
+# Incidents without new reports for this long are cold
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+# Optional directory for gzip NDJSON copies of every archived batch
+ARCHIVE_EXPORT_DIR = os.getenv("ARCHIVE_EXPORT_DIR")
+
+REPORT_COLUMN_NAMES = [column.name for column in Report.__table__.columns]
+
+# Newest archived timestamp and archived row count, refreshed after each run
+_archive_state = TTLCache(ttl_seconds=300, max_entries=1)
+
+
+async def archive_state(db: AsyncSession) -> dict:
+    """Newest archived report timestamp (None if the archive is empty) and row count"""
+    state = _archive_state.get("state")
+    if state is None:
+        newest, count = (await db.execute(
+            select(func.max(ArchivedReport.timestamp), func.count(ArchivedReport.id))
+        )).one()
+        state = {"newest": newest, "count": count}
+        _archive_state.set("state", state)
+    return state
+
+
+def reports_source(include_archive: bool):
+    """
+    Selectable to read reports from: the hot `reports` table alone, or
+    `reports` UNION ALL `reports_archive` with the same column names.
+    """
+    if not include_archive:
+        return Report.__table__
+    hot = select(*[Report.__table__.c[name] for name in REPORT_COLUMN_NAMES])
+    cold = select(*[ArchivedReport.__table__.c[name] for name in REPORT_COLUMN_NAMES])
+    return union_all(hot, cold).subquery("all_reports")
+
+
+async def window_reaches_archive(db: AsyncSession, since: Optional[datetime]) -> bool:
+    """Whether a time window starting at `since` (None = all time) overlaps archived reports"""
+    newest = (await archive_state(db))["newest"]
+    return newest is not None and (since is None or since <= newest)
+
+
+async def reports_since(db: AsyncSession, since: Optional[datetime]):
+    """
+    Reports source for a time window starting at `since` (None = all time).
+    Only includes the archive when the window reaches back into it.
+    """
+    return reports_source(await window_reaches_archive(db, since))
+
+
+def _cold_reports_filter(cutoff: datetime):
+    # last_report_at, not updated_at: edits and the archival marker itself
+    # bump updated_at without the incident receiving a report
+    last_activity = func.coalesce(Incident.last_report_at, Incident.created_at)
+    cold_incidents = select(Incident.id).filter(last_activity < cutoff)
+    # SQLite hands out max(id) + 1 for new rows, so the newest report always
+    # stays hot; otherwise its id would be reused and clash with the archive
+    newest_id = select(func.max(Report.id)).scalar_subquery()
+    return and_(
+        Report.id < newest_id,
+        or_(
+            Report.incident_id.in_(cold_incidents),
+            (Report.incident_id.is_(None)) & (Report.timestamp < cutoff)
+        )
+    )
+
+
+def _export_batch(export_dir: str, started: datetime, rows: list) -> str:
+    os.makedirs(export_dir, exist_ok=True)
+    path = os.path.join(export_dir, f"reports-archive-{started.strftime('%Y%m%dT%H%M%S')}.ndjson.gz")
+    with gzip.open(path, "ab") as f:
+        for row in rows:
+            f.write(dumps(row) + b"\n")
+    return path
+
+
+async def archive_cold_reports(
+    older_than_days: int = ARCHIVE_AFTER_DAYS,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    export_dir: Optional[str] = ARCHIVE_EXPORT_DIR,
+    dry_run: bool = False
+) -> dict:
+    """
+    Move reports of long-inactive incidents (and old unclustered reports)
+    from `reports` into `reports_archive`.
+
+    An incident is cold when it has had no new report for older_than_days.
+    Reports move in batches, each batch in one transaction, and the
+    incident is stamped with archived_at so reads know to include the
+    archive for it.
+
+    Args:
+        older_than_days: Age after which incidents/reports are cold
+        batch_size: Reports moved per transaction
+        export_dir: Also append each batch to a gzip NDJSON file here
+        dry_run: Only count what would be archived
+
+    Returns:
+        Summary with archived count, batches and export file (if any)
+    """
+    started = datetime.utcnow()
+    cutoff = started - timedelta(days=older_than_days)
+    cold = _cold_reports_filter(cutoff)
+    summary = {"cutoff": cutoff.isoformat(), "archived": 0, "batches": 0, "export_file": None}
+
+    async with AsyncSessionLocal() as db:
+        if dry_run:
+            summary["archived"] = await db.scalar(select(func.count(Report.id)).filter(cold))
+            return summary
+
+        while True:
+            result = await db.execute(
+                select(*Report.__table__.columns).filter(cold).order_by(Report.id).limit(batch_size)
+            )
+            rows = [dict(row._mapping) for row in result]
+            if not rows:
+                break
+
+            ids = [row["id"] for row in rows]
+            incident_ids = {row["incident_id"] for row in rows if row["incident_id"] is not None}
+            try:
+                await db.execute(
+                    insert(ArchivedReport),
+                    [dict(row, archived_at=started) for row in rows]
+                )
+                await db.execute(delete(Report).filter(Report.id.in_(ids)))
+                if incident_ids:
+                    # Keep updated_at: archiving is not activity on the incident
+                    await db.execute(
+                        update(Incident)
+                        .filter(Incident.id.in_(incident_ids))
+                        .values(archived_at=started, updated_at=Incident.updated_at)
+                    )
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                print(f"Error archiving reports: {e}")
+                break
+
+            if export_dir:
+                summary["export_file"] = _export_batch(export_dir, started, rows)
+            summary["archived"] += len(rows)
+            summary["batches"] += 1
+
+    _archive_state.invalidate()
+    return summary
+
+
+async def run_archiver(interval_seconds: float = ARCHIVE_INTERVAL_SECONDS):
+    """Archive cold reports every interval_seconds (started from main.py)"""
+    while True:
+        try:
+            summary = await archive_cold_reports()
+            if summary["archived"]:
+                print(f"Archived {summary['archived']} cold reports in {summary['batches']} batches")
+        except Exception as e:
+            print(f"Error in report archiver: {e}")
+        await asyncio.sleep(interval_seconds)
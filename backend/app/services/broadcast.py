@@ -0,0 +1,178 @@
+"""
+Real-time fan-out of reports, incidents and surges to WebSocket clients.
+
+The connection manager lives here rather than in the API layer so the
+ingestion pipeline can broadcast without importing route modules;
+app.api.websocket only accepts connections and hands them to `manager`.
+"""
+import asyncio
+import os
+from typing import Dict
+from dotenv import load_dotenv
+from fastapi import WebSocket
+from app.core.serialization import dumps
+from app.models.report import Report
+
+load_dotenv()
+
+# Outbound messages buffered per client before it counts as a slow consumer
+WS_QUEUE_SIZE = int(os.getenv("WS_QUEUE_SIZE", "256"))
+# "resync": drop the backlog and tell the client to reload; "drop": disconnect it
+WS_OVERFLOW_POLICY = os.getenv("WS_OVERFLOW_POLICY", "resync").lower()
+# A single send taking longer than this marks the connection dead
+WS_SEND_TIMEOUT_SECONDS = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "10"))
+
+RESYNC_MESSAGE = dumps({"type": "resync", "reason": "overflow"}).decode()
+
+
+class _Client:
+    """One connection's outbound queue and the task draining it"""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=WS_QUEUE_SIZE)
+        self.resync_pending = False
+        self.writer: asyncio.Task = None
+
+
+class ConnectionManager:
+    """
+    Manages WebSocket connections.
+
+    Every connection gets a bounded queue and a writer task, so broadcast
+    encodes the message once and only enqueues it: a slow client never
+    holds up the others or the request that triggered the broadcast. A
+    client whose queue fills up is resynced (backlog dropped, one "resync"
+    message queued so it reloads state) or, if it has not even taken the
+    previous resync or WS_OVERFLOW_POLICY is "drop", disconnected. Failed
+    or stalled sends remove the connection.
+    """
+    
+    def __init__(self):
+        self.active_connections: Dict[WebSocket, _Client] = {}
+        self.sent = 0
+        self.resyncs = 0
+        self.dropped = 0
+    
+    async def connect(self, websocket: WebSocket):
+        await websocket.accept()
+        client = _Client(websocket)
+        client.writer = asyncio.create_task(self._write(client))
+        self.active_connections[websocket] = client
+    
+    def disconnect(self, websocket: WebSocket):
+        client = self.active_connections.pop(websocket, None)
+        if client is not None:
+            client.writer.cancel()
+
+    def _drop(self, client: _Client, reason: str):
+        """Disconnect a dead or hopelessly slow client"""
+        if self.active_connections.get(client.websocket) is not client:
+            return
+        self.dropped += 1
+        print(f"Dropping WebSocket client: {reason}")
+        self.disconnect(client.websocket)
+        asyncio.create_task(self._close(client.websocket))
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            # 1013: try again later
+            await asyncio.wait_for(websocket.close(code=1013), WS_SEND_TIMEOUT_SECONDS)
+        except Exception:
+            pass
+
+    async def _write(self, client: _Client):
+        while True:
+            text = await client.queue.get()
+            try:
+                await asyncio.wait_for(client.websocket.send_text(text), WS_SEND_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                self._drop(client, "send timed out")
+                return
+            except Exception as e:
+                self._drop(client, f"send failed ({type(e).__name__})")
+                return
+            self.sent += 1
+            if text is RESYNC_MESSAGE:
+                client.resync_pending = False
+
+    def _enqueue(self, client: _Client, text: str):
+        try:
+            client.queue.put_nowait(text)
+            return
+        except asyncio.QueueFull:
+            pass
+        if WS_OVERFLOW_POLICY == "drop" or client.resync_pending:
+            self._drop(client, "outbound queue full")
+            return
+        # Everything queued is superseded by the reload the client will do
+        while not client.queue.empty():
+            client.queue.get_nowait()
+        client.queue.put_nowait(RESYNC_MESSAGE)
+        client.resync_pending = True
+        self.resyncs += 1
+    
+    async def broadcast(self, message: dict):
+        """Queue a message for every connected client (never waits on sends)"""
+        text = dumps(message).decode()
+        for client in list(self.active_connections.values()):
+            self._enqueue(client, text)
+    
+    async def send_personal_message(self, message: dict, websocket: WebSocket):
+        client = self.active_connections.get(websocket)
+        if client is not None:
+            self._enqueue(client, dumps(message).decode())
+
+    def stats(self) -> dict:
+        return {
+            "connections": len(self.active_connections),
+            "queued": sum(client.queue.qsize() for client in self.active_connections.values()),
+            "queue_size": WS_QUEUE_SIZE,
+            "overflow_policy": WS_OVERFLOW_POLICY,
+            "sent": self.sent,
+            "resyncs": self.resyncs,
+            "dropped": self.dropped
+        }
+
+
+manager = ConnectionManager()
+
+
+def report_to_dict(report: Report) -> dict:
+    """Serialize a report for WebSocket messages"""
+    return {
+        "id": report.id,
+        "raw_text": report.raw_text,
+        "location": report.location,
+        "latitude": report.latitude,
+        "longitude": report.longitude,
+        "hazard_type": report.hazard_type,
+        "severity": report.severity,
+        "confidence_score": report.confidence_score,
+        "timestamp": report.timestamp.isoformat() if report.timestamp else None,
+        "is_verified": report.is_verified
+    }
+
+
+async def broadcast_new_report(report_data: dict):
+    """Broadcast a new report to all connected clients"""
+    await manager.broadcast({
+        "type": "new_report",
+        "data": report_data
+    })
+
+
+async def broadcast_new_incident(incident_data: dict):
+    """Broadcast a new incident to all connected clients"""
+    await manager.broadcast({
+        "type": "new_incident",
+        "data": incident_data
+    })
+
+
+async def broadcast_surge(surge_data: dict):
+    """Broadcast a detected report surge to all connected clients"""
+    await manager.broadcast({
+        "type": "surge",
+        "data": surge_data
+    })
@@ -1,9 +1,18 @@
 from geopy.distance import geodesic
 from typing import Optional, Tuple
-from sqlalchemy.orm import Session
+from sqlalchemy import case, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.incident import Incident
 from app.models.report import Report
 
+SEVERITY_ORDER = {"Low": 1, "Medium": 2, "High": 3}
+# Incident counter column for each report severity
+SEVERITY_COUNT_COLUMNS = {
+    "Low": "severity_low_count",
+    "Medium": "severity_medium_count",
+    "High": "severity_high_count"
+}
+
 
 def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
@@ -22,11 +31,11 @@ def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     return geodesic((lat1, lon1), (lat2, lon2)).meters
 
 
-def find_nearby_incident(
+async def find_nearby_incident(
     latitude: Optional[float],
     longitude: Optional[float],
     hazard_type: Optional[str],
-    db: Session,
+    db: AsyncSession,
     radius_meters: float = 500.0
 ) -> Optional[Incident]:
     """
@@ -46,12 +55,13 @@ def find_nearby_incident(
         return None
     
     # Get all active incidents with the same hazard type
-    active_incidents = db.query(Incident).filter(
+    result = await db.execute(select(Incident).filter(
         Incident.is_active == True,
         Incident.hazard_type == hazard_type,
         Incident.latitude.isnot(None),
         Incident.longitude.isnot(None)
-    ).all()
+    ))
+    active_incidents = result.scalars().all()
     
     for incident in active_incidents:
         distance = calculate_distance(
@@ -65,31 +75,72 @@ def find_nearby_incident(
     return None
 
 
-def update_incident_with_report(incident: Incident, report_data: dict) -> None:
+def new_incident_counters(report_data: dict) -> dict:
+    """
+    Counter column values for an incident opened by its first report.
+
+    Args:
+        report_data: Dictionary with report data (severity)
+
+    Returns:
+        Keyword arguments for the Incident constructor
+    """
+    severity = report_data.get("severity")
+    counters = {
+        "witness_count": 1,
+        "report_count": 1,
+        "last_report_at": func.now(),
+        "latest_severity": severity
+    }
+    if severity in SEVERITY_COUNT_COLUMNS:
+        counters[SEVERITY_COUNT_COLUMNS[severity]] = 1
+    return counters
+
+
+async def update_incident_with_report(db: AsyncSession, incident_id: int, report_data: dict) -> None:
     """
     Update an incident's metadata based on a new report.
-    Increases witness count, updates confidence, and potentially severity.
-    
+    Increases witness and report counts, records the last report time and
+    severity, updates confidence, and potentially severity.
+
+    Everything happens in one UPDATE with SQL-side expressions
+    (count = count + 1, CASE for max confidence / escalation) rather than
+    read-modify-write in Python, so concurrent workers can't lose updates.
+    In-session Incident objects are not refreshed.
+
     Args:
-        incident: The incident to update
+        db: Database session
+        incident_id: ID of the incident to update
         report_data: Dictionary with report data (severity, confidence_score)
     """
-    # Increase witness count
-    incident.witness_count += 1
-    
-    # Update confidence score (average or max, using max for now)
+    severity = report_data.get("severity")
+    values = {
+        "witness_count": Incident.witness_count + 1,
+        "report_count": Incident.report_count + 1,
+        "last_report_at": func.now(),
+        "latest_severity": severity
+    }
+    if severity in SEVERITY_COUNT_COLUMNS:
+        column = SEVERITY_COUNT_COLUMNS[severity]
+        values[column] = getattr(Incident, column) + 1
+
+    # Keep the highest confidence seen
     new_confidence = report_data.get("confidence_score", 0.0)
-    if incident.confidence_score is None:
-        incident.confidence_score = new_confidence
-    else:
-        # Use weighted average (favor higher confidence)
-        incident.confidence_score = max(incident.confidence_score, new_confidence)
-    
+    if new_confidence is not None:
+        values["confidence_score"] = case(
+            (or_(Incident.confidence_score.is_(None), Incident.confidence_score < new_confidence), new_confidence),
+            else_=Incident.confidence_score
+        )
+
     # Update severity if new report indicates higher severity
-    severity_order = {"Low": 1, "Medium": 2, "High": 3}
-    new_severity = report_data.get("severity", "Low")
-    current_severity = incident.severity or "Low"
-    
-    if severity_order.get(new_severity, 0) > severity_order.get(current_severity, 0):
-        incident.severity = new_severity
+    new_rank = SEVERITY_ORDER.get(severity or "Low", 0)
+    current_rank = case(SEVERITY_ORDER, value=func.coalesce(Incident.severity, "Low"), else_=0)
+    if new_rank:
+        values["severity"] = case((current_rank < new_rank, severity or "Low"), else_=Incident.severity)
 
+    await db.execute(
+        update(Incident)
+        .filter(Incident.id == incident_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,80 @@
+"""
+Dashboard statistics, computed in one round trip and served from an
+in-process TTL cache.
+
+Every open dashboard polls these numbers, so they are cached for
+DASHBOARD_STATS_TTL_SECONDS (the staleness tolerance; 0 disables the
+cache). Writers to reports, incidents and resources call
+invalidate_dashboard_stats so this worker recomputes on the next poll;
+other workers see the change once their own entry expires.
+"""
+import os
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import TTLCache
+from app.models.incident import Incident
+from app.models.report import ArchivedReport, Report
+from app.models.resource import Resource
+
+load_dotenv()
+
+DASHBOARD_STATS_TTL_SECONDS = float(os.getenv("DASHBOARD_STATS_TTL_SECONDS", "10"))
+
+_stats_cache = TTLCache(ttl_seconds=DASHBOARD_STATS_TTL_SECONDS, max_entries=1)
+
+
+def _count(column, *filters):
+    return select(func.count(column)).filter(*filters).scalar_subquery()
+
+
+async def _query_dashboard_stats(db: AsyncSession) -> dict:
+    last_24h = datetime.utcnow() - timedelta(hours=24)
+    row = (await db.execute(select(
+        _count(Report.id).label("reports"),
+        _count(ArchivedReport.id).label("archived_reports"),
+        _count(Incident.id, Incident.is_active == True).label("active_incidents"),
+        _count(Resource.id, Resource.status == "needed").label("resources_needed"),
+        _count(Resource.id, Resource.status == "available").label("resources_available"),
+        _count(Report.id, Report.timestamp >= last_24h).label("recent_reports"),
+        _count(Incident.id, Incident.created_at >= last_24h).label("recent_incidents")
+    ))).one()
+
+    return {
+        "total_reports": row.reports + row.archived_reports,
+        "active_incidents": row.active_incidents,
+        "resources_needed": row.resources_needed,
+        "resources_available": row.resources_available,
+        "recent_activity_24h": {
+            "reports": row.recent_reports,
+            "incidents": row.recent_incidents
+        }
+    }
+
+
+async def dashboard_stats(db: AsyncSession, use_cache: bool = True) -> dict:
+    """
+    Dashboard statistics, at most DASHBOARD_STATS_TTL_SECONDS old.
+
+    Args:
+        db: Database session
+        use_cache: False to recompute (and re-cache) even on a hit, e.g.
+            for clients that just wrote and must see their own change
+    """
+    stats = _stats_cache.get("stats") if use_cache else None
+    if stats is None:
+        stats = await _query_dashboard_stats(db)
+        if DASHBOARD_STATS_TTL_SECONDS > 0:
+            _stats_cache.set("stats", stats)
+    return stats
+
+
+def invalidate_dashboard_stats():
+    """Drop the cached statistics after reports, incidents or resources change"""
+    _stats_cache.invalidate()
+
+
+def dashboard_cache_stats() -> dict:
+    """Hit/miss counters for the dashboard statistics cache"""
+    return {**_stats_cache.stats(), "ttl_seconds": DASHBOARD_STATS_TTL_SECONDS}
@@ -0,0 +1,178 @@
+"""
+Streaming exports of reports and incidents for after-action reviews.
+
+Rows are read through a server-side cursor EXPORT_CHUNK_SIZE at a time
+and each chunk is encoded and sent before the next one is fetched, so
+memory stays flat however many rows are exported. Formats: CSV, NDJSON
+and (when pyarrow is installed) Parquet.
+"""
+import csv
+import enum
+import io
+import os
+from datetime import date, datetime
+from typing import AsyncIterator, Awaitable, Callable, List
+from dotenv import load_dotenv
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Boolean, DateTime, Enum, Float, Integer
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from app.core.serialization import dumps
+from app.database import ReadSessionLocal
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+load_dotenv()
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+# Rows per Parquet row group (buffered before each write)
+EXPORT_PARQUET_ROW_GROUP = int(os.getenv("EXPORT_PARQUET_ROW_GROUP", "50000"))
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet"
+}
+
+StatementBuilder = Callable[[AsyncSession], Awaitable[Select]]
+
+
+async def _row_chunks(build: StatementBuilder, names: List[str]) -> AsyncIterator[List[dict]]:
+    # The response outlives the request's dependencies, so the stream
+    # opens its own session for as long as it runs
+    async with ReadSessionLocal() as db:
+        stmt = await build(db)
+        result = await db.stream(stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        async for partition in result.partitions(EXPORT_CHUNK_SIZE):
+            yield [dict(zip(names, row)) for row in partition]
+
+
+def _csv_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+async def _csv(chunks: AsyncIterator[List[dict]], columns: List) -> AsyncIterator[bytes]:
+    names = [column.key for column in columns]
+    # Only datetime and enum cells need converting; csv writes None as ""
+    converted = [column.key for column in columns if isinstance(column.type, (DateTime, Enum))]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    yield buffer.getvalue().encode()
+    async for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows:
+            for key in converted:
+                if row[key] is not None:
+                    row[key] = _csv_value(row[key])
+        writer.writerows([row[name] for name in names] for row in rows)
+        yield buffer.getvalue().encode()
+
+
+async def _ndjson(chunks: AsyncIterator[List[dict]]) -> AsyncIterator[bytes]:
+    async for rows in chunks:
+        yield b"".join(dumps(row) + b"\n" for row in rows)
+
+
+def _arrow_type(column):
+    column_type = column.type
+    if isinstance(column_type, Enum):
+        return pyarrow.string()
+    if isinstance(column_type, Boolean):
+        return pyarrow.bool_()
+    if isinstance(column_type, Integer):
+        return pyarrow.int64()
+    if isinstance(column_type, Float):
+        return pyarrow.float64()
+    if isinstance(column_type, DateTime):
+        return pyarrow.timestamp("us", tz="UTC" if column_type.timezone else None)
+    return pyarrow.string()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+async def _parquet(chunks: AsyncIterator[List[dict]], columns: List) -> AsyncIterator[bytes]:
+    schema = pyarrow.schema([(column.key, _arrow_type(column)) for column in columns])
+    enum_keys = [column.key for column in columns if isinstance(column.type, Enum)]
+    sink = _ChunkSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema)
+    pending: List[dict] = []
+
+    def write_row_group():
+        for row in pending:
+            for key in enum_keys:
+                if row[key] is not None:
+                    row[key] = row[key].value
+        writer.write_table(pyarrow.Table.from_pylist(pending, schema=schema))
+        pending.clear()
+
+    async for rows in chunks:
+        pending.extend(rows)
+        if len(pending) >= EXPORT_PARQUET_ROW_GROUP:
+            write_row_group()
+            yield sink.drain()
+    if pending:
+        write_row_group()
+    writer.close()
+    yield sink.drain()
+
+
+def export_response(name: str, build: StatementBuilder, columns: List, export_format: str) -> StreamingResponse:
+    """
+    Chunked download of the rows selected by build(db).
+
+    Args:
+        name: File name prefix ("reports", "incidents")
+        build: Returns the SELECT to export (columns in the order given)
+        columns: Model columns being exported, for headers and Parquet types
+        export_format: "csv", "ndjson" or "parquet"
+
+    Returns:
+        StreamingResponse with a Content-Disposition attachment header
+    """
+    names = [column.key for column in columns]
+    chunks = _row_chunks(build, names)
+    if export_format == "csv":
+        body = _csv(chunks, columns)
+    elif export_format == "ndjson":
+        body = _ndjson(chunks)
+    else:
+        body = _parquet(chunks, columns)
+    filename = f"{name}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.{export_format}"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
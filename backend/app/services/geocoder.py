@@ -1,8 +1,23 @@
 from geopy.geocoders import Nominatim
 from geopy.exc import GeocoderTimedOut, GeocoderServiceError
 from typing import Tuple, Optional
+import threading
 import time
 
+# Nominatim allows 1 request per second per application; shared across threads
+_rate_lock = threading.Lock()
+_last_request_at = 0.0
+
+
+def _wait_for_rate_limit():
+    """Space geocoding requests at least 1 second apart, even when called concurrently"""
+    global _last_request_at
+    with _rate_lock:
+        wait = _last_request_at + 1.0 - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _last_request_at = time.monotonic()
+
 
 def get_coordinates(address: str) -> Tuple[Optional[float], Optional[float]]:
     """
@@ -19,8 +34,7 @@ def get_coordinates(address: str) -> Tuple[Optional[float], Optional[float]]:
     
     try:
         geolocator = Nominatim(user_agent="crisisflow_app")
-        # Add a small delay to respect rate limits (1 request per second)
-        time.sleep(1)
+        _wait_for_rate_limit()
         location = geolocator.geocode(address, timeout=10)
         
         if location:
@@ -0,0 +1,186 @@
+"""
+Report density grids for the map heat layer.
+
+Reports inside a bounding box and time window are binned into a regular
+lat/lon grid by a GROUP BY in the database, so only non-empty cells leave
+it. The grid is returned row-major from the south-west corner, either as
+a dense array of counts or run-length encoded. Only the non-empty cells
+are cached, per tile (bbox, cell size, hazard) and window, for
+HEATMAP_CACHE_TTL_SECONDS and up to HEATMAP_CACHE_MAX_CELLS cells in total;
+each response is expanded from them.
+"""
+import os
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from sqlalchemy import Integer, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import TTLCache
+from app.database import IS_SQLITE
+from app.services.archive import reports_since
+
+load_dotenv()
+
+HEATMAP_CACHE_TTL_SECONDS = float(os.getenv("HEATMAP_CACHE_TTL_SECONDS", "30"))
+# Largest grid (rows * cols) a single request may ask for
+HEATMAP_MAX_CELLS = int(os.getenv("HEATMAP_MAX_CELLS", "250000"))
+
+# Non-empty cells held by the cache across all entries
+HEATMAP_CACHE_MAX_CELLS = int(os.getenv("HEATMAP_CACHE_MAX_CELLS", "1000000"))
+
+_heatmap_cache = TTLCache(
+    ttl_seconds=HEATMAP_CACHE_TTL_SECONDS, max_entries=512, max_weight=HEATMAP_CACHE_MAX_CELLS
+)
+
+
+class GridTooLargeError(ValueError):
+    pass
+
+
+def grid_shape(bbox: Tuple[float, float, float, float], cell_degrees: float) -> Tuple[int, int]:
+    """(rows, cols) of the grid covering bbox; raises GridTooLargeError past HEATMAP_MAX_CELLS"""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    rows = max(1, int(-(-(max_lat - min_lat) // cell_degrees)))
+    cols = max(1, int(-(-(max_lon - min_lon) // cell_degrees)))
+    if rows * cols > HEATMAP_MAX_CELLS:
+        raise GridTooLargeError(
+            f"Grid of {rows}x{cols} cells exceeds {HEATMAP_MAX_CELLS}; use a larger cell_degrees or smaller bbox"
+        )
+    return rows, cols
+
+
+def _bin(offset, cell_degrees: float):
+    # offset is >= 0 inside the bbox, so SQLite's truncating CAST is floor
+    if IS_SQLITE:
+        return cast(offset / cell_degrees, Integer)
+    return cast(func.floor(offset / cell_degrees), Integer)
+
+
+def sparse_run_length_encode(indices, values, size: int) -> List[int]:
+    """run_length_encode() of a grid of `size` cells given only its non-empty cells, by ascending index"""
+    encoded = []
+    position = 0
+    for index, value in zip(indices, values):
+        if index > position:
+            if encoded and encoded[-2] == 0:
+                encoded[-1] += index - position
+            else:
+                encoded.extend([0, index - position])
+        if encoded and encoded[-2] == value:
+            encoded[-1] += 1
+        else:
+            encoded.extend([value, 1])
+        position = index + 1
+    if size > position:
+        if encoded and encoded[-2] == 0:
+            encoded[-1] += size - position
+        else:
+            encoded.extend([0, size - position])
+    return encoded
+
+
+def run_length_encode(values: List[int]) -> List[int]:
+    """[value, run_length, value, run_length, ...]"""
+    encoded = []
+    for value in values:
+        if encoded and encoded[-2] == value:
+            encoded[-1] += 1
+        else:
+            encoded.extend([value, 1])
+    return encoded
+
+
+async def report_heatmap(
+    db: AsyncSession,
+    bbox: Tuple[float, float, float, float],
+    cell_degrees: float,
+    hours: int = 24,
+    until: Optional[datetime] = None,
+    hazard_type: Optional[str] = None,
+    encoding: str = "dense"
+) -> dict:
+    """
+    Count reports per grid cell.
+
+    Args:
+        db: Database session
+        bbox: (min_lon, min_lat, max_lon, max_lat)
+        cell_degrees: Cell size in degrees of latitude/longitude
+        hours: Window length, ending at until
+        until: End of the window (default now)
+        hazard_type: Only count this hazard type
+        encoding: "dense" (rows * cols counts) or "rle" (value, run pairs)
+
+    Returns:
+        Grid metadata with counts row-major from the south-west corner
+    """
+    rows, cols = grid_shape(bbox, cell_degrees)
+    if until is not None and until.tzinfo is not None:
+        until = until.astimezone(timezone.utc).replace(tzinfo=None)
+    key = (bbox, cell_degrees, hours, until, hazard_type)
+    grid = _heatmap_cache.get(key)
+    if grid is None:
+        grid = await _query_cells(db, bbox, cell_degrees, rows, cols, hours, until, hazard_type)
+        _heatmap_cache.set(key, grid, weight=len(grid["indices"]) + 1)
+
+    indices, values = grid["indices"], grid["values"]
+    if encoding == "rle":
+        counts = sparse_run_length_encode(indices, values, rows * cols)
+    else:
+        counts = [0] * (rows * cols)
+        for index, value in zip(indices, values):
+            counts[index] = value
+    return {
+        "bbox": list(bbox),
+        "cell_degrees": cell_degrees,
+        "rows": rows,
+        "cols": cols,
+        "since": grid["since"],
+        "until": grid["until"],
+        "total": sum(values),
+        "max": max(values, default=0),
+        "encoding": encoding,
+        "counts": counts
+    }
+
+
+async def _query_cells(
+    db: AsyncSession,
+    bbox: Tuple[float, float, float, float],
+    cell_degrees: float,
+    rows: int,
+    cols: int,
+    hours: int,
+    until: Optional[datetime],
+    hazard_type: Optional[str]
+) -> dict:
+    """Window bounds and the non-empty cells as row-major indices (ascending) and counts"""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    end = until or datetime.utcnow()
+    start = end - timedelta(hours=hours)
+    source = await reports_since(db, start)
+    row = _bin(source.c.latitude - min_lat, cell_degrees).label("row")
+    col = _bin(source.c.longitude - min_lon, cell_degrees).label("col")
+    query = select(row, col, func.count().label("reports")).filter(
+        source.c.latitude.between(min_lat, max_lat),
+        source.c.longitude.between(min_lon, max_lon),
+        source.c.timestamp >= start,
+        source.c.timestamp < end
+    ).group_by(row, col)
+    if hazard_type:
+        query = query.filter(source.c.hazard_type == hazard_type)
+
+    counts: Dict[int, int] = {}
+    for cell_row, cell_col, reports in (await db.execute(query)).all():
+        # Points on the north/east edge fall just outside the last cell
+        index = min(cell_row, rows - 1) * cols + min(cell_col, cols - 1)
+        counts[index] = counts.get(index, 0) + reports
+    indices = sorted(counts)
+    # Compact arrays: 16 bytes per cached cell instead of a tuple of two ints
+    return {
+        "since": start.isoformat(),
+        "until": end.isoformat(),
+        "indices": array("q", indices),
+        "values": array("q", (counts[index] for index in indices))
+    }
@@ -0,0 +1,266 @@
+import asyncio
+import json
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Append-only journal of raw inbound reports, written before processing
+INGEST_JOURNAL_ENABLED = os.getenv("INGEST_JOURNAL_ENABLED", "true").lower() == "true"
+INGEST_JOURNAL_PATH = os.getenv("INGEST_JOURNAL_PATH", "./crisisflow.journal")
+# How long an append waits for others to share its fsync
+INGEST_JOURNAL_GROUP_COMMIT_MS = float(os.getenv("INGEST_JOURNAL_GROUP_COMMIT_MS", "2"))
+# Rotate into an archived segment at startup once the journal grows past this
+INGEST_JOURNAL_MAX_BYTES = int(os.getenv("INGEST_JOURNAL_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Called with (payload, seq); returning False leaves the entry open (e.g. deferred for a retry)
+ReplayHandler = Callable[[dict, int], Awaitable[Optional[bool]]]
+
+
+def read_journal(path: str) -> Tuple[List[dict], Dict[int, str]]:
+    """
+    Read a journal file.
+
+    Args:
+        path: Journal file path
+
+    Returns:
+        Tuple of (entry records in write order, {seq: status} for finished entries).
+        A torn final line from a crash mid-write is ignored.
+    """
+    entries: List[dict] = []
+    done: Dict[int, str] = {}
+    if not os.path.exists(path):
+        return entries, done
+
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("type") == "entry":
+                entries.append(record)
+            elif record.get("type") == "done":
+                done[record["seq"]] = record.get("status", "processed")
+    return entries, done
+
+
+class IngestJournal:
+    """
+    Durable, append-only journal of raw inbound reports.
+
+    Entries are appended with group commit: concurrent appends arriving
+    within a short window share a single write + fsync, and each caller
+    resumes only once its entry is on disk. When processing finishes a
+    "done" record is appended; anything without one is replayed by
+    recover() on the next startup.
+    """
+
+    def __init__(
+        self,
+        path: str = INGEST_JOURNAL_PATH,
+        enabled: bool = INGEST_JOURNAL_ENABLED,
+        group_commit_ms: float = INGEST_JOURNAL_GROUP_COMMIT_MS,
+        max_bytes: int = INGEST_JOURNAL_MAX_BYTES
+    ):
+        self.path = path
+        self.enabled = enabled
+        self.group_commit_seconds = group_commit_ms / 1000.0
+        self.max_bytes = max_bytes
+        self.handlers: Dict[str, ReplayHandler] = {}
+        self._file = None
+        self._next_seq = 1
+        self._pending: List[Tuple[bytes, Optional[asyncio.Future]]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._recovered: List[dict] = []
+
+    def register_handler(self, source: str, handler: ReplayHandler):
+        """Register the coroutine that re-processes entries from a source"""
+        self.handlers[source] = handler
+
+    def open(self):
+        """
+        Open the journal for appending, collecting unfinished entries for
+        recover(). Oversized journals are rotated into an archived segment
+        (kept for replay) and the unfinished entries carried over with the
+        same seq, marked "carried_from" with the segment they were copied from.
+        """
+        if not self.enabled or self._file is not None:
+            return
+
+        self._truncate_torn_tail()
+        entries, done = read_journal(self.path)
+        self._recovered = [e for e in entries if e["seq"] not in done]
+        if entries:
+            self._next_seq = entries[-1]["seq"] + 1
+
+        rotate = os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes
+        if rotate:
+            segment = f"{self.path}.{int(time.time())}"
+            os.replace(self.path, segment)
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "ab")
+
+        if rotate and self._recovered:
+            carried = [{**e, "carried_from": os.path.basename(segment)} for e in self._recovered]
+            self._write_batch([self._encode(e) for e in carried])
+
+    def _truncate_torn_tail(self):
+        """Drop a partial last record left by a crash mid-write"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as f:
+            end = f.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                chunk_start = max(0, position - 4096)
+                f.seek(chunk_start)
+                chunk = f.read(position - chunk_start)
+                newline = chunk.rfind(b"\n")
+                if newline != -1:
+                    position = chunk_start + newline + 1
+                    break
+                position = chunk_start
+            if position != end:
+                f.truncate(position)
+
+    def close(self):
+        """
+        Write whatever is still pending (e.g. "done" records waiting for the
+        group-commit window), then close the journal file. Use aclose() from
+        async code so a flush already running in a worker thread finishes first.
+        """
+        if self._flush_task is not None:
+            # Still in its commit window, so it has not taken the batch yet
+            self._flush_task.cancel()
+            self._flush_task = None
+        batch, self._pending = self._pending, []
+        if self._file is not None:
+            if batch:
+                try:
+                    self._write_batch([line for line, _ in batch])
+                except Exception as e:
+                    print(f"Error writing ingestion journal: {e}")
+            self._file.close()
+            self._file = None
+        for _, future in batch:
+            if future is not None and not future.done():
+                future.set_result(None)
+
+    async def aclose(self):
+        """Wait for an in-progress flush, then close() (application shutdown)"""
+        if self._write_lock is None:
+            self._write_lock = asyncio.Lock()
+        async with self._write_lock:
+            self.close()
+
+    @staticmethod
+    def _encode(record: dict) -> bytes:
+        return (json.dumps(record, separators=(",", ":"), default=str) + "\n").encode()
+
+    def _write_batch(self, lines: List[bytes]):
+        """Write a batch of records and fsync once (runs in a worker thread)"""
+        self._file.write(b"".join(lines))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    async def _flush_soon(self):
+        """Wait for the group-commit window, then write everything pending"""
+        await asyncio.sleep(self.group_commit_seconds)
+        batch, self._pending = self._pending, []
+        self._flush_task = None
+
+        if self._write_lock is None:
+            self._write_lock = asyncio.Lock()
+        async with self._write_lock:
+            try:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self._write_batch, [line for line, _ in batch]
+                )
+            except Exception as e:
+                print(f"Error writing ingestion journal: {e}")
+                for _, future in batch:
+                    if future is not None and not future.done():
+                        future.set_exception(e)
+                return
+
+        for _, future in batch:
+            if future is not None and not future.done():
+                future.set_result(None)
+
+    def _enqueue(self, record: dict) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((self._encode(record), future))
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_soon())
+        return future
+
+    async def append(self, source: str, payload: dict) -> Optional[int]:
+        """
+        Durably record a raw inbound report before it is processed.
+
+        Args:
+            source: Ingestion source ("app", "sms" or "twitter")
+            payload: Everything needed to re-process the report
+
+        Returns:
+            Journal sequence number, or None if journaling is disabled
+        """
+        if not self.enabled:
+            return None
+        self.open()
+
+        seq = self._next_seq
+        self._next_seq += 1
+        await self._enqueue({
+            "type": "entry",
+            "seq": seq,
+            "source": source,
+            "ts": time.time(),
+            "payload": payload
+        })
+        return seq
+
+    def mark_done(self, seq: Optional[int], status: str = "processed"):
+        """
+        Record that an entry finished processing. Rides along with the next
+        group commit. If a crash loses it, recover() hands the entry to its
+        handler again; the pipeline's handler skips entries whose report was
+        already persisted (reports.ingest_seq), so nothing is counted twice.
+        """
+        if not self.enabled or seq is None:
+            return
+        future = self._enqueue({"type": "done", "seq": seq, "status": status})
+        future.add_done_callback(lambda f: f.exception())
+
+    async def recover(self):
+        """Replay entries that were journaled but never finished processing"""
+        if not self.enabled:
+            return
+        self.open()
+
+        pending, self._recovered = self._recovered, []
+        if pending:
+            print(f"Ingestion journal: replaying {len(pending)} unprocessed entries")
+
+        for entry in pending:
+            handler = self.handlers.get(entry["source"])
+            if handler is None:
+                print(f"Ingestion journal: no handler for source '{entry['source']}' (seq {entry['seq']})")
+                continue
+            try:
+                if await handler(entry["payload"], entry["seq"]) is False:
+                    continue
+                self.mark_done(entry["seq"], status="recovered")
+            except Exception as e:
+                print(f"Ingestion journal: replay of seq {entry['seq']} failed: {e}")
+                self.mark_done(entry["seq"], status="failed")
+
+
+ingest_journal = IngestJournal()
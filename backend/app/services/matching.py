@@ -0,0 +1,380 @@
+"""
+Spatial matching of needed resources to nearby available ones.
+
+Available resources are bucketed into a lat/lon grid per (resource_type,
+unit), sized so each occupied cell holds a couple of resources. For each need the k nearest compatible supplies (same type and
+unit, enough quantity left, within max_distance_km) are found by
+searching grid rings outward from the need's cell. All candidate pairs
+in the region are then assigned greedily, shortest distance first, and a
+supply can serve several needs while its quantity lasts. Needs whose
+candidates were all used up get another kNN round against the supplies
+that still have quantity left.
+
+Matches are suggestions only; nothing is written back to the resources.
+"""
+import heapq
+import math
+import os
+import time
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.resource import Resource, ResourceStatus
+
+load_dotenv()
+
+MATCH_DEFAULT_K = int(os.getenv("MATCH_DEFAULT_K", "5"))
+MATCH_MAX_DISTANCE_KM = float(os.getenv("MATCH_MAX_DISTANCE_KM", "50"))
+# kNN + greedy rounds for needs whose candidates were taken by closer needs
+MATCH_ROUNDS = int(os.getenv("MATCH_ROUNDS", "5"))
+
+# Grid cells are sized for about this many resources each, within these bounds
+RESOURCES_PER_CELL = 4
+# A lower quantity tier gets its own grid once it grows the supply set this much
+SUFFIX_GRID_GROWTH = 1.5
+MIN_CELL_DEGREES = 0.005
+MAX_CELL_DEGREES = 1.0
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+MATCH_COLUMNS = [
+    Resource.id, Resource.name, Resource.resource_type, Resource.status, Resource.quantity,
+    Resource.unit, Resource.location, Resource.latitude, Resource.longitude, Resource.incident_id
+]
+
+Cell = Tuple[int, int]
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in kilometers"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _cell_size(count: int, lat_span: float, lon_span: float) -> float:
+    """Cell size (degrees) giving about RESOURCES_PER_CELL resources per cell"""
+    area = max(lat_span, MIN_CELL_DEGREES) * max(lon_span, MIN_CELL_DEGREES)
+    return min(max(math.sqrt(area * RESOURCES_PER_CELL / count), MIN_CELL_DEGREES), MAX_CELL_DEGREES)
+
+
+def _cell(latitude: float, longitude: float, cell_degrees: float) -> Cell:
+    return math.floor(latitude / cell_degrees), math.floor(longitude / cell_degrees)
+
+
+def _tier(quantity: float) -> int:
+    """Power-of-two quantity band: supplies in tier t hold [2**t, 2**(t + 1)) units"""
+    return math.floor(math.log2(max(quantity, 1e-9)))
+
+
+class SupplyIndex:
+    """
+    Grids of available resources by remaining quantity, per (type, unit).
+
+    Quantities are banded into power-of-two tiers and a grid for tier t
+    holds every supply of tier t or above. A need searches only the
+    highest grid that still covers its tier, so large needs do not wade
+    through small supplies.
+    """
+
+    def __init__(
+        self,
+        supplies: List[dict],
+        remaining: Optional[List[float]] = None,
+        cell_degrees: Optional[float] = None
+    ):
+        self.supplies = supplies
+        self.remaining = remaining if remaining is not None else [supply["quantity"] for supply in supplies]
+        # Cells hold (index, latitude and longitude in radians, cos(latitude))
+        # so the distance test in _search() needs no lookups or trig
+        entries = [
+            (index, math.radians(supply["latitude"]), math.radians(supply["longitude"]),
+             math.cos(math.radians(supply["latitude"])))
+            for index, supply in enumerate(supplies)
+        ]
+        groups: Dict[tuple, Dict[int, List[int]]] = defaultdict(lambda: defaultdict(list))
+        for index, supply in enumerate(supplies):
+            if self.remaining[index] > 0:
+                groups[_compatibility(supply)][_tier(self.remaining[index])].append(index)
+
+        # {compatibility: [(tier, cell_degrees, cells), ...]} with tiers ascending
+        self._grids: Dict[tuple, List[Tuple[int, float, Dict[Cell, list]]]] = {}
+        latitudes = [supply["latitude"] for supply in supplies]
+        longitudes = [supply["longitude"] for supply in supplies]
+        floor = math.floor
+        for key, tiers in groups.items():
+            grids = []
+            members: List[int] = []
+            ordered = sorted(tiers, reverse=True)
+            for tier in ordered:
+                members = tiers[tier] + members
+                # Lower tiers only get their own grid once they add enough
+                # supplies; until then their needs use the next grid down
+                if grids and tier != ordered[-1] and len(members) < SUFFIX_GRID_GROWTH * grids[-1][3]:
+                    continue
+                size = cell_degrees or _cell_size(
+                    len(members),
+                    max(latitudes[index] for index in members) - min(latitudes[index] for index in members),
+                    max(longitudes[index] for index in members) - min(longitudes[index] for index in members)
+                )
+                cells: Dict[Cell, list] = {}
+                for index in members:
+                    cell = (floor(latitudes[index] / size), floor(longitudes[index] / size))
+                    if cell in cells:
+                        cells[cell].append(entries[index])
+                    else:
+                        cells[cell] = [entries[index]]
+                grids.append((tier, size, cells, len(members)))
+            self._grids[key] = [grid[:3] for grid in reversed(grids)]
+
+    def nearest(self, need: dict, k: int, max_distance_km: float) -> List[Tuple[float, int]]:
+        """
+        Up to k (distance_km, supply index) pairs for a need, nearest first.
+
+        Fewer than k pairs means every compatible supply within
+        max_distance_km with enough quantity left was returned.
+        """
+        grids = self._grids.get(_compatibility(need))
+        if not grids:
+            return []
+        # Highest grid still holding every tier from the need's up
+        need_tier = _tier(need["quantity"])
+        grid = grids[0]
+        for candidate in grids[1:]:
+            if candidate[0] > need_tier:
+                break
+            grid = candidate
+        best = self._search(grid[2], grid[1], need, k, max_distance_km)
+        latitude, longitude = need["latitude"], need["longitude"]
+        return sorted(
+            (haversine_km(latitude, longitude, self.supplies[index]["latitude"], self.supplies[index]["longitude"]), index)
+            for _, index in best
+        )
+
+    def _search(self, cells, cell_degrees: float, need: dict, k: int, max_distance_km: float) -> list:
+        # Rings of cells are searched outward from the need's cell, until k
+        # candidates are closer than anything in the next ring could be or
+        # the next ring is beyond max_distance_km
+        latitude, longitude, quantity = need["latitude"], need["longitude"], need["quantity"]
+        center_lat, center_lon = _cell(latitude, longitude, cell_degrees)
+        # Shortest east-west kilometers per degree anywhere within reach of the need
+        widest = min(abs(latitude) + max_distance_km / KM_PER_DEGREE, 89.0)
+        lon_km = KM_PER_DEGREE * max(math.cos(math.radians(widest)), 0.01)
+        max_ring = math.ceil(max_distance_km / (cell_degrees * lon_km)) + 1
+        phi, lam = math.radians(latitude), math.radians(longitude)
+        cos_phi = math.cos(phi)
+        remaining = self.remaining
+        # Small-angle haversine: the squared central angle is
+        # dphi^2 + cos(phi1) cos(phi2) dlam^2 to within 1e-5 at these
+        # distances, so candidates are ranked without any trig in the loop
+        limit = (max_distance_km / EARTH_RADIUS_KM) ** 2
+        best: List[Tuple[float, int]] = []  # max-heap of (-squared angle, index)
+
+        for ring in range(max_ring + 1):
+            if ring:
+                # Distance from the need to the edge of the square searched so
+                # far; nothing in this ring or beyond is closer
+                edge_km = min(
+                    (latitude - (center_lat - ring + 1) * cell_degrees) * KM_PER_DEGREE,
+                    ((center_lat + ring) * cell_degrees - latitude) * KM_PER_DEGREE,
+                    (longitude - (center_lon - ring + 1) * cell_degrees) * lon_km,
+                    ((center_lon + ring) * cell_degrees - longitude) * lon_km
+                )
+                bound = (edge_km / EARTH_RADIUS_KM) ** 2
+                if bound > limit or (len(best) == k and -best[0][0] <= bound):
+                    break
+            for offset_lat, offset_lon in _ring_offsets(ring):
+                bucket = cells.get((center_lat + offset_lat, center_lon + offset_lon))
+                if bucket is None:
+                    continue
+                for index, supply_phi, supply_lam, supply_cos_phi in bucket:
+                    if remaining[index] < quantity:
+                        continue
+                    dphi = supply_phi - phi
+                    dlam = supply_lam - lam
+                    angle = dphi * dphi + cos_phi * supply_cos_phi * dlam * dlam
+                    if angle > limit:
+                        continue
+                    if len(best) < k:
+                        heapq.heappush(best, (-angle, index))
+                    elif angle < -best[0][0]:
+                        heapq.heapreplace(best, (-angle, index))
+        return best
+
+
+def _compatibility(resource: dict) -> tuple:
+    return resource["resource_type"], (resource["unit"] or "").strip().lower()
+
+
+@lru_cache(maxsize=64)
+def _ring_offsets(ring: int) -> Tuple[Cell, ...]:
+    """(lat, lon) cell offsets on the square ring `ring` cells from the center"""
+    if ring == 0:
+        return ((0, 0),)
+    offsets = []
+    for d in range(-ring, ring + 1):
+        offsets += [(-ring, d), (ring, d)]
+    for d in range(-ring + 1, ring):
+        offsets += [(d, -ring), (d, ring)]
+    return tuple(offsets)
+
+
+def match_needs(
+    needs: List[dict],
+    supplies: List[dict],
+    k: int = MATCH_DEFAULT_K,
+    max_distance_km: float = MATCH_MAX_DISTANCE_KM,
+    rounds: int = MATCH_ROUNDS
+) -> dict:
+    """
+    Assign needs to available supplies (pure function over resource dicts).
+
+    Args:
+        needs: NEEDED resources with coordinates
+        supplies: AVAILABLE resources with coordinates
+        k: Nearest candidates considered per need and round
+        max_distance_km: Longest allowed distance between need and supply
+        rounds: kNN + greedy passes
+
+    Returns:
+        Dict with matches, unmatched need ids and counters
+    """
+    remaining = [supply["quantity"] for supply in supplies]
+    matches = []
+    unmatched = list(range(len(needs)))
+    infeasible: List[int] = []
+    candidates_considered = 0
+
+    for _ in range(rounds):
+        # Re-indexed every round by remaining quantity, so used-up supplies
+        # drop out and partly used ones move down to their new tier
+        index = SupplyIndex(supplies, remaining)
+        edges = []
+        # Needs whose search found fewer than k candidates saw every feasible
+        # supply; if they stay unassigned, no later round can help them
+        exhausted = set()
+        for need_index in unmatched:
+            candidates = index.nearest(needs[need_index], k, max_distance_km)
+            if len(candidates) < k:
+                exhausted.add(need_index)
+            for distance, supply_index in candidates:
+                edges.append((distance, need_index, supply_index))
+        if not edges:
+            break
+        candidates_considered += len(edges)
+        edges.sort()
+
+        assigned = set()
+        for distance, need_index, supply_index in edges:
+            quantity = needs[need_index]["quantity"]
+            if need_index in assigned or index.remaining[supply_index] < quantity:
+                continue
+            index.remaining[supply_index] -= quantity
+            assigned.add(need_index)
+            matches.append(_match(needs[need_index], supplies[supply_index], distance))
+        unmatched = [need_index for need_index in unmatched if need_index not in assigned]
+        retry = [need_index for need_index in unmatched if need_index not in exhausted]
+        if not assigned or not retry:
+            break
+        infeasible.extend(need_index for need_index in unmatched if need_index in exhausted)
+        unmatched = retry
+
+    return {
+        "matches": matches,
+        "unmatched_need_ids": sorted(needs[need_index]["id"] for need_index in infeasible + unmatched),
+        "stats": {
+            "needs": len(needs),
+            "available": len(supplies),
+            "matched": len(matches),
+            "candidates_considered": candidates_considered,
+            "total_distance_km": round(sum(match["distance_km"] for match in matches), 3)
+        }
+    }
+
+
+def _match(need: dict, supply: dict, distance: float) -> dict:
+    return {
+        "need_id": need["id"],
+        "resource_id": supply["id"],
+        "resource_type": need["resource_type"],
+        "quantity": need["quantity"],
+        "unit": need["unit"],
+        "distance_km": round(distance, 3),
+        "need_location": need["location"],
+        "resource_location": supply["location"],
+        "incident_id": need["incident_id"]
+    }
+
+
+async def match_resources(
+    db: AsyncSession,
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+    resource_type: Optional[str] = None,
+    incident_id: Optional[int] = None,
+    k: int = MATCH_DEFAULT_K,
+    max_distance_km: float = MATCH_MAX_DISTANCE_KM
+) -> dict:
+    """
+    Match NEEDED resources to nearby AVAILABLE ones.
+
+    Args:
+        db: Database session
+        bbox: (min_lon, min_lat, max_lon, max_lat) region for needs; supplies
+            are taken from the box grown by max_distance_km
+        resource_type: Only match this resource type
+        incident_id: Only match needs for this incident
+        k: Nearest candidates considered per need
+        max_distance_km: Longest allowed distance between need and supply
+
+    Returns:
+        Result of match_needs, with elapsed_ms added to stats
+    """
+    started = time.perf_counter()
+    query = select(*MATCH_COLUMNS).filter(
+        Resource.status.in_((ResourceStatus.NEEDED, ResourceStatus.AVAILABLE)),
+        Resource.latitude.isnot(None),
+        Resource.longitude.isnot(None),
+        Resource.quantity > 0
+    )
+    if resource_type:
+        query = query.filter(Resource.resource_type == resource_type)
+    if bbox:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        margin_lat = max_distance_km / KM_PER_DEGREE
+        widest = max(abs(min_lat), abs(max_lat)) + margin_lat
+        margin_lon = margin_lat / max(math.cos(math.radians(min(widest, 89.0))), 0.01)
+        query = query.filter(
+            Resource.latitude.between(min_lat - margin_lat, max_lat + margin_lat),
+            Resource.longitude.between(min_lon - margin_lon, max_lon + margin_lon)
+        )
+
+    needs, supplies = [], []
+    for row in (await db.execute(query)).all():
+        resource = dict(row._mapping)
+        resource["resource_type"] = resource["resource_type"].value
+        if resource.pop("status") == ResourceStatus.AVAILABLE:
+            supplies.append(resource)
+        elif _need_selected(resource, bbox, incident_id):
+            needs.append(resource)
+
+    # Oldest needs first among equal distances (ids grow with creation)
+    needs.sort(key=lambda need: need["id"])
+    result = match_needs(needs, supplies, k, max_distance_km)
+    result["stats"]["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def _need_selected(need: dict, bbox, incident_id: Optional[int]) -> bool:
+    if incident_id is not None and need["incident_id"] != incident_id:
+        return False
+    if bbox:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        return min_lat <= need["latitude"] <= max_lat and min_lon <= need["longitude"] <= max_lon
+    return True
@@ -0,0 +1,503 @@
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional, Set
+from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal
+from app.models.incident import Incident
+from app.models.report import ArchivedReport, Report
+from app.services.admission import admission_controller, LoadShedError
+from app.services.ai_processor import extract_report_data
+from app.services.broadcast import broadcast_new_report, broadcast_surge, report_to_dict
+from app.services.dashboard import invalidate_dashboard_stats
+from app.services.clustering import find_nearby_incident, new_incident_counters, update_incident_with_report
+from app.services.journal import ingest_journal
+from app.services.rollups import add_incident_to_rollups, add_reports_to_rollups
+from app.services.sms_integration import send_sms, build_confirmation_message, SMS_SEND_CONFIRMATION
+from app.services.surge import SURGE_DETECTION_ENABLED, surge_detector
+
+load_dotenv()
+
+# Prefix stored in Report.raw_text for each ingestion source
+SOURCE_PREFIXES = {"app": "", "twitter": "[Twitter] ", "sms": "[SMS] "}
+# Shed reports that were already persisted and acknowledged (SMS) are retried
+# after this delay, doubling per attempt; their journal entry stays open meanwhile
+PIPELINE_SHED_RETRY_DELAY_SECONDS = float(os.getenv("PIPELINE_SHED_RETRY_DELAY_SECONDS", "30"))
+PIPELINE_SHED_RETRY_ATTEMPTS = int(os.getenv("PIPELINE_SHED_RETRY_ATTEMPTS", "5"))
+
+
+def _stage_setting(stage: str, key: str, default: int) -> int:
+    """Read a per-stage setting such as PIPELINE_EXTRACT_CONCURRENCY"""
+    return int(os.getenv(f"PIPELINE_{stage.upper()}_{key}", str(default)))
+
+
+class IngestItem:
+    """A raw inbound report moving through the ingestion pipeline"""
+
+    def __init__(
+        self,
+        raw_text: str,
+        source: str = "app",
+        provider: str = "dummy",
+        image_base64: Optional[str] = None,
+        report_id: Optional[int] = None,
+        phone_number: Optional[str] = None,
+        journal_seq: Optional[int] = None,
+        replayed: bool = False
+    ):
+        self.raw_text = raw_text
+        self.source = source
+        self.provider = provider
+        self.image_base64 = image_base64
+        self.report_id = report_id  # set when the raw report was persisted up front (SMS)
+        self.phone_number = phone_number
+        self.journal_seq = journal_seq
+        self.replayed = replayed  # re-run from the journal; recover() marks it done
+        self.shed_retries = 0
+        self.priority: Optional[int] = None
+        self.processed_data: Optional[Dict] = None
+        self.incident_id: Optional[int] = None
+        self.report: Optional[Report] = None
+        self.error: Optional[Exception] = None
+
+    @property
+    def stored_text(self) -> str:
+        return f"{SOURCE_PREFIXES.get(self.source, '')}{self.raw_text}"
+
+    def journal_payload(self) -> dict:
+        return {
+            "raw_text": self.raw_text,
+            "image_base64": self.image_base64,
+            "provider": self.provider,
+            "report_id": self.report_id,
+            "phone_number": self.phone_number
+        }
+
+
+class Stage:
+    """
+    One step of the ingestion pipeline.
+
+    Items are handed to process_batch() in chunks of batch_size, with up
+    to `concurrency` chunks in flight. The default process_batch() calls
+    process_item() for each item and records per-item failures; stages
+    that work on a whole batch (e.g. one commit) override it instead.
+    """
+
+    name = "stage"
+
+    def __init__(self, batch_size: Optional[int] = None, concurrency: Optional[int] = None):
+        self.batch_size = batch_size or _stage_setting(self.name, "BATCH_SIZE", 1)
+        self.concurrency = concurrency or _stage_setting(self.name, "CONCURRENCY", 1)
+
+    async def process_batch(self, items: List[IngestItem], db: AsyncSession):
+        for item in items:
+            try:
+                await self.process_item(item, db)
+            except LoadShedError as e:
+                item.error = e
+            except Exception as e:
+                print(f"Pipeline stage '{self.name}' failed for {item.source} report: {e}")
+                item.error = e
+
+    async def process_item(self, item: IngestItem, db: AsyncSession):
+        raise NotImplementedError
+
+
+class JournalStage(Stage):
+    """Durably journal raw reports before any processing"""
+
+    name = "journal"
+
+    def __init__(self, batch_size: Optional[int] = None, concurrency: Optional[int] = None):
+        super().__init__(batch_size or _stage_setting(self.name, "BATCH_SIZE", 100), concurrency)
+
+    async def process_batch(self, items: List[IngestItem], db: AsyncSession):
+        to_journal = [i for i in items if i.journal_seq is None and not i.replayed]
+        seqs = await asyncio.gather(*[
+            ingest_journal.append(item.source, item.journal_payload()) for item in to_journal
+        ])
+        for item, seq in zip(to_journal, seqs):
+            item.journal_seq = seq
+
+
+class ExtractStage(Stage):
+    """
+    LLM / vision / keyword extraction and geocoding, behind the priority
+    admission controller so urgent reports get that capacity first
+    """
+
+    name = "extract"
+
+    def __init__(self, batch_size: Optional[int] = None, concurrency: Optional[int] = None):
+        super().__init__(batch_size, concurrency or _stage_setting(self.name, "CONCURRENCY", 8))
+
+    async def process_item(self, item: IngestItem, db: AsyncSession):
+        item.priority = admission_controller.score_report(item.raw_text)
+        async with admission_controller.admit(item.priority):
+            item.processed_data = await extract_report_data(
+                item.raw_text, provider=item.provider, image_base64=item.image_base64
+            )
+
+
+class ClusterStage(Stage):
+    """Attach each report to a nearby incident or open a new one"""
+
+    name = "cluster"
+
+    def __init__(self, batch_size: Optional[int] = None, concurrency: Optional[int] = None):
+        # Runs on the shared session, so batches must not overlap
+        super().__init__(batch_size or _stage_setting(self.name, "BATCH_SIZE", 50), 1)
+
+    async def process_item(self, item: IngestItem, db: AsyncSession):
+        processed_data = item.processed_data
+        nearby_incident = await find_nearby_incident(
+            latitude=processed_data.get("latitude"),
+            longitude=processed_data.get("longitude"),
+            hazard_type=processed_data.get("hazard_type"),
+            db=db,
+            radius_meters=500.0
+        )
+
+        if nearby_incident:
+            await update_incident_with_report(db, nearby_incident.id, processed_data)
+            await add_incident_to_rollups(db, nearby_incident.id, opened=False)
+            item.incident_id = nearby_incident.id
+        else:
+            new_incident = Incident(
+                location=processed_data.get("location"),
+                latitude=processed_data.get("latitude"),
+                longitude=processed_data.get("longitude"),
+                hazard_type=processed_data.get("hazard_type"),
+                severity=processed_data.get("severity"),
+                confidence_score=processed_data.get("confidence_score"),
+                is_active=True,
+                **new_incident_counters(processed_data)
+            )
+            db.add(new_incident)
+            await db.flush()  # Get the ID without committing
+            await add_incident_to_rollups(db, new_incident.id, opened=True)
+            item.incident_id = new_incident.id
+
+
+class PersistStage(Stage):
+    """Insert (or fill in pre-persisted) reports and commit once per batch"""
+
+    name = "persist"
+
+    def __init__(self, batch_size: Optional[int] = None, concurrency: Optional[int] = None):
+        super().__init__(batch_size or _stage_setting(self.name, "BATCH_SIZE", 100), 1)
+
+    async def process_batch(self, items: List[IngestItem], db: AsyncSession):
+        existing_ids = [i.report_id for i in items if i.report_id is not None]
+        existing = {}
+        if existing_ids:
+            result = await db.execute(select(Report).filter(Report.id.in_(existing_ids)))
+            existing = {r.id: r for r in result.scalars().all()}
+
+        for item in items:
+            data = item.processed_data
+            fields = dict(
+                location=data.get("location"),
+                latitude=data.get("latitude"),
+                longitude=data.get("longitude"),
+                hazard_type=data.get("hazard_type"),
+                severity=data.get("severity"),
+                confidence_score=data.get("confidence_score"),
+                incident_id=item.incident_id
+            )
+            if item.report_id is not None:
+                db_report = existing.get(item.report_id)
+                if db_report is None:
+                    item.error = LookupError(f"Report {item.report_id} no longer exists")
+                    continue
+                for field, value in fields.items():
+                    setattr(db_report, field, value)
+                if db_report.ingest_seq is None:
+                    db_report.ingest_seq = item.journal_seq
+            else:
+                db_report = Report(
+                    raw_text=item.stored_text, is_verified=False, ingest_seq=item.journal_seq, **fields
+                )
+                db.add(db_report)
+            item.report = db_report
+
+        try:
+            await db.flush()
+            await add_reports_to_rollups(db, [item.report.id for item in items if item.report is not None])
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            print(f"Pipeline stage '{self.name}' commit failed: {e}")
+            for item in items:
+                item.error = item.error or e
+                item.report = None
+            return
+        invalidate_dashboard_stats()
+
+        for item in items:
+            if item.report is not None:
+                await db.refresh(item.report)
+                item.report_id = item.report.id
+
+
+class BroadcastStage(Stage):
+    """Push new reports to WebSocket clients"""
+
+    name = "broadcast"
+
+    async def process_item(self, item: IngestItem, db: AsyncSession):
+        await broadcast_new_report(report_to_dict(item.report))
+
+
+class SurgeStage(Stage):
+    """Feed new reports to the surge detector and push any surge it raises"""
+
+    name = "surge"
+
+    def __init__(self, batch_size: Optional[int] = None, concurrency: Optional[int] = None):
+        super().__init__(batch_size or _stage_setting(self.name, "BATCH_SIZE", 100), 1)
+
+    async def process_batch(self, items: List[IngestItem], db: AsyncSession):
+        for item in items:
+            report = item.report
+            event = surge_detector.observe(report.latitude, report.longitude, report.hazard_type)
+            if event is not None:
+                await broadcast_surge(event)
+
+
+class SMSConfirmationStage(Stage):
+    """Text the sender back once their SMS report is processed"""
+
+    name = "sms_confirm"
+
+    def __init__(self, batch_size: Optional[int] = None, concurrency: Optional[int] = None):
+        super().__init__(batch_size, concurrency or _stage_setting(self.name, "CONCURRENCY", 4))
+
+    async def process_item(self, item: IngestItem, db: AsyncSession):
+        if SMS_SEND_CONFIRMATION and item.phone_number:
+            await run_in_threadpool(
+                send_sms,
+                item.phone_number,
+                build_confirmation_message(item.report_id, item.processed_data)
+            )
+
+
+class StageMetrics:
+    """Cumulative timing for one stage"""
+
+    def __init__(self):
+        self.items = 0
+        self.batches = 0
+        self.failures = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "items": self.items,
+            "batches": self.batches,
+            "failures": self.failures,
+            "total_seconds": round(self.total_seconds, 4),
+            "max_run_seconds": round(self.max_seconds, 4),
+            "avg_ms_per_item": round(self.total_seconds / self.items * 1000, 3) if self.items else 0
+        }
+
+
+class IngestionPipeline:
+    """
+    Runs inbound reports through a list of stages.
+
+    Every entry point (app, SMS, Twitter, journal replay) goes through
+    here, so batching, concurrency and caching changes to a stage apply
+    to all sources. Items that fail a stage skip the remaining stages;
+    journal entries are marked done or failed at the end.
+    """
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = stages
+        self.metrics: Dict[str, StageMetrics] = {stage.name: StageMetrics() for stage in stages}
+        # Scheduled shed retries, referenced until done so they are not garbage collected
+        self._retries: Set[asyncio.Task] = set()
+
+    async def _run_stage(self, stage: Stage, items: List[IngestItem], db: AsyncSession):
+        batches = [items[i:i + stage.batch_size] for i in range(0, len(items), stage.batch_size)]
+        if stage.concurrency > 1 and len(batches) > 1:
+            semaphore = asyncio.Semaphore(stage.concurrency)
+
+            async def bounded(batch):
+                async with semaphore:
+                    await stage.process_batch(batch, db)
+
+            await asyncio.gather(*[bounded(batch) for batch in batches])
+        else:
+            for batch in batches:
+                await stage.process_batch(batch, db)
+        return len(batches)
+
+    async def run(self, items: List[IngestItem], db: AsyncSession) -> List[IngestItem]:
+        """
+        Process items through every stage.
+
+        Args:
+            items: Inbound reports
+            db: Database session used by the clustering and persist stages
+
+        Returns:
+            The same items, with report or error set
+        """
+        for stage in self.stages:
+            active = [item for item in items if item.error is None]
+            if not active:
+                break
+            started = time.perf_counter()
+            batch_count = await self._run_stage(stage, active, db)
+            elapsed = time.perf_counter() - started
+
+            metrics = self.metrics[stage.name]
+            metrics.items += len(active)
+            metrics.batches += batch_count
+            metrics.failures += sum(1 for item in active if item.error is not None)
+            metrics.total_seconds += elapsed
+            metrics.max_seconds = max(metrics.max_seconds, elapsed)
+
+        for item in items:
+            if self._defer_shed(item):
+                continue
+            if not item.replayed:
+                ingest_journal.mark_done(item.journal_seq, status=self._journal_status(item))
+        return items
+
+    @staticmethod
+    def _journal_status(item: IngestItem) -> str:
+        if item.error is None:
+            return "processed"
+        if isinstance(item.error, LoadShedError):
+            return "shed"
+        return "failed"
+
+    def _defer_shed(self, item: IngestItem) -> bool:
+        """
+        Keep a shed, already-persisted report (SMS placeholder) alive: its
+        journal entry is left open and a retry is scheduled. Once retries
+        run out the open entry is replayed by the next startup's recover().
+        """
+        if not isinstance(item.error, LoadShedError) or item.report_id is None:
+            return False
+        if item.shed_retries < PIPELINE_SHED_RETRY_ATTEMPTS:
+            delay = PIPELINE_SHED_RETRY_DELAY_SECONDS * 2 ** item.shed_retries
+            item.shed_retries += 1
+            task = asyncio.create_task(self._retry_shed(item, delay))
+            self._retries.add(task)
+            task.add_done_callback(self._retries.discard)
+        else:
+            print(f"Report {item.report_id} shed {item.shed_retries + 1} times, left for journal recovery")
+        return True
+
+    async def _retry_shed(self, item: IngestItem, delay: float):
+        await asyncio.sleep(delay)
+        item.error = None
+        item.priority = None
+        # The retry closes the journal entry itself, also for replayed items
+        item.replayed = False
+        try:
+            await self.run_in_new_session([item])
+        except Exception as e:
+            print(f"Retry of shed report {item.report_id} failed: {e}")
+
+    async def cancel_retries(self):
+        """
+        Cancel scheduled shed retries (shutdown). Their journal entries stay
+        open, so the next startup's recover() picks the reports up again.
+        """
+        retries = list(self._retries)
+        for task in retries:
+            task.cancel()
+        await asyncio.gather(*retries, return_exceptions=True)
+
+    async def run_in_new_session(self, items: List[IngestItem]) -> List[IngestItem]:
+        """Run items with a dedicated session (background tasks, journal replay)"""
+        async with AsyncSessionLocal() as db:
+            return await self.run(items, db)
+
+    def stats(self) -> dict:
+        return {name: metrics.to_dict() for name, metrics in self.metrics.items()}
+
+
+def default_stages() -> List[Stage]:
+    stages = [JournalStage(), ExtractStage(), ClusterStage(), PersistStage(), BroadcastStage()]
+    if SURGE_DETECTION_ENABLED:
+        stages.append(SurgeStage())
+    return stages
+
+
+ingestion_pipeline = IngestionPipeline(default_stages())
+
+# SMS reports are journaled by the webhook before it answers, and confirm back to the sender
+sms_pipeline = IngestionPipeline(default_stages() + [SMSConfirmationStage()])
+
+
+async def _journaled_report(db: AsyncSession, seq: Optional[int], report_id: Optional[int]):
+    """(id, incident_id) of the report a journal entry already produced, hot or archived, or None"""
+    for reports in (Report.__table__, ArchivedReport.__table__):
+        conditions = []
+        if seq is not None:
+            conditions.append(reports.c.ingest_seq == seq)
+        if report_id is not None:
+            conditions.append(reports.c.id == report_id)
+        if not conditions:
+            return None
+        row = (await db.execute(
+            select(reports.c.id, reports.c.incident_id).filter(or_(*conditions)).limit(1)
+        )).first()
+        if row is not None:
+            return row
+    return None
+
+
+async def replay_journal_entry(source: str, payload: dict, seq: Optional[int] = None) -> bool:
+    """
+    Re-run a journal entry through the pipeline that originally handled it.
+
+    The entry may have been persisted before a crash lost its "done" record.
+    Persist writes the seq onto the report in the same transaction as the
+    incident counters and rollups, so an entry that already has a report is
+    skipped, as is an SMS placeholder that was already clustered. Otherwise
+    an unprocessed SMS placeholder is filled in, or a new report inserted.
+
+    Returns:
+        False if the report was shed and deferred for a retry (the entry
+        stays open), True once it was processed or found already processed
+    """
+    async with AsyncSessionLocal() as db:
+        existing = await _journaled_report(db, seq, payload.get("report_id"))
+    placeholder = existing is not None and source == "sms" and existing.incident_id is None
+    if existing is not None and not placeholder:
+        return True
+
+    item = IngestItem(
+        raw_text=payload["raw_text"],
+        source=source,
+        provider=payload.get("provider", "dummy"),
+        image_base64=payload.get("image_base64"),
+        report_id=existing.id if placeholder else None,
+        phone_number=payload.get("phone_number"),
+        journal_seq=seq,
+        replayed=True
+    )
+    pipeline = sms_pipeline if source == "sms" else ingestion_pipeline
+    await pipeline.run_in_new_session([item])
+    if isinstance(item.error, LoadShedError) and item.report_id is not None:
+        return False
+    if item.error is not None:
+        raise item.error
+    return True
+
+
+for _source in SOURCE_PREFIXES:
+    ingest_journal.register_handler(
+        _source, lambda payload, seq, source=_source: replay_journal_entry(source, payload, seq)
+    )
@@ -0,0 +1,116 @@
+"""
+Needed vs. available resource totals for the logistics dashboard.
+
+Totals come from one grouped query over (status, resource_type), or
+(incident_id, status, resource_type) for the per-incident breakdown,
+and are served from an in-process TTL cache for
+RESOURCE_SUMMARY_TTL_SECONDS (0 disables it). Resource writes call
+invalidate_resource_summary so this worker recomputes on the next poll.
+"""
+import os
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from app.core.cache import TTLCache
+from app.models.resource import Resource, ResourceStatus
+
+load_dotenv()
+
+RESOURCE_SUMMARY_TTL_SECONDS = float(os.getenv("RESOURCE_SUMMARY_TTL_SECONDS", "10"))
+
+SUMMARY_STATUSES = (ResourceStatus.NEEDED, ResourceStatus.AVAILABLE)
+
+_summary_cache = TTLCache(ttl_seconds=RESOURCE_SUMMARY_TTL_SECONDS, max_entries=256)
+
+
+def _summarize(needed_by_type: Dict[str, float], available_by_type: Dict[str, float]) -> dict:
+    return {
+        "needed": needed_by_type,
+        "available": available_by_type,
+        "summary": {
+            rtype: {
+                "needed": needed_by_type.get(rtype, 0),
+                "available": available_by_type.get(rtype, 0),
+                "deficit": needed_by_type.get(rtype, 0) - available_by_type.get(rtype, 0)
+            }
+            for rtype in set(needed_by_type) | set(available_by_type)
+        }
+    }
+
+
+def _split_by_status(rows) -> dict:
+    totals = {ResourceStatus.NEEDED: {}, ResourceStatus.AVAILABLE: {}}
+    for row in rows:
+        by_type = totals[row.status]
+        by_type[row.resource_type.value] = by_type.get(row.resource_type.value, 0) + row.quantity
+    return _summarize(totals[ResourceStatus.NEEDED], totals[ResourceStatus.AVAILABLE])
+
+
+def summary_statement(incident_id: Optional[int] = None, by_incident: bool = False) -> Select:
+    """Quantity totals grouped by (status, resource_type), and incident_id if by_incident"""
+    group = [Resource.status, Resource.resource_type]
+    query = select(*group, func.sum(Resource.quantity).label("quantity")).filter(
+        Resource.status.in_(SUMMARY_STATUSES)
+    )
+    if incident_id is not None:
+        query = query.filter(Resource.incident_id == incident_id)
+    if by_incident:
+        group.insert(0, Resource.incident_id)
+        query = query.add_columns(Resource.incident_id)
+    return query.group_by(*group)
+
+
+async def _query_resource_summary(db: AsyncSession, incident_id: Optional[int], by_incident: bool) -> dict:
+    rows = (await db.execute(summary_statement(incident_id, by_incident))).all()
+
+    summary = _split_by_status(rows)
+    if by_incident:
+        per_incident: Dict[Optional[int], List] = {}
+        for row in rows:
+            per_incident.setdefault(row.incident_id, []).append(row)
+        # Resources not tied to an incident are listed with incident_id None, last
+        summary["by_incident"] = [
+            {"incident_id": key, **_split_by_status(per_incident[key])}
+            for key in sorted(per_incident, key=lambda key: (key is None, key or 0))
+        ]
+    return summary
+
+
+async def resource_summary(
+    db: AsyncSession,
+    incident_id: Optional[int] = None,
+    by_incident: bool = False,
+    use_cache: bool = True
+) -> dict:
+    """
+    Needed, available and deficit quantities per resource type.
+
+    Args:
+        db: Database session
+        incident_id: Only count resources for this incident
+        by_incident: Also break the totals down per incident
+        use_cache: False to recompute (and re-cache) even on a hit
+
+    Returns:
+        {"needed": {...}, "available": {...}, "summary": {...}}, plus a
+        "by_incident" list of the same shape when by_incident is set
+    """
+    key = (incident_id, by_incident)
+    summary = _summary_cache.get(key) if use_cache else None
+    if summary is None:
+        summary = await _query_resource_summary(db, incident_id, by_incident)
+        if RESOURCE_SUMMARY_TTL_SECONDS > 0:
+            _summary_cache.set(key, summary)
+    return summary
+
+
+def invalidate_resource_summary():
+    """Drop every cached summary after a resource is created, changed or deleted"""
+    _summary_cache.invalidate()
+
+
+def resource_summary_cache_stats() -> dict:
+    """Hit/miss counters for the resource summary cache"""
+    return {**_summary_cache.stats(), "ttl_seconds": RESOURCE_SUMMARY_TTL_SECONDS}
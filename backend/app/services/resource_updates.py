@@ -0,0 +1,111 @@
+"""
+Bulk resource updates with optimistic concurrency.
+
+Every item carries the version it was based on. Stored versions are read
+first (locked FOR UPDATE where the database supports it) and items whose
+version no longer matches come back as conflicts instead of overwriting
+the newer change. The rest are written in the same transaction with one
+executemany UPDATE per set of changed fields, each row still guarded by
+`version = :expected` and bumping the version.
+"""
+from typing import Dict, List, Tuple
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
+from app.models.resource import Resource
+from app.schemas.resource import ResourceBulkUpdateItem
+
+# A concurrent writer can slip in between the version check and the UPDATE
+# where rows cannot be locked (SQLite); the batch is then re-checked
+BULK_UPDATE_ATTEMPTS = 3
+
+_resources = Resource.__table__
+
+
+def _update_statement(fields: Tuple[str, ...]):
+    return (
+        update(_resources)
+        .where(_resources.c.id == bindparam("b_id"), _resources.c.version == bindparam("b_version"))
+        .values({
+            **{_resources.c[field]: bindparam(f"v_{field}", type_=_resources.c[field].type) for field in fields},
+            _resources.c.version: _resources.c.version + 1
+        })
+    )
+
+
+def _plan(items: List[ResourceBulkUpdateItem], current: Dict[int, int]):
+    """Split items into conflicts and UPDATE parameter groups keyed by changed fields"""
+    groups: Dict[Tuple[str, ...], List[dict]] = {}
+    updated, conflicts, seen = [], [], set()
+    for item in items:
+        if item.id in seen:
+            conflicts.append({"id": item.id, "reason": "duplicate", "expected_version": item.version})
+            continue
+        seen.add(item.id)
+        stored = current.get(item.id)
+        if stored is None:
+            conflicts.append({"id": item.id, "reason": "not_found", "expected_version": item.version})
+            continue
+        if stored != item.version:
+            conflicts.append({
+                "id": item.id,
+                "reason": "version_mismatch",
+                "expected_version": item.version,
+                "current_version": stored
+            })
+            continue
+        changes = item.dict(exclude_unset=True, exclude={"id", "version"})
+        if not changes:
+            updated.append({"id": item.id, "version": stored})
+            continue
+        groups.setdefault(tuple(sorted(changes)), []).append({
+            "b_id": item.id,
+            "b_version": item.version,
+            **{f"v_{field}": value for field, value in changes.items()}
+        })
+        updated.append({"id": item.id, "version": stored + 1})
+    return groups, updated, conflicts
+
+
+async def bulk_update_resources(db: AsyncSession, items: List[ResourceBulkUpdateItem], atomic: bool = False) -> dict:
+    """
+    Apply many resource updates in one transaction.
+
+    Args:
+        db: Database session (committed here when anything was written)
+        items: Changes, each with the resource id and the version it was based on
+        atomic: Write nothing if any item conflicts
+
+    Returns:
+        {"updated": [{"id", "version"}], "conflicts": [{"id", "reason", ...}],
+        "applied": bool}; reason is "version_mismatch", "not_found" or "duplicate"
+
+    Raises:
+        StaleDataError: Rows kept changing underneath the batch on every attempt
+    """
+    ids = {item.id for item in items}
+    check_rowcount = db.bind.dialect.supports_sane_multi_rowcount
+    for _ in range(BULK_UPDATE_ATTEMPTS):
+        rows = await db.execute(
+            select(_resources.c.id, _resources.c.version).where(_resources.c.id.in_(ids)).with_for_update()
+        )
+        groups, updated, conflicts = _plan(items, dict(rows.all()))
+        if atomic and conflicts:
+            await db.rollback()
+            return {"updated": [], "conflicts": conflicts, "applied": False}
+        if not groups:
+            await db.rollback()
+            return {"updated": updated, "conflicts": conflicts, "applied": True}
+
+        raced = False
+        for fields, params in groups.items():
+            result = await db.execute(_update_statement(fields), params)
+            if check_rowcount and result.rowcount != len(params):
+                raced = True
+                break
+        if raced:
+            await db.rollback()
+            continue
+        await db.commit()
+        return {"updated": updated, "conflicts": conflicts, "applied": True}
+    raise StaleDataError(f"Resources kept changing during a bulk update of {len(ids)} rows")
@@ -0,0 +1,261 @@
+"""
+Hourly rollups of reports and incidents for the analytics endpoints.
+
+report_rollups_hourly holds report counts and confidence sums per hour,
+hazard type and severity, report_cell_rollups_hourly the same per hour,
+hazard type and region cell, and incident_rollups_hourly holds incident,
+active and witness counts per creation hour and hazard type.
+The ingestion pipeline adds to them in the same transaction as the rows
+it writes (see ClusterStage and PersistStage), and rebuild_rollups
+recomputes them from the raw tables (migration 0005 and
+scripts/rebuild_rollups.py).
+
+Analytics windows longer than ROLLUP_MIN_WINDOW_HOURS (a day) read whole hours
+from the rollups and only the partial first hour from the raw tables, so
+their cost depends on the window length rather than on data volume.
+"""
+import math
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from dotenv import load_dotenv
+from sqlalchemy import String, delete, func, insert, select, type_coerce, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import IS_SQLITE
+from app.models.incident import Incident
+from app.models.report import ArchivedReport, Report
+from app.models.rollup import IncidentRollup, ReportCellRollup, ReportRollup
+
+load_dotenv()
+
+# Size of the region cells reports are counted in (degrees of lat/lon)
+ROLLUP_CELL_DEGREES = float(os.getenv("ROLLUP_CELL_DEGREES", "0.1"))
+# Windows longer than this are answered from the rollups
+ROLLUP_MIN_WINDOW_HOURS = float(os.getenv("ROLLUP_MIN_WINDOW_HOURS", "24"))
+
+REPORT_SUMS = ("report_count", "confidence_sum")
+INCIDENT_SUMS = ("incident_count", "active_count", "active_witness_sum")
+
+_REBUILD_CHUNK = 5000
+
+
+def hour_bucket(ts: datetime) -> datetime:
+    """Start of the hour containing ts, as naive UTC"""
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def region_cell(
+    latitude: Optional[float],
+    longitude: Optional[float],
+    cell_degrees: float = ROLLUP_CELL_DEGREES
+) -> str:
+    """Grid cell key "lat_index:lon_index" ("" without coordinates)"""
+    if latitude is None or longitude is None:
+        return ""
+    return f"{math.floor(latitude / cell_degrees)}:{math.floor(longitude / cell_degrees)}"
+
+
+def use_rollups(since: datetime) -> bool:
+    return datetime.utcnow() - since > timedelta(hours=ROLLUP_MIN_WINDOW_HOURS)
+
+
+def first_full_hour(since: datetime) -> datetime:
+    """First hour boundary at or after since"""
+    bucket = hour_bucket(since)
+    return bucket if bucket == since else bucket + timedelta(hours=1)
+
+
+def timestamp_before(column, boundary: datetime):
+    """
+    column < boundary for a whole-second boundary. SQLite stores
+    timestamps as text in two formats, and "HH:MM:SS" sorts before
+    "HH:MM:SS.000000", so compare against the shorter form there.
+    """
+    if IS_SQLITE:
+        return type_coerce(column, String) < boundary.strftime("%Y-%m-%d %H:%M:%S")
+    return column < boundary
+
+
+def timestamp_at_or_after(column, boundary: datetime):
+    """column >= boundary for a whole-second boundary (see timestamp_before)"""
+    if IS_SQLITE:
+        return type_coerce(column, String) >= boundary.strftime("%Y-%m-%d %H:%M:%S")
+    return column >= boundary
+
+
+def _insert(table, dialect_name: str):
+    return sqlite.insert(table) if dialect_name == "sqlite" else postgresql.insert(table)
+
+
+def _upsert(table, dialect_name: str, sums: Tuple[str, ...]):
+    """INSERT ... ON CONFLICT (primary key) DO UPDATE SET col = col + excluded.col"""
+    stmt = _insert(table, dialect_name)
+    return stmt.on_conflict_do_update(
+        index_elements=[column.name for column in table.primary_key.columns],
+        set_={name: table.c[name] + stmt.excluded[name] for name in sums}
+    )
+
+
+def _report_cells(rows: Iterable) -> Tuple[Dict[tuple, list], Dict[tuple, list]]:
+    """
+    Sum report rows (timestamp, hazard, severity, confidence, lat, lon)
+    into [count, confidence] per (hour, hazard, severity) and per
+    (hour, hazard, cell)
+    """
+    by_severity = defaultdict(lambda: [0, 0.0])
+    by_cell = defaultdict(lambda: [0, 0.0])
+    for timestamp, hazard_type, severity, confidence, latitude, longitude in rows:
+        bucket, hazard = hour_bucket(timestamp), hazard_type or ""
+        for cells, key in ((by_severity, (bucket, hazard, severity or "")),
+                           (by_cell, (bucket, hazard, region_cell(latitude, longitude)))):
+            cells[key][0] += 1
+            cells[key][1] += confidence or 0.0
+    return by_severity, by_cell
+
+
+def _report_rows(cells: Dict[tuple, list], dimension: str) -> List[dict]:
+    return [
+        {"bucket": bucket, "hazard_type": hazard, dimension: value,
+         "report_count": count, "confidence_sum": confidence}
+        for (bucket, hazard, value), (count, confidence) in cells.items()
+    ]
+
+
+def _incident_cells(rows: Iterable) -> Dict[tuple, List[int]]:
+    """Sum incident rows (created_at, hazard, is_active, witness_count) per rollup key"""
+    cells = defaultdict(lambda: [0, 0, 0])
+    for created_at, hazard_type, is_active, witness_count in rows:
+        key = (hour_bucket(created_at), hazard_type or "")
+        cells[key][0] += 1
+        if is_active:
+            cells[key][1] += 1
+            cells[key][2] += witness_count
+    return cells
+
+
+def _incident_rows(cells: Dict[tuple, List[int]]) -> List[dict]:
+    return [
+        {"bucket": bucket, "hazard_type": hazard, "incident_count": count,
+         "active_count": active, "active_witness_sum": witnesses}
+        for (bucket, hazard), (count, active, witnesses) in cells.items()
+    ]
+
+
+REPORT_ROLLUP_COLUMNS = ("timestamp", "hazard_type", "severity", "confidence_score", "latitude", "longitude")
+
+
+async def add_reports_to_rollups(db: AsyncSession, report_ids: List[int]) -> None:
+    """
+    Count newly persisted reports in the report rollups. Call after the
+    reports are flushed and before the transaction commits.
+    """
+    if not report_ids:
+        return
+    result = await db.execute(
+        select(*[Report.__table__.c[name] for name in REPORT_ROLLUP_COLUMNS]).filter(Report.id.in_(report_ids))
+    )
+    by_severity, by_cell = _report_cells(result.all())
+    dialect_name = db.bind.dialect.name
+    if by_severity:
+        await db.execute(_upsert(ReportRollup.__table__, dialect_name, REPORT_SUMS),
+                         _report_rows(by_severity, "severity"))
+        await db.execute(_upsert(ReportCellRollup.__table__, dialect_name, REPORT_SUMS),
+                         _report_rows(by_cell, "cell"))
+
+
+async def add_incident_to_rollups(db: AsyncSession, incident_id: int, opened: bool) -> None:
+    """
+    Count an incident in the incident rollups: the whole incident when it
+    was just opened, otherwise the one witness its new report added.
+    """
+    created_at, hazard_type, is_active, witness_count = (await db.execute(
+        select(Incident.created_at, Incident.hazard_type, Incident.is_active, Incident.witness_count)
+        .filter(Incident.id == incident_id)
+    )).one()
+    if opened:
+        cells = _incident_cells([(created_at, hazard_type, is_active, witness_count)])
+    else:
+        cells = {(hour_bucket(created_at), hazard_type or ""): [0, 0, 1 if is_active else 0]}
+    await db.execute(_upsert(IncidentRollup.__table__, db.bind.dialect.name, INCIDENT_SUMS), _incident_rows(cells))
+
+
+def rebuild_rollups(conn: Connection, since: Optional[datetime] = None) -> dict:
+    """
+    Recompute the rollups from reports (hot and archived) and incidents,
+    for every hour or only the hours from since onwards. Rows written
+    while a rebuild runs on Postgres may be missed or counted twice, so
+    run it with ingestion paused there.
+
+    Args:
+        conn: Connection inside a transaction
+        since: Only rebuild hours starting at or after this time
+
+    Returns:
+        Number of rollup rows written per table
+    """
+    start = hour_bucket(since) if since else None
+    stream = {"stream_results": True, "yield_per": _REBUILD_CHUNK}
+
+    report_sources = []
+    for table in (Report.__table__, ArchivedReport.__table__):
+        query = select(*[table.c[name] for name in REPORT_ROLLUP_COLUMNS])
+        if start:
+            query = query.filter(timestamp_at_or_after(table.c.timestamp, start))
+        report_sources.append(query)
+    by_severity, by_cell = _report_cells(conn.execute(union_all(*report_sources).execution_options(**stream)))
+
+    incident_query = select(Incident.created_at, Incident.hazard_type, Incident.is_active, Incident.witness_count)
+    if start:
+        incident_query = incident_query.filter(timestamp_at_or_after(Incident.created_at, start))
+    incident_rows = _incident_rows(_incident_cells(conn.execute(incident_query.execution_options(**stream))))
+
+    written = {
+        ReportRollup.__table__: _report_rows(by_severity, "severity"),
+        ReportCellRollup.__table__: _report_rows(by_cell, "cell"),
+        IncidentRollup.__table__: incident_rows
+    }
+    for table, rows in written.items():
+        clear = delete(table)
+        if start:
+            clear = clear.filter(table.c.bucket >= start)
+        conn.execute(clear)
+        for offset in range(0, len(rows), _REBUILD_CHUNK):
+            conn.execute(insert(table), rows[offset:offset + _REBUILD_CHUNK])
+
+    return {table.name: len(rows) for table, rows in written.items()}
+
+
+async def report_rollup_cells(db: AsyncSession, since: datetime, hazard_type: Optional[str] = None):
+    """
+    Report counts and confidence sums per (day, severity, hazard) for the
+    rollup hours starting at or after since.
+    """
+    day = func.date(ReportRollup.bucket).label("day")
+    query = select(
+        day,
+        ReportRollup.severity,
+        ReportRollup.hazard_type,
+        func.sum(ReportRollup.report_count).label("reports"),
+        func.sum(ReportRollup.confidence_sum).label("confidence")
+    ).filter(ReportRollup.bucket >= since).group_by(day, ReportRollup.severity, ReportRollup.hazard_type).order_by(day)
+    if hazard_type:
+        query = query.filter(ReportRollup.hazard_type == hazard_type)
+    return (await db.execute(query)).all()
+
+
+async def incident_rollup_days(db: AsyncSession, since: datetime):
+    """Incident, active and witness counts per day for rollup hours from since"""
+    day = func.date(IncidentRollup.bucket).label("day")
+    return (await db.execute(
+        select(
+            day,
+            func.sum(IncidentRollup.incident_count).label("incidents"),
+            func.sum(IncidentRollup.active_count).label("active"),
+            func.sum(IncidentRollup.active_witness_sum).label("witnesses")
+        ).filter(IncidentRollup.bucket >= since).group_by(day).order_by(day)
+    )).all()
@@ -0,0 +1,212 @@
+"""
+Full-text search over reports (raw_text and location).
+
+SQLite uses the FTS5 table from migration 0004, ranked by bm25; Postgres
+uses the GIN-indexed tsvector expression, ranked by ts_rank. Hazard, time
+and bounding-box filters are applied to the matching reports in the same
+query. `reports_archive` has the same index (migration 0009) and is
+searched alongside the hot table when the time window reaches back into
+the archive; the two result sets are merged by rank (or id).
+"""
+import re
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import Table, column, func, literal_column, or_, select, table, text, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import IS_SQLITE
+from app.models.report import ArchivedReport, Report
+from app.services.archive import window_reaches_archive
+
+# (min_lon, min_lat, max_lon, max_lat)
+BBox = Tuple[float, float, float, float]
+
+# Searched tables and their SQLite FTS5 index
+FTS_TABLES = {"reports": "reports_fts", "reports_archive": "reports_archive_fts"}
+
+
+def search_document(table_name: str):
+    """tsvector expression for a reports table; must match the GIN index of migration 0004 / 0009"""
+    return literal_column(
+        f"to_tsvector('english', coalesce({table_name}.raw_text, '') || ' ' || coalesce({table_name}.location, ''))"
+    )
+
+
+SEARCH_DOCUMENT = search_document("reports")
+
+_QUERY_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+_WORD = re.compile(r"\w+")
+
+_fts_available: dict = {}
+
+
+def fts5_query(q: str) -> str:
+    """
+    Turn user input into a safe FTS5 query: every word must match,
+    "quoted text" matches as a phrase and a trailing * matches a prefix.
+    Punctuation never reaches FTS5 as query syntax.
+    """
+    terms = []
+    for phrase, token in _QUERY_TOKEN.findall(q):
+        words = _WORD.findall(phrase or token)
+        if not words:
+            continue
+        term = '"' + " ".join(words) + '"'
+        if token.endswith("*"):
+            term += "*"
+        terms.append(term)
+    return " ".join(terms)
+
+
+def parse_bbox(value: str) -> BBox:
+    """Parse "min_lon,min_lat,max_lon,max_lat"; raises ValueError if malformed"""
+    parts = [float(part) for part in value.split(",")]
+    if len(parts) != 4 or parts[0] > parts[2] or parts[1] > parts[3]:
+        raise ValueError("bbox must be min_lon,min_lat,max_lon,max_lat")
+    return parts[0], parts[1], parts[2], parts[3]
+
+
+async def _has_fts_table(db: AsyncSession, name: str) -> bool:
+    if name not in _fts_available:
+        found = await db.scalar(text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": name})
+        _fts_available[name] = bool(found)
+        if not found:
+            print(f"{name} not found; its report search is using LIKE scans")
+    return _fts_available[name]
+
+
+async def _search_statement(
+    db: AsyncSession,
+    source: Table,
+    q: str,
+    columns: List,
+    hazard_type: Optional[str],
+    since: Optional[datetime],
+    until: Optional[datetime],
+    bbox: Optional[BBox],
+    recent: bool,
+    limit: int
+):
+    """
+    Search statement over one reports table (hot or archive).
+
+    Returns (statement, rank expression or None), ordered best match (or
+    newest) first, or None if the query has no searchable words.
+    """
+    filters = []
+    if hazard_type:
+        filters.append(source.c.hazard_type == hazard_type)
+    if since:
+        filters.append(source.c.timestamp >= since)
+    if until:
+        filters.append(source.c.timestamp < until)
+    if bbox:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        filters.extend([
+            source.c.longitude.between(min_lon, max_lon),
+            source.c.latitude.between(min_lat, max_lat)
+        ])
+
+    rank = None
+    stmt = select(*[source.c[c.key] for c in columns])
+    if not IS_SQLITE:
+        document = search_document(source.name)
+        query = func.websearch_to_tsquery(literal_column("'english'"), q)
+        stmt = stmt.filter(document.op("@@")(query))
+        if recent:
+            stmt = stmt.order_by(source.c.id.desc())
+        else:
+            rank = func.ts_rank(document, query)
+            stmt = stmt.order_by(rank.desc(), source.c.id.desc())
+    elif await _has_fts_table(db, FTS_TABLES[source.name]):
+        match = fts5_query(q)
+        if not match:
+            return None
+        fts_name = FTS_TABLES[source.name]
+        fts = table(fts_name, column("rowid"), column("rank"))
+        matches = select(fts.c.rowid, fts.c.rank).filter(literal_column(fts_name).match(match))
+        if recent:
+            # FTS5 returns rowids in order, so this stops after limit matches
+            matches = matches.order_by(fts.c.rowid.desc())
+        elif not filters:
+            # Rank inside FTS5 and only join the winners back to reports
+            matches = matches.order_by(fts.c.rank).limit(limit)
+        matches = matches.subquery("matches")
+        stmt = stmt.join(matches, matches.c.rowid == source.c.id)
+        if recent:
+            stmt = stmt.order_by(matches.c.rowid.desc())
+        else:
+            # bm25: lower is better, so it is negated to sort like ts_rank
+            rank = -matches.c.rank
+            stmt = stmt.order_by(matches.c.rank)
+    else:
+        words = _WORD.findall(q)
+        if not words:
+            return None
+        for word in words:
+            pattern = f"%{word}%"
+            filters.append(or_(source.c.raw_text.ilike(pattern), source.c.location.ilike(pattern)))
+        stmt = stmt.order_by(source.c.id.desc())
+
+    return stmt.filter(*filters).limit(limit), rank
+
+
+async def search_reports(
+    db: AsyncSession,
+    q: str,
+    columns: List,
+    hazard_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    bbox: Optional[BBox] = None,
+    sort: str = "relevance",
+    limit: int = 50
+):
+    """
+    Reports matching a text query, best match (or newest) first.
+
+    Ranking has to score every match, so very common words are much
+    cheaper with sort="recent", which walks the index newest first and
+    stops after limit rows. Archived reports are included when `since`
+    reaches back into the archive; each table is searched on its own index
+    and the top `limit` of each are merged.
+
+    Args:
+        db: Database session
+        q: Search text (words, "phrases", prefix*)
+        columns: Report columns to select
+        hazard_type: Only reports with this hazard type
+        since: Only reports at or after this time
+        until: Only reports before this time
+        bbox: Only reports inside (min_lon, min_lat, max_lon, max_lat)
+        sort: "relevance" or "recent"
+        limit: Maximum number of reports
+
+    Returns:
+        Result rows with the requested columns
+    """
+    recent = sort == "recent"
+    sources = [Report.__table__]
+    if await window_reaches_archive(db, since):
+        sources.append(ArchivedReport.__table__)
+
+    branches = []
+    for source in sources:
+        built = await _search_statement(db, source, q, columns, hazard_type, since, until, bbox, recent, limit)
+        if built is None:
+            return []
+        branches.append(built)
+    if len(branches) == 1:
+        return (await db.execute(branches[0][0])).all()
+
+    # Compound members cannot carry their own ORDER BY/LIMIT on SQLite, so
+    # each branch is wrapped, then the merged rows are ordered again
+    parts = []
+    for source, (stmt, rank) in zip(sources, branches):
+        key = literal_column("0") if rank is None else rank
+        part = stmt.add_columns(key.label("search_rank"), source.c.id.label("search_id")).subquery()
+        parts.append(select(part))
+    merged = union_all(*parts).subquery("search_results")
+    stmt = select(*[merged.c[c.key] for c in columns]).order_by(
+        merged.c.search_rank.desc(), merged.c.search_id.desc()
+    ).limit(limit)
+    return (await db.execute(stmt)).all()
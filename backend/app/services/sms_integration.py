@@ -1,4 +1,5 @@
 import os
+from xml.sax.saxutils import escape
 from twilio.rest import Client
 from typing import Optional
 from dotenv import load_dotenv
@@ -10,15 +11,25 @@ TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
 TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
 TWILIO_PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER")
 
+# Send an outbound confirmation once a received SMS report has been processed
+SMS_SEND_CONFIRMATION = os.getenv("SMS_SEND_CONFIRMATION", "false").lower() == "true"
+
+
+_twilio_client: Optional[Client] = None
+
 
 def get_twilio_client() -> Optional[Client]:
-    """Get authenticated Twilio client"""
+    """Get authenticated Twilio client (created once and reused)"""
+    global _twilio_client
     if not all([TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN]):
         return None
     
+    if _twilio_client is not None:
+        return _twilio_client
+    
     try:
-        client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-        return client
+        _twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+        return _twilio_client
     except Exception as e:
         print(f"Error creating Twilio client: {e}")
         return None
@@ -74,3 +85,28 @@ def receive_sms_webhook(request_data: dict) -> dict:
         "timestamp": request_data.get("DateSent", "")
     }
 
+
+
+def build_twiml_response(message: Optional[str] = None) -> str:
+    """
+    Build a TwiML document to answer a Twilio webhook
+    
+    Args:
+        message: Optional reply text; an empty <Response/> sends no reply
+        
+    Returns:
+        TwiML XML string
+    """
+    if not message:
+        return '<?xml version="1.0" encoding="UTF-8"?><Response></Response>'
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f"<Response><Message>{escape(message)}</Message></Response>"
+    )
+
+
+def build_confirmation_message(report_id: int, processed_data: dict) -> str:
+    """Build the outbound confirmation text for a processed SMS report"""
+    hazard = processed_data.get("hazard_type") or "Unknown"
+    location = processed_data.get("location") or "Location not specified"
+    return f"CrisisFlow: report #{report_id} received ({hazard}, {location}). Stay safe."
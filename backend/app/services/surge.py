@@ -0,0 +1,243 @@
+"""
+Streaming surge detection over incoming reports.
+
+Every persisted report updates two exponentially decayed counters for its
+(region cell, hazard type): a fast one (half-life SURGE_FAST_HALF_LIFE_SECONDS)
+and a slow baseline (SURGE_SLOW_HALF_LIFE_SECONDS). A surge fires when the
+fast rate is SURGE_RATIO times the baseline and at least SURGE_MIN_REPORTS
+recent reports back it. One event is raised per surge: the key re-arms
+once its rate falls back to half the threshold. Updates are O(1) per report, memory is bounded by
+SURGE_MAX_KEYS (least recently updated keys are dropped) and the state can
+be checkpointed to disk so a restart does not forget the baselines.
+"""
+import asyncio
+import json
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import List, Optional, Tuple
+from dotenv import load_dotenv
+from app.services.rollups import region_cell
+
+load_dotenv()
+
+SURGE_DETECTION_ENABLED = os.getenv("SURGE_DETECTION_ENABLED", "true").lower() == "true"
+SURGE_CELL_DEGREES = float(os.getenv("SURGE_CELL_DEGREES", "0.1"))
+SURGE_FAST_HALF_LIFE_SECONDS = float(os.getenv("SURGE_FAST_HALF_LIFE_SECONDS", "300"))
+SURGE_SLOW_HALF_LIFE_SECONDS = float(os.getenv("SURGE_SLOW_HALF_LIFE_SECONDS", str(6 * 3600)))
+SURGE_RATIO = float(os.getenv("SURGE_RATIO", "4"))
+SURGE_MIN_REPORTS = float(os.getenv("SURGE_MIN_REPORTS", "5"))
+# Baseline never drops below this, so a quiet cell needs a real burst to alert
+SURGE_BASELINE_FLOOR_PER_HOUR = float(os.getenv("SURGE_BASELINE_FLOOR_PER_HOUR", "1"))
+# Minimum time between two surge events for the same cell and hazard
+SURGE_COOLDOWN_SECONDS = float(os.getenv("SURGE_COOLDOWN_SECONDS", "900"))
+SURGE_MAX_KEYS = int(os.getenv("SURGE_MAX_KEYS", "20000"))
+SURGE_CHECKPOINT_PATH = os.getenv("SURGE_CHECKPOINT_PATH", "./crisisflow-surge.json")
+SURGE_CHECKPOINT_INTERVAL_SECONDS = float(os.getenv("SURGE_CHECKPOINT_INTERVAL_SECONDS", "60"))
+
+CHECKPOINT_VERSION = 1
+
+Key = Tuple[str, str]
+
+
+class SurgeDetector:
+    """
+    Per (region cell, hazard type) decayed report rates with surge events.
+
+    State per key is [fast, slow, updated, last_alert, surging]: fast and
+    slow are report counts decayed to `updated` (unix seconds), so
+    count / tau is a rate in reports per second, where tau = half-life / ln 2.
+    surging is 1 from a surge event until the rate drops to half the threshold.
+    """
+
+    def __init__(
+        self,
+        cell_degrees: float = SURGE_CELL_DEGREES,
+        fast_half_life: float = SURGE_FAST_HALF_LIFE_SECONDS,
+        slow_half_life: float = SURGE_SLOW_HALF_LIFE_SECONDS,
+        ratio: float = SURGE_RATIO,
+        min_reports: float = SURGE_MIN_REPORTS,
+        baseline_floor_per_hour: float = SURGE_BASELINE_FLOOR_PER_HOUR,
+        cooldown_seconds: float = SURGE_COOLDOWN_SECONDS,
+        max_keys: int = SURGE_MAX_KEYS
+    ):
+        self.cell_degrees = cell_degrees
+        self.fast_tau = fast_half_life / math.log(2)
+        self.slow_tau = slow_half_life / math.log(2)
+        self.ratio = ratio
+        self.min_reports = min_reports
+        self.baseline_floor = baseline_floor_per_hour / 3600
+        self.cooldown_seconds = cooldown_seconds
+        self.max_keys = max_keys
+        self._state: "OrderedDict[Key, List[float]]" = OrderedDict()
+        self.recent_events = deque(maxlen=50)
+        self.observed = 0
+        self.evicted = 0
+
+    def _rates(self, fast: float, slow: float) -> Tuple[float, float]:
+        """Recent and baseline rates in reports per second"""
+        return fast / self.fast_tau, max(slow / self.slow_tau, self.baseline_floor)
+
+    def _rearmed(self, fast: float, slow: float) -> bool:
+        # Half the alert threshold, so a rate hovering around it cannot flap
+        recent_rate, baseline = self._rates(fast, slow)
+        return recent_rate < self.ratio * baseline / 2
+
+    def _decayed(self, state: List[float], now: float) -> Tuple[float, float]:
+        elapsed = max(0.0, now - state[2])
+        return state[0] * math.exp(-elapsed / self.fast_tau), state[1] * math.exp(-elapsed / self.slow_tau)
+
+    def observe(
+        self,
+        latitude: Optional[float],
+        longitude: Optional[float],
+        hazard_type: Optional[str],
+        now: Optional[float] = None
+    ) -> Optional[dict]:
+        """
+        Count one report and check its cell for a surge.
+
+        Args:
+            latitude: Report latitude (reports without coordinates are skipped)
+            longitude: Report longitude
+            hazard_type: Report hazard type
+            now: Observation time in unix seconds (default: current time)
+
+        Returns:
+            Surge event dict if this report tipped the cell into a surge, else None
+        """
+        cell = region_cell(latitude, longitude, self.cell_degrees)
+        if not cell:
+            return None
+        now = time.time() if now is None else now
+        key = (cell, hazard_type or "")
+        self.observed += 1
+
+        state = self._state.get(key)
+        if state is None:
+            state = [0.0, 0.0, now, 0.0, 0]
+            self._state[key] = state
+            while len(self._state) > self.max_keys:
+                self._state.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._state.move_to_end(key)
+        fast, slow = self._decayed(state, now)
+        if state[4] and self._rearmed(fast, slow):
+            state[4] = 0
+        state[0], state[1], state[2] = fast + 1, slow + 1, now
+
+        recent_rate, baseline = self._rates(state[0], state[1])
+        if (
+            not state[4]
+            and state[0] >= self.min_reports
+            and recent_rate >= self.ratio * baseline
+            and now - state[3] >= self.cooldown_seconds
+        ):
+            state[3], state[4] = now, 1
+            event = self._event(key, state, recent_rate, baseline, now)
+            self.recent_events.append(event)
+            return event
+        return None
+
+    def _event(self, key: Key, state: List[float], recent_rate: float, baseline: float, now: float) -> dict:
+        lat_index, lon_index = (int(part) for part in key[0].split(":"))
+        return {
+            "cell": key[0],
+            "hazard_type": key[1] or None,
+            "latitude": round((lat_index + 0.5) * self.cell_degrees, 6),
+            "longitude": round((lon_index + 0.5) * self.cell_degrees, 6),
+            "cell_degrees": self.cell_degrees,
+            "recent_reports": round(state[0], 2),
+            "recent_per_hour": round(recent_rate * 3600, 2),
+            "baseline_per_hour": round(baseline * 3600, 2),
+            "ratio": round(recent_rate / baseline, 2),
+            "detected_at": datetime.utcfromtimestamp(now).isoformat()
+        }
+
+    def hottest(self, limit: int = 20, now: Optional[float] = None) -> List[dict]:
+        """Keys with the highest current recent/baseline ratio"""
+        now = time.time() if now is None else now
+        rows = []
+        for (cell, hazard_type), state in self._state.items():
+            recent_rate, baseline = self._rates(*self._decayed(state, now))
+            rows.append({
+                "cell": cell,
+                "hazard_type": hazard_type or None,
+                "recent_per_hour": round(recent_rate * 3600, 2),
+                "baseline_per_hour": round(baseline * 3600, 2),
+                "ratio": round(recent_rate / baseline, 2)
+            })
+        rows.sort(key=lambda row: row["ratio"], reverse=True)
+        return rows[:limit]
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._state),
+            "max_keys": self.max_keys,
+            "observed": self.observed,
+            "evicted": self.evicted,
+            "events": len(self.recent_events)
+        }
+
+    def checkpoint(self) -> dict:
+        """Serializable snapshot of the detector state"""
+        return {
+            "version": CHECKPOINT_VERSION,
+            "cell_degrees": self.cell_degrees,
+            "saved_at": time.time(),
+            "keys": [[cell, hazard_type, *state] for (cell, hazard_type), state in self._state.items()]
+        }
+
+    def restore(self, snapshot: dict) -> int:
+        """
+        Load a snapshot from checkpoint().
+
+        Snapshots from another version or cell size are ignored, since their
+        keys would not line up with the current grid.
+
+        Returns:
+            Number of keys restored
+        """
+        if snapshot.get("version") != CHECKPOINT_VERSION or snapshot.get("cell_degrees") != self.cell_degrees:
+            return 0
+        self._state.clear()
+        # Saved least recently updated first, which keeps the LRU order
+        for cell, hazard_type, *state in snapshot.get("keys", [])[-self.max_keys:]:
+            self._state[(cell, hazard_type)] = state
+        return len(self._state)
+
+    def save_checkpoint(self, path: str = SURGE_CHECKPOINT_PATH):
+        """Write checkpoint() to path atomically (temp file + rename)"""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.checkpoint(), f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    def load_checkpoint(self, path: str = SURGE_CHECKPOINT_PATH) -> int:
+        """Restore from a checkpoint file if one exists; returns keys restored"""
+        if not os.path.exists(path):
+            return 0
+        try:
+            with open(path) as f:
+                return self.restore(json.load(f))
+        except (OSError, ValueError, TypeError) as e:
+            print(f"Error loading surge checkpoint {path}: {e}")
+            return 0
+
+
+surge_detector = SurgeDetector()
+
+
+async def run_surge_checkpointer(interval_seconds: float = SURGE_CHECKPOINT_INTERVAL_SECONDS):
+    """Checkpoint the surge detector every interval_seconds (started from main.py)"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            surge_detector.save_checkpoint()
+        except Exception as e:
+            print(f"Error checkpointing surge detector: {e}")
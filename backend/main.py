@@ -3,16 +3,24 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.trustedhost import TrustedHostMiddleware
-from app.database import engine, Base
+from app.database import engine, check_database_settings, READ_DATABASE_URLS
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
+from app.migrations import run_migrations
 from app.api import endpoints, auth, data_ingestion, analytics
 from app.api import websocket as ws
+from app.services.alert_fanout import get_alert_fanout
+from app.services.journal import ingest_journal
+from app.services.pipeline import ingestion_pipeline, sms_pipeline
+from app.services.archive import ARCHIVE_ENABLED, run_archiver
+from app.services.surge import SURGE_DETECTION_ENABLED, run_surge_checkpointer, surge_detector
+import asyncio
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create missing tables and apply pending schema migrations
+run_migrations(engine)
 
 app = FastAPI(
     title="CrisisFlow API",
@@ -36,6 +44,10 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
 
 app.add_middleware(SecurityHeadersMiddleware)
 
+# Pin clients to the primary right after they write (only with read replicas)
+if READ_DATABASE_URLS:
+    app.add_middleware(ReadYourWritesMiddleware)
+
 # Rate limiting (optional, can be enabled in production)
 # from app.middleware.rate_limit import RateLimitMiddleware
 # app.add_middleware(RateLimitMiddleware, requests_per_minute=60)
@@ -57,9 +69,9 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["Content-Type", "Authorization", "X-Requested-With"],
-    expose_headers=["Content-Type", "X-Total-Count"],
+    expose_headers=["Content-Type", "X-Total-Count", "X-Next-Cursor", "Link"],
     max_age=3600,
 )
 
@@ -71,6 +83,73 @@ app.include_router(analytics.router, prefix="/api/v1/analytics", tags=["analytic
 app.include_router(ws.router, prefix="/ws", tags=["websocket"])
 
 
+@app.on_event("startup")
+async def log_database_settings():
+    """Log the effective engine profile so misconfiguration shows up at boot"""
+    try:
+        settings = await check_database_settings()
+    except Exception as e:
+        print(f"Database self-check failed: {e}")
+        return
+    mismatches = settings.pop("mismatches", [])
+    print("Database settings: " + ", ".join(f"{k}={v}" for k, v in settings.items()))
+    if mismatches:
+        print(f"Warning: database did not accept configured settings: {', '.join(mismatches)}")
+
+
+@app.on_event("startup")
+async def recover_ingestion_journal():
+    """Replay reports journaled before a crash but never processed"""
+    ingest_journal.open()
+    asyncio.create_task(ingest_journal.recover())
+
+
+@app.on_event("startup")
+async def start_report_archiver():
+    """Periodically move reports of long-inactive incidents to cold storage"""
+    if ARCHIVE_ENABLED:
+        asyncio.create_task(run_archiver())
+
+
+@app.on_event("startup")
+async def start_surge_detector():
+    """Restore surge baselines from the last checkpoint and keep checkpointing"""
+    if SURGE_DETECTION_ENABLED:
+        restored = surge_detector.load_checkpoint()
+        if restored:
+            print(f"Restored surge detector state for {restored} cells")
+        asyncio.create_task(run_surge_checkpointer())
+
+
+@app.on_event("shutdown")
+async def close_alert_client():
+    """Release the pooled HTTP client used for SMS alert fan-out"""
+    await get_alert_fanout().aclose()
+
+
+@app.on_event("shutdown")
+async def cancel_shed_retries():
+    """Stop pending shed-report retries; recover() replays them on the next start"""
+    await ingestion_pipeline.cancel_retries()
+    await sms_pipeline.cancel_retries()
+
+
+@app.on_event("shutdown")
+async def close_ingestion_journal():
+    """Flush pending journal records and close the file"""
+    await ingest_journal.aclose()
+
+
+@app.on_event("shutdown")
+async def checkpoint_surge_detector():
+    """Save surge detector state so baselines survive the restart"""
+    if SURGE_DETECTION_ENABLED:
+        try:
+            surge_detector.save_checkpoint()
+        except Exception as e:
+            print(f"Error checkpointing surge detector: {e}")
+
+
 @app.get("/")
 async def health_check():
     """Health check endpoint"""
@@ -0,0 +1,45 @@
+"""
+Move reports of long-inactive incidents into the reports_archive table,
+optionally exporting each batch as gzip NDJSON (for cron, or one-off use
+when the in-process archiver is disabled):
+
+    python scripts/archive_reports.py --days 30 --dry-run
+    python scripts/archive_reports.py --days 30 --export-dir ./archive
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.database import engine  # noqa: E402
+from app.migrations import run_migrations  # noqa: E402
+from app.services.archive import (  # noqa: E402
+    ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE, ARCHIVE_EXPORT_DIR, archive_cold_reports
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive cold reports")
+    parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS, help="Incidents idle this long are cold")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--export-dir", default=ARCHIVE_EXPORT_DIR, help="Also write gzip NDJSON files here")
+    parser.add_argument("--dry-run", action="store_true", help="Only count reports that would move")
+    args = parser.parse_args()
+
+    run_migrations(engine)
+    summary = asyncio.run(archive_cold_reports(
+        older_than_days=args.days,
+        batch_size=args.batch_size,
+        export_dir=args.export_dir,
+        dry_run=args.dry_run
+    ))
+    verb = "Would archive" if args.dry_run else "Archived"
+    print(f"{verb} {summary['archived']} reports older than {summary['cutoff']}")
+    if summary["export_file"]:
+        print(f"Exported to {summary['export_file']}")
+
+
+if __name__ == "__main__":
+    main()
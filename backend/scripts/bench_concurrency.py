@@ -0,0 +1,146 @@
+"""
+Measure concurrent request throughput of the read API.
+
+Seeds a database with synthetic reports/incidents, then fires a mixed
+workload of list, detail, analytics and health-check requests with a fixed
+number of concurrent clients against a running server:
+
+    DATABASE_URL=sqlite:///./bench.db python scripts/bench_concurrency.py --seed 20000
+    DATABASE_URL=sqlite:///./bench.db uvicorn main:app --port 8001 --workers 1
+    python scripts/bench_concurrency.py --target http://127.0.0.1:8001 --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+HAZARDS = ["Fire", "Flood", "Earthquake", "Storm", "Tornado", "Unknown"]
+SEVERITIES = ["Low", "Medium", "High"]
+
+WORKLOAD = [
+    ("/", 2),
+    ("/api/v1/reports/?limit=100", 4),
+    ("/api/v1/incidents/?limit=20", 2),
+    ("/api/v1/reports/{report_id}", 4),
+    ("/api/v1/analytics/dashboard/stats/", 2),
+    ("/api/v1/analytics/reports/historical/?days=7", 1),
+]
+
+
+def seed(rows: int):
+    """Insert synthetic incidents and reports through the sync engine"""
+    from app.database import engine, SessionLocal
+    from app.migrations import run_migrations
+    from app.models.report import Report
+    from app.models.incident import Incident
+
+    run_migrations(engine)
+    random.seed(42)
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        incidents = [
+            Incident(
+                location=f"Incident {i}",
+                latitude=37.7 + random.random() / 10,
+                longitude=-122.5 + random.random() / 10,
+                hazard_type=random.choice(HAZARDS),
+                severity=random.choice(SEVERITIES),
+                confidence_score=round(random.uniform(0.5, 1.0), 2),
+                witness_count=1,
+                is_active=True
+            )
+            for i in range(max(1, rows // 50))
+        ]
+        db.add_all(incidents)
+        db.flush()
+        reports = [
+            {
+                "raw_text": f"Synthetic report {i} near Main Street",
+                "location": "Main Street",
+                "latitude": 37.7 + random.random() / 10,
+                "longitude": -122.5 + random.random() / 10,
+                "hazard_type": random.choice(HAZARDS),
+                "severity": random.choice(SEVERITIES),
+                "confidence_score": round(random.uniform(0.5, 1.0), 2),
+                "timestamp": now - timedelta(minutes=random.randint(0, 60 * 24 * 30)),
+                "is_verified": False,
+                "incident_id": random.choice(incidents).id
+            }
+            for i in range(rows)
+        ]
+        db.bulk_insert_mappings(Report, reports)
+        # Fill the denormalized counters the ingestion pipeline maintains
+        by_id = {incident.id: incident for incident in incidents}
+        for report in sorted(reports, key=lambda r: r["timestamp"]):
+            incident = by_id[report["incident_id"]]
+            incident.report_count = (incident.report_count or 0) + 1
+            incident.last_report_at = report["timestamp"]
+            incident.latest_severity = report["severity"]
+            column = f"severity_{report['severity'].lower()}_count"
+            setattr(incident, column, (getattr(incident, column) or 0) + 1)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Seeded {rows} reports")
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+async def run(args):
+    paths = [path for path, weight in WORKLOAD for _ in range(weight)]
+    random.seed(7)
+    queue = [random.choice(paths).format(report_id=random.randint(1, args.max_id)) for _ in range(args.requests)]
+    latencies, errors = [], 0
+
+    async with httpx.AsyncClient(base_url=args.target, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            while queue:
+                path = queue.pop()
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        await client.get("/")  # warm up
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(args.concurrency)])
+        elapsed = time.perf_counter() - started
+
+    print(f"{len(latencies)} requests, concurrency {args.concurrency}: {len(latencies) / elapsed:.1f} req/s, errors {errors}")
+    print(f"latency p50={percentile(latencies, 0.5) * 1000:.1f}ms "
+          f"p95={percentile(latencies, 0.95) * 1000:.1f}ms "
+          f"p99={percentile(latencies, 0.99) * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent read throughput benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="Seed N synthetic reports and exit")
+    parser.add_argument("--target", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--max-id", type=int, default=1000, help="Highest report id used for detail requests")
+    args = parser.parse_args()
+    if args.seed:
+        seed(args.seed)
+    else:
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Time resource matching (see app.services.matching) on synthetic needs and
+supplies, after checking the grid kNN against a brute-force scan:
+
+    python scripts/bench_matching.py --resources 20000 --spread 10
+
+Runs in memory; no database is needed.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.matching import (  # noqa: E402
+    MATCH_DEFAULT_K, MATCH_MAX_DISTANCE_KM, SupplyIndex, _compatibility, haversine_km, match_needs
+)
+
+TYPES = ["water", "food", "medical", "shelter"]
+UNITS = ["liters", "kg", "units"]
+
+
+def synthetic(count: int, first_id: int, spread: float) -> list:
+    return [
+        {
+            "id": first_id + i,
+            "name": "synthetic",
+            "resource_type": random.choice(TYPES),
+            "unit": random.choice(UNITS),
+            "quantity": round(random.uniform(1, 100), 1),
+            "location": None,
+            "incident_id": None,
+            "latitude": 30 + random.uniform(0, spread),
+            "longitude": -100 + random.uniform(0, spread)
+        }
+        for i in range(count)
+    ]
+
+
+def check_nearest(needs: list, supplies: list, k: int, max_distance_km: float) -> int:
+    """Number of needs whose kNN differs from a brute-force scan"""
+    index = SupplyIndex(supplies)
+    mismatches = 0
+    for need in needs:
+        distances = [
+            haversine_km(need["latitude"], need["longitude"], supply["latitude"], supply["longitude"])
+            for supply in supplies
+            if _compatibility(supply) == _compatibility(need) and supply["quantity"] >= need["quantity"]
+        ]
+        expected = sorted(distance for distance in distances if distance <= max_distance_km)[:k]
+        found = [distance for distance, _ in index.nearest(need, k, max_distance_km)]
+        mismatches += [round(d, 9) for d in found] != [round(d, 9) for d in expected]
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resource matching benchmark")
+    parser.add_argument("--resources", type=int, default=20000, help="Total resources, half needed")
+    parser.add_argument("--spread", type=float, default=10.0, help="Side of the square region in degrees")
+    parser.add_argument("--k", type=int, default=MATCH_DEFAULT_K)
+    parser.add_argument("--max-distance-km", type=float, default=MATCH_MAX_DISTANCE_KM)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(7)
+    half = args.resources // 2
+    supplies = synthetic(half, 1, args.spread)
+    needs = synthetic(half, half + 1, args.spread)
+
+    mismatches = check_nearest(needs[:300], supplies, args.k, args.max_distance_km)
+    if mismatches:
+        raise SystemExit(f"kNN differs from brute force for {mismatches} of 300 needs")
+    print("kNN matches brute force for 300 sampled needs")
+
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        result = match_needs(needs, supplies, args.k, args.max_distance_km)
+        timings.append(time.perf_counter() - started)
+    stats = result["stats"]
+    print(f"{stats['needs']} needs, {stats['available']} available over {args.spread}x{args.spread} deg: "
+          f"matched {stats['matched']}, median {statistics.median(timings) * 1000:.0f} ms, "
+          f"min {min(timings) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Time report search queries (see app.services.search).
+
+Optionally seeds N reports with varied street names and words first; on
+SQLite the FTS5 triggers index them as they are inserted:
+
+    DATABASE_URL=sqlite:///./bench.db python scripts/bench_search.py --seed 1000000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.serialization import schema_columns  # noqa: E402
+from app.database import AsyncSessionLocal, SessionLocal, engine  # noqa: E402
+from app.migrations import run_migrations  # noqa: E402
+from app.models.report import Report  # noqa: E402
+from app.schemas.report import ReportRead  # noqa: E402
+from app.services.search import search_reports  # noqa: E402
+
+REPORT_COLUMNS = schema_columns(Report, ReportRead)
+HAZARDS = ["Fire", "Flood", "Storm", "Earthquake"]
+WORDS = "smoke water trapped injured collapse power outage people help urgent blocked bridge school hospital".split()
+STREETS = [f"{name} {kind}" for name in ["Main", "Oak", "Pine", "Elm"] + [f"Name{i}" for i in range(2000)]
+           for kind in ["Street", "Road", "Avenue"]]
+
+
+def seed(rows: int):
+    run_migrations(engine)
+    random.seed(7)
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        for start in range(0, rows, 50000):
+            batch = []
+            for _ in range(min(50000, rows - start)):
+                street, hazard = random.choice(STREETS), random.choice(HAZARDS)
+                batch.append({
+                    "raw_text": f"{hazard} near {street} " + " ".join(random.sample(WORDS, 4)),
+                    "location": street,
+                    "latitude": 37 + random.random(),
+                    "longitude": -122 + random.random(),
+                    "hazard_type": hazard,
+                    "severity": "Low",
+                    "confidence_score": 0.5,
+                    "timestamp": now - timedelta(minutes=random.randint(0, 60 * 24 * 90)),
+                    "is_verified": False
+                })
+            db.bulk_insert_mappings(Report, batch)
+            db.commit()
+    finally:
+        db.close()
+    print(f"Seeded {rows} reports")
+
+
+async def run(args):
+    week_ago = datetime.utcnow() - timedelta(days=7)
+    cases = [
+        ("rare street", dict(q="Name1234 Road")),
+        ("phrase", dict(q='"Oak Street"')),
+        ("common word", dict(q="trapped")),
+        ("common word, recent", dict(q="trapped", sort="recent")),
+        ("filtered", dict(q="trapped bridge", hazard_type="Fire", since=week_ago, bbox=(-122, 37, -121.5, 37.5))),
+        ("filtered, recent", dict(q="trapped bridge", hazard_type="Fire", since=week_ago,
+                                  bbox=(-122, 37, -121.5, 37.5), sort="recent")),
+        ("prefix", dict(q="Name12*")),
+    ]
+    async with AsyncSessionLocal() as db:
+        for name, params in cases:
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                rows = await search_reports(db, columns=REPORT_COLUMNS, limit=args.limit, **params)
+                timings.append(time.perf_counter() - started)
+            print(f"{name:20} {len(rows):4} rows  median {statistics.median(timings) * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report search benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="Seed N synthetic reports first")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    if args.seed:
+        seed(args.seed)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
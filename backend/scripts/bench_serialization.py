@@ -0,0 +1,83 @@
+"""
+Compare list serialization paths for reports.
+
+  orm      - load ORM objects, validate through List[ReportRead] with
+             from_attributes and encode (what FastAPI's response_model does)
+  project  - select only ReportRead's columns and encode the row dicts
+             straight to JSON bytes (the list endpoints' fast path)
+
+Both outputs are checked for equality before timing:
+
+    DATABASE_URL=sqlite:///./bench.db python scripts/bench_serialization.py --rows 10000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import func, select
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.serialization import ORJSON_AVAILABLE, dumps, rows_to_dicts, schema_columns  # noqa: E402
+from app.database import AsyncSessionLocal  # noqa: E402
+from app.models.report import Report  # noqa: E402
+from app.schemas.report import ReportRead  # noqa: E402
+from bench_concurrency import seed  # noqa: E402
+
+REPORT_COLUMNS = schema_columns(Report, ReportRead)
+reports_adapter = TypeAdapter(List[ReportRead])
+
+
+async def orm_path(db, rows: int) -> bytes:
+    reports = (await db.execute(select(Report).order_by(Report.id).limit(rows))).scalars().all()
+    data = reports_adapter.dump_python(
+        reports_adapter.validate_python(reports, from_attributes=True), mode="json"
+    )
+    db.expunge_all()
+    return json.dumps(data).encode()
+
+
+async def projection_path(db, rows: int) -> bytes:
+    result = await db.execute(select(*REPORT_COLUMNS).order_by(Report.id).limit(rows))
+    return dumps(rows_to_dicts(result.all(), REPORT_COLUMNS))
+
+
+async def run(args):
+    async with AsyncSessionLocal() as db:
+        available = await db.scalar(select(func.count(Report.id)))
+        if available < args.rows:
+            raise SystemExit(f"Only {available} reports; run with --seed {args.rows} first")
+
+        if json.loads(await orm_path(db, args.rows)) != json.loads(await projection_path(db, args.rows)):
+            raise SystemExit("Outputs differ between serialization paths")
+        print(f"{args.rows} rows, outputs identical, orjson={'yes' if ORJSON_AVAILABLE else 'no'}")
+
+        for name, path in [("orm", orm_path), ("project", projection_path)]:
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                await path(db, args.rows)
+                timings.append(time.perf_counter() - started)
+            print(f"{name:8} median {statistics.median(timings) * 1000:7.1f} ms  "
+                  f"min {min(timings) * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List serialization benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="Seed N synthetic reports first")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    if args.seed:
+        seed(args.seed)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
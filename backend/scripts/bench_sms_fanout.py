@@ -0,0 +1,55 @@
+"""
+Benchmark SMS alert fan-out.
+
+    # No network at all
+    python scripts/bench_sms_fanout.py --recipients 5000 --dry-run --latency 0.05
+    # Against the local stub (scripts/twilio_stub.py)
+    python scripts/bench_sms_fanout.py --recipients 5000 --base-url http://127.0.0.1:8099
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.alert_fanout import SMSAlertFanout
+
+
+async def run(args):
+    fanout = SMSAlertFanout(
+        account_sid=args.account_sid,
+        auth_token="stub-token",
+        sender_numbers=[f"+1555000{i:04d}" for i in range(args.senders)],
+        base_url=args.base_url,
+        max_concurrency=args.concurrency,
+        rate_per_number=args.rate,
+        dry_run=args.dry_run,
+        dry_run_latency=args.latency
+    )
+    recipients = [f"+1666{i:07d}" for i in range(args.recipients)]
+    try:
+        result = await fanout.fan_out(recipients, "CrisisFlow benchmark alert")
+    finally:
+        await fanout.aclose()
+    failures = result.pop("failures")
+    print(result)
+    if failures:
+        print(f"first failures: {failures[:5]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SMS alert fan-out")
+    parser.add_argument("--recipients", type=int, default=1000)
+    parser.add_argument("--senders", type=int, default=10, help="Size of the sender number pool")
+    parser.add_argument("--rate", type=float, default=50.0, help="Messages/second per sender")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8099")
+    parser.add_argument("--account-sid", default="ACstub")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated latency in dry-run mode")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Check that the SQL-aggregated analytics endpoints return the same JSON as
+the original Python implementations (kept below as reference functions
+that load every row and count in dict loops). Windows longer than a day
+are served from the hourly rollups, so this also checks those.
+
+By default builds a scratch SQLite database with edge cases (missing
+severity/hazard, both stored timestamp formats, archived reports, every
+resource status); pass --url to compare against an existing database:
+
+    python scripts/check_analytics_parity.py
+    python scripts/check_analytics_parity.py --url sqlite+aiosqlite:///./crisisflow.db
+"""
+import argparse
+import asyncio
+import math
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.api import analytics  # noqa: E402
+from app.migrations import run_migrations  # noqa: E402
+from app.models.incident import Incident  # noqa: E402
+from app.models.resource import Resource, ResourceStatus, ResourceType  # noqa: E402
+from app.services.archive import reports_since  # noqa: E402
+from app.services.rollups import rebuild_rollups  # noqa: E402
+
+
+async def reference_historical(db, days, hazard_type=None):
+    cutoff_date = datetime.utcnow() - timedelta(days=days)
+    source = await reports_since(db, cutoff_date)
+    query = select(
+        source.c.timestamp, source.c.severity, source.c.hazard_type, source.c.confidence_score
+    ).filter(source.c.timestamp >= cutoff_date)
+    if hazard_type:
+        query = query.filter(source.c.hazard_type == hazard_type)
+    reports = (await db.execute(query)).all()
+    by_date = {}
+    by_severity = {"Low": 0, "Medium": 0, "High": 0}
+    by_hazard = {}
+    for report in reports:
+        date_key = report.timestamp.date().isoformat() if report.timestamp else "unknown"
+        by_date[date_key] = by_date.get(date_key, 0) + 1
+        if report.severity:
+            by_severity[report.severity] = by_severity.get(report.severity, 0) + 1
+        hazard = report.hazard_type or "Unknown"
+        by_hazard[hazard] = by_hazard.get(hazard, 0) + 1
+    return {
+        "period_days": days,
+        "total_reports": len(reports),
+        "by_date": by_date,
+        "by_severity": by_severity,
+        "by_hazard_type": by_hazard,
+        "average_confidence": sum(r.confidence_score or 0 for r in reports) / len(reports) if reports else 0
+    }
+
+
+async def reference_incident_trends(db, days):
+    cutoff_date = datetime.utcnow() - timedelta(days=days)
+    incidents = (await db.execute(
+        select(Incident).filter(Incident.created_at >= cutoff_date)
+    )).scalars().all()
+    by_date = {}
+    active_count = 0
+    total_witnesses = 0
+    for incident in incidents:
+        date_key = incident.created_at.date().isoformat() if incident.created_at else "unknown"
+        by_date[date_key] = by_date.get(date_key, 0) + 1
+        if incident.is_active:
+            active_count += 1
+            total_witnesses += incident.witness_count
+    return {
+        "period_days": days,
+        "total_incidents": len(incidents),
+        "active_incidents": active_count,
+        "total_witnesses": total_witnesses,
+        "by_date": by_date,
+        "average_witnesses_per_incident": total_witnesses / active_count if active_count > 0 else 0
+    }
+
+
+async def reference_resource_trends(db, days):
+    cutoff_date = datetime.utcnow() - timedelta(days=days)
+    resources = (await db.execute(
+        select(Resource).filter(Resource.created_at >= cutoff_date)
+    )).scalars().all()
+    needed_by_type = {}
+    available_by_type = {}
+    for resource in resources:
+        rtype = resource.resource_type.value
+        if resource.status.value == "needed":
+            needed_by_type[rtype] = needed_by_type.get(rtype, 0) + resource.quantity
+        elif resource.status.value == "available":
+            available_by_type[rtype] = available_by_type.get(rtype, 0) + resource.quantity
+    return {
+        "period_days": days,
+        "needed_by_type": needed_by_type,
+        "available_by_type": available_by_type,
+        "deficits": {
+            rtype: needed_by_type.get(rtype, 0) - available_by_type.get(rtype, 0)
+            for rtype in set(list(needed_by_type.keys()) + list(available_by_type.keys()))
+        }
+    }
+
+
+def differences(expected, actual, path="") -> list:
+    """Paths where two JSON-like values differ (floats compared with a tolerance)"""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        found = []
+        for key in set(expected) | set(actual):
+            if key not in expected or key not in actual:
+                found.append(f"{path}.{key}: only in {'actual' if key in actual else 'reference'}")
+            else:
+                found.extend(differences(expected[key], actual[key], f"{path}.{key}"))
+        return found
+    if isinstance(expected, (int, float)) and isinstance(actual, (int, float)):
+        return [] if math.isclose(expected, actual, rel_tol=1e-9, abs_tol=1e-9) else [f"{path}: {expected} != {actual}"]
+    return [] if expected == actual else [f"{path}: {expected!r} != {actual!r}"]
+
+
+def seed(url: str, rows: int):
+    """Scratch data covering NULL/empty dimensions and both timestamp formats"""
+    engine = create_engine(url)
+    run_migrations(engine)
+    random.seed(3)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO incidents (location, hazard_type, witness_count, is_active, created_at, updated_at) "
+                          "VALUES (:location, :hazard, :witnesses, :active, :created, :created)"), [
+            {"location": f"Incident {i}", "hazard": random.choice(["Fire", "Flood", None]),
+             "witnesses": random.randint(1, 9), "active": random.random() < 0.7,
+             "created": (now - timedelta(hours=random.randint(0, 24 * 40))).strftime("%Y-%m-%d %H:%M:%S")}
+            for i in range(rows // 20)
+        ])
+        reports = []
+        for i in range(rows):
+            stamp = now - timedelta(minutes=random.randint(0, 60 * 24 * 40))
+            reports.append({
+                "raw_text": f"report {i}",
+                "hazard": random.choice(["Fire", "Flood", "Storm", None, ""]),
+                "severity": random.choice(["Low", "Medium", "High", "Critical", None, ""]),
+                "confidence": random.choice([None, round(random.random(), 3)]),
+                # Server default format vs SQLAlchemy bind format
+                "timestamp": stamp.strftime("%Y-%m-%d %H:%M:%S") if i % 2 else stamp.isoformat(" "),
+            })
+        # Reports exactly on the hour where the rollup windows start, in both formats
+        for days in (2, 7, 30):
+            boundary = (now - timedelta(days=days)).replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+            for stamp in (boundary.strftime("%Y-%m-%d %H:%M:%S"), boundary.isoformat(" ", "microseconds")):
+                reports.append({"raw_text": "boundary", "hazard": "Fire", "severity": "High",
+                                "confidence": 0.5, "timestamp": stamp})
+        conn.execute(text("INSERT INTO reports (raw_text, hazard_type, severity, confidence_score, timestamp, is_verified) "
+                          "VALUES (:raw_text, :hazard, :severity, :confidence, :timestamp, 0)"), reports)
+        conn.execute(text("INSERT INTO reports_archive (id, raw_text, hazard_type, severity, confidence_score, "
+                          "timestamp, is_verified, archived_at) SELECT id + 1000000, raw_text, hazard_type, severity, "
+                          "confidence_score, timestamp, is_verified, timestamp FROM reports WHERE id % 5 = 0"))
+        conn.execute(text("INSERT INTO resources (name, resource_type, status, quantity, unit, created_at, updated_at) "
+                          "VALUES (:name, :type, :status, :quantity, 'units', :created, :created)"), [
+            {"name": f"Resource {i}", "type": random.choice(list(ResourceType)).name,
+             "status": random.choice(list(ResourceStatus)).name, "quantity": round(random.uniform(0, 50), 2),
+             "created": (now - timedelta(hours=random.randint(0, 24 * 10))).strftime("%Y-%m-%d %H:%M:%S")}
+            for i in range(rows // 10)
+        ])
+        # Inserted around the pipeline, so fill the rollups like the rebuild command does
+        rebuild_rollups(conn)
+    engine.dispose()
+
+
+async def compare(url: str) -> int:
+    engine = create_async_engine(url)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    cases = []
+    for days in (1, 2, 7, 30, 365):
+        cases.append((f"historical days={days}", analytics.get_historical_reports, reference_historical, dict(days=days)))
+        cases.append((f"incident trends days={days}", analytics.get_incident_trends, reference_incident_trends, dict(days=days)))
+        cases.append((f"resource trends days={days}", analytics.get_resource_trends, reference_resource_trends, dict(days=days)))
+    cases.append(("historical hazard=Fire", analytics.get_historical_reports, reference_historical,
+                  dict(days=30, hazard_type="Fire")))
+
+    failures = 0
+    async with Session() as db:
+        for name, endpoint, reference, params in cases:
+            found = differences(await reference(db, **params), await endpoint(db=db, **params))
+            print(f"{'ok  ' if not found else 'FAIL'} {name}")
+            for line in found[:10]:
+                print(f"       {line}")
+            failures += bool(found)
+    await engine.dispose()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analytics SQL vs Python parity check")
+    parser.add_argument("--url", help="Async database URL to compare against (default: scratch SQLite)")
+    parser.add_argument("--rows", type=int, default=5000, help="Reports to seed in the scratch database")
+    args = parser.parse_args()
+
+    url = args.url
+    if not url:
+        path = os.path.join(tempfile.mkdtemp(), "parity.db")
+        seed(f"sqlite:///{path}", args.rows)
+        url = f"sqlite+aiosqlite:///{path}"
+    failures = asyncio.run(compare(url))
+    print(f"{failures} endpoint/window combinations differ")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
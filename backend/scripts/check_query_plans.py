@@ -0,0 +1,139 @@
+"""
+Check that the hot API queries are served by an index.
+
+Builds a scratch SQLite database through the migration runner, then runs
+EXPLAIN QUERY PLAN for the queries issued by the list, analytics,
+clustering and WebSocket code paths and fails if any of them does not use
+one of its expected indexes. Cursor-paged queries must also come back in
+index order: a "USE TEMP B-TREE" sort re-sorts every matching row per page.
+
+    python scripts/check_query_plans.py
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.dialects import sqlite
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.pagination import encode_cursor, keyset_page  # noqa: E402
+from app.migrations import run_migrations  # noqa: E402
+from app.models.incident import Incident  # noqa: E402
+from app.models.report import Report  # noqa: E402
+from app.models.resource import Resource, ResourceStatus, ResourceType  # noqa: E402
+from app.services.resource_summary import summary_statement  # noqa: E402
+
+cutoff = datetime.utcnow() - timedelta(days=7)
+
+# (description, statement, indexes any of which satisfies the check)
+CHECKS = [
+    ("historical reports",
+     select(Report).filter(Report.timestamp >= cutoff),
+     ["ix_reports_timestamp"]),
+    ("historical reports by hazard",
+     select(Report).filter(Report.timestamp >= cutoff, Report.hazard_type == "Fire"),
+     ["ix_reports_timestamp", "ix_reports_hazard_type"]),
+    ("websocket snapshot",
+     select(Report).order_by(Report.timestamp.desc()).limit(50),
+     ["ix_reports_timestamp"]),
+    ("reports cursor page",
+     keyset_page(select(Report), Report.timestamp, Report.id, encode_cursor("2030-01-01 00:00:00", 10), 100),
+     ["ix_reports_timestamp"]),
+    ("dashboard reports 24h",
+     select(func.count(Report.id)).filter(Report.timestamp >= cutoff),
+     ["ix_reports_timestamp"]),
+    ("incident nested reports",
+     select(Report).filter(Report.incident_id.in_([1, 2, 3])),
+     ["ix_reports_incident_id"]),
+    ("active incidents",
+     select(Incident).filter(Incident.is_active == True),
+     ["ix_incidents_is_active_hazard_type", "ix_incidents_is_active_created_at"]),
+    ("clustering lookup",
+     select(Incident).filter(
+         Incident.is_active == True,
+         Incident.hazard_type == "Fire",
+         Incident.latitude.isnot(None),
+         Incident.longitude.isnot(None)
+     ),
+     ["ix_incidents_is_active_hazard_type"]),
+    ("incident trends",
+     select(Incident).filter(Incident.created_at >= cutoff),
+     ["ix_incidents_created_at"]),
+    ("resources by status",
+     select(Resource).filter(Resource.status == ResourceStatus.NEEDED).order_by(Resource.created_at.desc()),
+     ["ix_resources_status_created_at"]),
+    ("resources cursor page",
+     keyset_page(select(Resource), Resource.created_at, Resource.id, encode_cursor("2030-01-01 00:00:00", 10), 100),
+     ["ix_resources_created_at"]),
+    ("resources by status cursor page",
+     keyset_page(select(Resource).filter(Resource.status == ResourceStatus.NEEDED), Resource.created_at,
+                 Resource.id, encode_cursor("2030-01-01 00:00:00", 10), 100),
+     ["ix_resources_status_created_at"]),
+    ("resources by type",
+     select(Resource).filter(Resource.resource_type == ResourceType.WATER),
+     ["ix_resources_resource_type"]),
+    ("resources by incident",
+     select(Resource).filter(Resource.incident_id == 1),
+     ["ix_resources_incident_id"]),
+    ("incidents cursor page",
+     keyset_page(select(Incident).filter(Incident.is_active == True), Incident.created_at, Incident.id,
+                 encode_cursor("2030-01-01 00:00:00", 10), 100),
+     ["ix_incidents_is_active_created_at"]),
+    ("resources newest first",
+     select(Resource).order_by(Resource.created_at.desc()),
+     ["ix_resources_created_at"]),
+    ("resource trends",
+     select(Resource).filter(Resource.created_at >= cutoff),
+     ["ix_resources_created_at"]),
+    ("dashboard resource counts",
+     select(func.count(Resource.id)).filter(Resource.status == ResourceStatus.AVAILABLE),
+     ["ix_resources_status"]),
+    ("resource summary",
+     summary_statement(),
+     ["ix_resources_status"]),
+    ("resource summary for incident",
+     summary_statement(incident_id=1),
+     ["ix_resources_incident_id"]),
+]
+
+# Cursor-paged list queries, which must not sort in a temp B-tree
+SORT_FREE = {
+    "reports cursor page",
+    "resources by status",
+    "resources cursor page",
+    "resources by status cursor page",
+    "incidents cursor page",
+}
+
+
+def explain(conn, statement) -> str:
+    sql = str(statement.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+    rows = conn.execute(text("EXPLAIN QUERY PLAN " + sql)).fetchall()
+    return " | ".join(row[-1] for row in rows)
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'plans.db')}")
+        run_migrations(engine)
+        failures = 0
+        with engine.connect() as conn:
+            for description, statement, indexes in CHECKS:
+                plan = explain(conn, statement)
+                ok = any(index in plan for index in indexes)
+                if description in SORT_FREE and "USE TEMP B-TREE" in plan:
+                    ok = False
+                failures += not ok
+                print(f"{'ok  ' if ok else 'FAIL'} {description}: {plan}")
+        engine.dispose()
+
+    print(f"{len(CHECKS) - failures}/{len(CHECKS)} queries use an index"
+          f" ({len(SORT_FREE)} cursor pages without a sort step)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+"""
+Apply pending schema migrations, or list their status.
+
+    python scripts/migrate.py            # apply pending migrations
+    python scripts/migrate.py --status   # show applied/pending versions
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.database import engine  # noqa: E402
+from app.migrations import migration_status, run_migrations  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CrisisFlow schema migrations")
+    parser.add_argument("--status", action="store_true", help="Show migration status without applying")
+    args = parser.parse_args()
+
+    if not args.status:
+        applied = run_migrations(engine)
+        if not applied:
+            print("Database is up to date")
+
+    for entry in migration_status(engine):
+        state = f"applied {entry['applied_at']}" if entry["applied_at"] else "pending"
+        print(f"{entry['version']:04d} {entry['name']}: {state}")
+
+
+if __name__ == "__main__":
+    main()
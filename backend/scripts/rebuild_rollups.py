@@ -0,0 +1,35 @@
+"""
+Backfill or rebuild the hourly analytics rollups from the raw report and
+incident tables (for example after bulk imports that bypass the ingestion
+pipeline):
+
+    python scripts/rebuild_rollups.py            # every hour
+    python scripts/rebuild_rollups.py --days 2   # only the last two days
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.database import engine  # noqa: E402
+from app.migrations import run_migrations  # noqa: E402
+from app.services.rollups import rebuild_rollups  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild analytics rollups")
+    parser.add_argument("--days", type=float, help="Only rebuild hours in the last N days")
+    args = parser.parse_args()
+
+    run_migrations(engine)
+    since = datetime.utcnow() - timedelta(days=args.days) if args.days else None
+    with engine.begin() as conn:
+        written = rebuild_rollups(conn, since)
+    scope = f"since {since.isoformat()}" if since else "for all time"
+    print(f"Rebuilt rollups {scope}: " + ", ".join(f"{table} {rows} rows" for table, rows in written.items()))
+
+
+if __name__ == "__main__":
+    main()
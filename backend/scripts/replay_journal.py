@@ -0,0 +1,131 @@
+"""
+Replay an ingestion journal against a running (test) instance.
+
+Entries are re-sent with their original spacing compressed by --speed, so a
+recorded production burst can be reproduced for capacity planning:
+
+    python scripts/replay_journal.py crisisflow.journal crisisflow.journal.1700000000 \
+        --target http://127.0.0.1:8001 --speed 10
+
+App and Twitter entries are posted to POST /api/v1/reports/ (there is no push
+endpoint for tweets), SMS entries to the SMS webhook. Unfinished entries
+carried into a new segment on rotation keep their seq, so each seq is sent
+once across all the segments given.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.journal import read_journal
+
+
+def build_request(entry: dict):
+    """Map a journal entry to the (path, params, json) request that ingests it"""
+    payload = entry["payload"]
+    provider = payload.get("provider", "dummy")
+    if entry["source"] == "app":
+        body = {"raw_text": payload["raw_text"]}
+        if payload.get("image_base64"):
+            body["image_base64"] = payload["image_base64"]
+        return "/api/v1/reports/", {"provider": provider}, body
+    if entry["source"] == "sms":
+        return "/api/v1/ingest/sms/webhook/", {"provider": provider}, {
+            "From": payload.get("phone_number") or "",
+            "Body": payload["raw_text"]
+        }
+    if entry["source"] == "twitter":
+        return "/api/v1/reports/", {"provider": provider}, {"raw_text": payload["raw_text"]}
+    return None
+
+
+def dedupe_entries(entries):
+    """Keep one entry per seq, preferring the original over a rotation carry-over"""
+    by_seq = {}
+    for entry in entries:
+        kept = by_seq.get(entry["seq"])
+        if kept is None or ("carried_from" in kept and "carried_from" not in entry):
+            by_seq[entry["seq"]] = entry
+    return list(by_seq.values())
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def replay(args):
+    entries = []
+    for path in args.journals:
+        file_entries, _ = read_journal(path)
+        entries.extend(file_entries)
+    entries = dedupe_entries(entries)
+    entries.sort(key=lambda e: e["ts"])
+    if args.limit:
+        entries = entries[:args.limit]
+    if not entries:
+        print("No journal entries to replay")
+        return
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, errors = [], 0
+
+    async with httpx.AsyncClient(base_url=args.target, timeout=args.timeout) as client:
+
+        async def send(entry):
+            nonlocal errors
+            request = build_request(entry)
+            if request is None:
+                return
+            path, params, body = request
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.post(path, params=params, json=body)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        first_ts = entries[0]["ts"]
+        replay_start = time.perf_counter()
+        tasks = []
+        for entry in entries:
+            # Open-loop: keep the recorded arrival pattern regardless of response times
+            delay = (entry["ts"] - first_ts) / args.speed - (time.perf_counter() - replay_start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send(entry)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - replay_start
+
+    recorded_span = entries[-1]["ts"] - first_ts
+    print(f"Replayed {len(latencies)} entries in {elapsed:.2f}s "
+          f"(recorded span {recorded_span:.2f}s, speed {args.speed}x)")
+    print(f"Throughput: {len(latencies) / elapsed:.1f} req/s, errors: {errors}")
+    print(f"Latency p50={percentile(latencies, 0.5) * 1000:.1f}ms "
+          f"p95={percentile(latencies, 0.95) * 1000:.1f}ms "
+          f"p99={percentile(latencies, 0.99) * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay an ingestion journal at N x speed")
+    parser.add_argument("journals", nargs="+", help="Journal file(s), including rotated segments")
+    parser.add_argument("--target", default="http://127.0.0.1:8000", help="Base URL of the test instance")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier")
+    parser.add_argument("--concurrency", type=int, default=100, help="Maximum in-flight requests")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--limit", type=int, default=0, help="Only replay the first N entries")
+    asyncio.run(replay(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Local HTTP stub standing in for the Twilio Messages API.
+
+Run it and point the backend at it to exercise SMS alert fan-out without
+sending real messages:
+
+    python scripts/twilio_stub.py --port 8099 --latency 0.05 --error-rate 0.1
+    TWILIO_API_BASE_URL=http://127.0.0.1:8099 python main.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class StubState:
+    def __init__(self, latency: float, error_rate: float):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.received = 0
+        self.failed = 0
+        self.lock = threading.Lock()
+
+
+def make_handler(state: StubState):
+    class TwilioStubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so client connection pooling is exercised
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            form = parse_qs(self.rfile.read(length).decode())
+            if state.latency:
+                time.sleep(state.latency)
+
+            if random.random() < state.error_rate:
+                with state.lock:
+                    state.failed += 1
+                body = b'{"code": 20429, "message": "Too Many Requests"}'
+                self.send_response(random.choice([429, 503]))
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+
+            with state.lock:
+                state.received += 1
+            body = json.dumps({
+                "sid": "SM" + uuid.uuid4().hex,
+                "to": form.get("To", [""])[0],
+                "from": form.get("From", [""])[0],
+                "status": "queued"
+            }).encode()
+            self.send_response(201)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            body = json.dumps({"received": state.received, "failed": state.failed}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return TwilioStubHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Twilio Messages API stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered 429/503")
+    args = parser.parse_args()
+
+    state = StubState(args.latency, args.error_rate)
+    ThreadingHTTPServer.request_queue_size = 256  # accept bursts of concurrent connections
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    print(f"Twilio stub listening on http://{args.host}:{args.port} (GET / for counters)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()